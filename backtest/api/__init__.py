@@ -1,2 +1,2 @@
 from .base import API, PythonAPI
-from .tradewave import TradewaveAPI
+from .tradewave import TradewaveAPI, Execution
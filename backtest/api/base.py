@@ -1,5 +1,6 @@
 from os.path import basename, splitext
 
+from ..events import EventLog
 from ..module import ModuleLoader
 from ..util import Namespace # pylint: disable=unused-import
 
@@ -13,10 +14,11 @@ class Stop(Exception):
 
 
 class API(object):
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, events=None):
         self.started = False
         self.state = None
         self.verbose = verbose
+        self.events = EventLog() if events is None else events
 
     def start(self):
         if not self.started:
@@ -54,12 +56,21 @@ class API(object):
     def get_plots(self): # pylint: disable=no-self-use
         return []
 
+    def get_holdings(self):
+        return self.state
+
+    def get_snapshot(self):
+        raise NotImplementedError()
+
+    def set_snapshot(self, snapshot):
+        raise NotImplementedError()
+
 
 class PythonAPI(API):
     LOADER = ModuleLoader(prefix='strategy_', on_reload=ModuleLoader.FAIL)
 
-    def __init__(self, module_path, verbose=False):
-        super(PythonAPI, self).__init__(verbose)
+    def __init__(self, module_path, verbose=False, events=None):
+        super(PythonAPI, self).__init__(verbose, events)
         self.module = None
         self.module_path = module_path
 
@@ -70,5 +81,10 @@ class PythonAPI(API):
         if self.module is None:
             self.module = self.LOADER.load(self.module_path, env=self.get_env())
 
+    def unload(self):
+        if self.module is not None:
+            self.LOADER.unload(self.module)
+            self.module = None
+
     def get_env(self):
         raise NotImplementedError()
@@ -1 +1,2 @@
 from .api import TradewaveAPI
+from .data import Execution
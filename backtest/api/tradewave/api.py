@@ -2,30 +2,32 @@ from __future__ import print_function
 
 from copy import deepcopy
 from decimal import Decimal
-from time import ctime
 from collections import defaultdict
 
-import numpy as np
-
-from .data import Portfolio, Storage, Data, Money
+from .data import Portfolio, Storage, Info, Execution, Data, Money
+from .orders import Order, OrderBook
 from .util import (TradewaveInvalidOrderError,
                    TradewaveFundsError, TradewaveDataError,
-                   EXCHANGES, CURRENCIES, PAIRS, PAIR_CURRENCIES, INTERVALS)
-from ..base import PythonAPI, Stop, Namespace
-from backtest.util import enum
+                   EXCHANGES, CURRENCIES, CURRENCY_INDEX,
+                   PAIRS, PAIR_CURRENCIES, INTERVALS)
+from ..base import PythonAPI, Stop
+from backtest.data import find_dataset
+from backtest.util import enum, lazy_import
+
+np = lazy_import('numpy')
 
 
 class TradewaveAPI(PythonAPI):
     def __init__(self, module, portfolio, source, max_ticks=None,
-                 primary_pair=None, primary_exchange=EXCHANGES[0],
-                 fees=None, verbose=False):
-        super(TradewaveAPI, self).__init__(module, verbose)
+                 primary_pair=None, primary_exchange=None, execution=None,
+                 verbose=False, events=None):
+        super(TradewaveAPI, self).__init__(module, verbose, events)
 
-        if primary_pair is None:
-            try:
-                primary_pair = next(iter(source.datasets()))
-            except StopIteration:
-                raise ValueError('empty data source')
+        primary_pair, primary_exchange, dataset = find_dataset(
+            source, primary_pair, primary_exchange
+        )
+        if primary_exchange is None:
+            primary_exchange = EXCHANGES[0]
 
         if primary_pair not in self.CONST_ENV['pairs']:
             raise ValueError('invalid pair {0}'.format(primary_pair))
@@ -33,22 +35,32 @@ class TradewaveAPI(PythonAPI):
         if primary_exchange not in self.CONST_ENV['exchanges']:
             raise ValueError('invalid exchange {0}'.format(primary_exchange))
 
-        src_max_ticks = source.get_max_ticks(primary_pair)
+        src_max_ticks = source.get_max_ticks(dataset)
         if src_max_ticks == 0:
             raise ValueError('no data for primary pair {0}'
                              .format(primary_pair))
         if max_ticks is None or max_ticks <= 0 or max_ticks > src_max_ticks:
             max_ticks = src_max_ticks
 
-        if fees is None:
-            fees = {}
+        if execution is None:
+            execution = Execution()
+
+        fees = execution.fees or {}
         fees = [Decimal(fees.get(currency, 0)) for currency in CURRENCIES]
         self.fees = [fees] * len(EXCHANGES)
 
+        self.pair_fees = {}
+        for pair, fee in (execution.pair_fees or {}).items():
+            if pair not in self.CONST_ENV['pairs']:
+                raise ValueError('invalid pair {0}'.format(pair))
+            self.pair_fees[self.CONST_ENV['pairs'][pair]] = Decimal(fee)
+
+        self.slippage = Decimal(execution.slippage or 0) / 10000
+
         self.portfolio = Portfolio(**portfolio)
         self.storage = Storage()
-        self.data = Data(source)
-        self.info = Namespace(
+        self.data = Data(source, exchange=primary_exchange)
+        self.info = Info(
             tick=0,
             running_time=0,
             current_time=source.start_time,
@@ -69,6 +81,7 @@ class TradewaveAPI(PythonAPI):
         self.secondary_plots = defaultdict(new_plot)
         self.buy_plot = ([], [])
         self.sell_plot = ([], [])
+        self.orders = OrderBook()
 
     def do_start(self):
         super(TradewaveAPI, self).do_start()
@@ -80,6 +93,8 @@ class TradewaveAPI(PythonAPI):
         self.info.running_time = tick * self.info.interval
         self.info.current_time = self.info.begin + self.info.running_time
         self.data.update(tick)
+        if self.orders:
+            self.process_orders()
         self.portfolio.update()
         self.module.tick()
         return self.portfolio
@@ -87,6 +102,10 @@ class TradewaveAPI(PythonAPI):
     def do_stop(self):
         if hasattr(self.module, 'stop'):
             self.module.stop()
+        if self.orders:
+            for order in self.orders.clear():
+                self.release(order)
+            self.portfolio.update()
 
     def get_plots(self):
         point_plots = {}
@@ -102,6 +121,49 @@ class TradewaveAPI(PythonAPI):
 
         return ret
 
+    def get_snapshot(self):
+        return {
+            'portfolio': dict((c, self.portfolio[c]) for c in CURRENCIES),
+            'next': dict((c, self.portfolio.next[c]) for c in CURRENCIES),
+            'storage': dict(self.storage),
+            'info': dict(self.info),
+            'plots': dict(self.plots),
+            'secondary_plots': dict(self.secondary_plots),
+            'buy_plot': self.buy_plot,
+            'sell_plot': self.sell_plot,
+            'orders': self.orders
+        }
+
+    def set_snapshot(self, snapshot):
+        info = snapshot['info']
+        if (info['begin'] != self.info.begin
+                or info['interval'] != self.info.interval):
+            raise ValueError(
+                'snapshot time mismatch: begin={0} interval={1}'
+                .format(info['begin'], info['interval'])
+            )
+
+        self.portfolio.assign(snapshot['portfolio'])
+        self.portfolio.next.assign(snapshot['next'])
+        self.storage.reset()
+        self.storage.update(snapshot['storage'])
+        for key, value in info.items():
+            if key not in ('max_ticks', 'end'):
+                self.info[key] = value
+
+        for plots, saved in ((self.plots, snapshot['plots']),
+                             (self.secondary_plots,
+                              snapshot['secondary_plots'])):
+            plots.clear()
+            for key, values in saved.items():
+                length = min(len(values), self.info.max_ticks)
+                plots[key][:length] = values[:length]
+
+        self.buy_plot = tuple(list(x) for x in snapshot['buy_plot'])
+        self.sell_plot = tuple(list(x) for x in snapshot['sell_plot'])
+        self.orders = snapshot['orders']
+        self.state = self.portfolio
+
     def get_env(self):
         env = deepcopy(self.CONST_ENV)
         for attr in self.ENV:
@@ -110,90 +172,140 @@ class TradewaveAPI(PythonAPI):
 
     @staticmethod
     def validate_order(pair, amount, price):
-        if price is not None:
-            raise NotImplementedError('limit order')
         if pair < 0 or pair >= len(PAIRS):
             raise TradewaveInvalidOrderError('invalid pair: {0}'.format(pair))
         if amount is not None and amount <= 0:
             raise TradewaveInvalidOrderError(
                 'invalid amount: {0}'.format(amount)
             )
+        if price is not None and price <= 0:
+            raise TradewaveInvalidOrderError(
+                'invalid price: {0}'.format(price)
+            )
 
-    def buy(self, pair, amount=None, price=None, timeout=60): # pylint: disable=unused-argument
-        self.validate_order(pair, amount, price)
-
-        dst, src = PAIR_CURRENCIES[pair]
-        price = self.data[pair].price
-
-        if amount is None:
-            if self.portfolio.next[src] == 0:
-                raise TradewaveFundsError('buy: portfolio=0')
-            amount = self.portfolio.next[src] / price
-            self.portfolio.next[dst] += amount
-            self.portfolio.next[src] = Decimal(0)
+    def get_fee(self, pair, currency):
+        try:
+            return self.pair_fees[pair]
+        except KeyError:
+            exchange = self.fees[self.info.primary_exchange]
+            return exchange[CURRENCY_INDEX[currency]]
+
+    def settle(self, side, pair, amount, price):
+        if side == Order.BUY:
+            dst, src = PAIR_CURRENCIES[pair]
+            bought = amount * (1 - self.get_fee(pair, dst))
+            self.portfolio.next[dst] += bought
+            if self.verbose:
+                self.events.record(self.info.current_time, self, 'buy',
+                                   amount * price, src.upper(),
+                                   bought, dst.upper(), price)
+            self.buy_plot[0].append(self.info.tick)
+            self.buy_plot[1].append(price)
+        else:
+            src, dst = PAIR_CURRENCIES[pair]
+            received = amount * price * (1 - self.get_fee(pair, dst))
+            self.portfolio.next[dst] += received
+            if self.verbose:
+                self.events.record(self.info.current_time, self, 'sell',
+                                   amount, src.upper(),
+                                   received, dst.upper(), price)
+            self.sell_plot[0].append(self.info.tick)
+            self.sell_plot[1].append(price)
+
+    def reserve(self, side, pair, amount, price):
+        if side == Order.BUY:
+            _, src = PAIR_CURRENCIES[pair]
+            funds = self.portfolio.next[src]
+            if amount is None:
+                if funds == 0:
+                    raise TradewaveFundsError('buy: portfolio=0')
+                amount = funds / price
+                self.portfolio.next[src] = Decimal(0)
+            else:
+                amount = Decimal(amount)
+                max_amount = funds / price
+                if amount > max_amount:
+                    raise TradewaveFundsError(
+                        'buy: amount={0} portfolio={1} max={2}'
+                        .format(amount, funds, max_amount)
+                    )
+                self.portfolio.next[src] -= amount * price
         else:
+            src, _ = PAIR_CURRENCIES[pair]
+            funds = self.portfolio.next[src]
+            if amount is None:
+                amount = funds
+                if amount == 0:
+                    raise TradewaveFundsError('sell: portfolio=0')
+            elif amount > funds:
+                raise TradewaveFundsError('sell: amount={0} portfolio={1}'
+                                          .format(amount, funds))
             amount = Decimal(amount)
-            max_amount = self.portfolio.next[src] / price
-            if amount > max_amount:
-                raise TradewaveFundsError(
-                    'buy: amount={0} portfolio={1} max={2}'
-                    .format(amount, self.portfolio.next[src], max_amount)
-                )
-            self.portfolio.next[dst] += amount
-            self.portfolio.next[src] -= amount * price
-
-        if self.verbose:
-            print(
-                '[{0}] [{1}] BUY {2:.8f} {3} -> {4:.8f} {5} (price {6:.8f})'
-                .format(
-                    ctime(self.info.current_time),
-                    self, amount * price, src.upper(),
-                    amount, dst.upper(), price
-                )
-            )
-        self.buy_plot[0].append(self.info.tick)
-        self.buy_plot[1].append(price)
-
-    def sell(self, pair, amount=None, price=None, timeout=60): # pylint: disable=unused-argument
-        self.validate_order(pair, amount, price)
+            self.portfolio.next[src] -= amount
+        return amount
 
-        src, dst = PAIR_CURRENCIES[pair]
-        price = self.data[pair].price
-
-        if amount is None:
-            amount = self.portfolio.next[src]
-            if amount == 0:
-                raise TradewaveFundsError('sell: portfolio=0')
-        elif amount > self.portfolio.next[src]:
-            raise TradewaveFundsError('sell: amount={0} portfolio={1}'
-                                      .format(amount, self.portfolio.next[src]))
-        amount = Decimal(amount)
-
-        if self.verbose:
-            print(
-                '[{0}] [{1}] SELL {2:.8f} {3} -> {4:.8f} {5} (price {6})'
-                .format(
-                    ctime(self.info.current_time),
-                    self, amount, src.upper(),
-                    amount * price, dst.upper(), price
-                )
-            )
+    @staticmethod
+    def get_reserved(order):
+        if order.side == Order.BUY:
+            _, src = PAIR_CURRENCIES[order.pair]
+            return src, order.amount * order.price
+        src, _ = PAIR_CURRENCIES[order.pair]
+        return src, order.amount
+
+    def release(self, order):
+        currency, amount = self.get_reserved(order)
+        self.portfolio.next[currency] += amount
+
+    def get_holdings(self):
+        ret = dict(self.portfolio.next.items())
+        for order in self.orders.orders.values():
+            currency, amount = self.get_reserved(order)
+            ret[currency] += amount
+        return ret
 
-        self.portfolio.next[dst] += amount * price
-        self.portfolio.next[src] -= amount
-        self.sell_plot[0].append(self.info.tick)
-        self.sell_plot[1].append(price)
+    def order(self, side, pair, amount, price, timeout):
+        self.validate_order(pair, amount, price)
+        if self.data[pair] is None:
+            raise TradewaveDataError('no data for pair {0}'
+                                     .format(PAIRS[pair]))
+        if price is None:
+            price = self.data[pair].price
+            if side == Order.BUY:
+                price *= 1 + self.slippage
+            else:
+                price *= 1 - self.slippage
+            amount = self.reserve(side, pair, amount, price)
+            self.settle(side, pair, amount, price)
+            return None
+        price = Decimal(price)
+        amount = self.reserve(side, pair, amount, price)
+        expires = None
+        if timeout is not None:
+            expires = self.info.current_time + timeout
+        return self.orders.add(pair, side, amount, price, expires)
+
+    def process_orders(self):
+        for order in self.orders.expire(self.info.current_time):
+            self.release(order)
+        for pair in self.orders.pairs():
+            candle = self.data[pair]
+            for order in self.orders.fill(pair, candle.high, candle.low):
+                self.settle(order.side, pair, order.amount, order.price)
+
+    def buy(self, pair, amount=None, price=None, timeout=60):
+        return self.order(Order.BUY, pair, amount, price, timeout)
+
+    def sell(self, pair, amount=None, price=None, timeout=60):
+        return self.order(Order.SELL, pair, amount, price, timeout)
 
     def log(self, *args, **kwargs):
-        print('[{0}] [{1}] LOG: '
-              .format(ctime(self.info.current_time), self),
-              end='')
-        print(*args, **kwargs)
+        message = kwargs.get('sep', ' ').join(str(arg) for arg in args)
+        self.events.record(self.info.current_time, self, 'log',
+                           message + kwargs.get('end', '\n'))
 
     def email(self, message, subject=None):
-        print('[{0}] [{1}] EMAIL: {2} {3}'
-              .format(ctime(self.info.current_time), self,
-                      subject or '<no subject>', message))
+        self.events.record(self.info.current_time, self, 'email',
+                           subject or '<no subject>', message)
 
     def plot(self, series_key, value, secondary=False):
         plots = self.secondary_plots if secondary else self.plots
@@ -213,6 +325,12 @@ class TradewaveAPI(PythonAPI):
             cls.CONST_ENV['currencies'][currency] = len(CURRENCIES)
             CURRENCIES.append(currency)
 
+    @classmethod
+    def add_exchange(cls, exchange):
+        if exchange not in cls.CONST_ENV['exchanges']:
+            cls.CONST_ENV['exchanges'][exchange] = len(EXCHANGES)
+            EXCHANGES.append(exchange)
+
     @classmethod
     def add_pair(cls, pair):
         if pair not in cls.CONST_ENV['pairs']:
@@ -233,7 +351,7 @@ class TradewaveAPI(PythonAPI):
         'TradewaveFundsError': TradewaveFundsError,
         'TradewaveDataError': TradewaveDataError,
         'Stop': Stop,
-        'currencies': enum(CURRENCIES),
+        'currencies': CURRENCY_INDEX,
         'pairs': enum(PAIRS),
         'exchanges': enum(EXCHANGES),
         'intervals': INTERVALS,
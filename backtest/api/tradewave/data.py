@@ -2,35 +2,88 @@ from __future__ import division
 import operator
 from decimal import Decimal
 from collections import defaultdict
-import talib as ta
 
 from .util import (Namespace, TradewaveDataError,
-                   CURRENCIES, PAIRS, DATA, DATA_INDEX, MAX_PERIOD)
+                   CURRENCIES, CURRENCY_INDEX, PAIRS, EXCHANGES,
+                   DATA, DATA_INDEX, MAX_PERIOD)
+from backtest.data import get_dataset
+from backtest.util import Record, lazy_import
 
+ta = lazy_import('talib')
 
-class Portfolio(Namespace):
-    def __init__(self, **kwargs):
-        super(Portfolio, self).__init__()
 
-        for currency in CURRENCIES:
-            self[currency] = Decimal(kwargs.get(currency, 0))
+class Portfolio(object):
+    __slots__ = ('values', 'next')
+
+    def __init__(self, **kwargs):
+        self.values = [Decimal(kwargs.get(currency, 0))
+                       for currency in CURRENCIES]
 
         if 'is_next' not in kwargs:
             self.next = Portfolio(is_next=True, **kwargs)
         else:
             self.next = None
 
+    def __getstate__(self):
+        return self.values, self.next
+
+    def __setstate__(self, state):
+        self.values, self.next = state
+
     def __getitem__(self, item):
-        if not isinstance(item, basestring):
-            item = CURRENCIES[item]
-        return super(Portfolio, self).__getitem__(item)
+        try:
+            return self.values[CURRENCY_INDEX.get(item, item)]
+        except (IndexError, TypeError):
+            raise KeyError(item)
+
+    def __setitem__(self, item, value):
+        try:
+            self.values[CURRENCY_INDEX.get(item, item)] = value
+        except (IndexError, TypeError):
+            raise KeyError(item)
+
+    def __getattr__(self, attr):
+        try:
+            return self.values[CURRENCY_INDEX[attr]]
+        except KeyError:
+            raise AttributeError(attr)
+
+    def __setattr__(self, attr, value):
+        if attr in self.__slots__:
+            super(Portfolio, self).__setattr__(attr, value)
+        else:
+            self[attr] = value
+
+    def __iter__(self):
+        return iter(CURRENCIES)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, item):
+        return item in CURRENCY_INDEX
+
+    def __repr__(self):
+        return 'Portfolio({0})'.format(dict(self.items()))
+
+    def get(self, item, default=None):
+        try:
+            return self[item]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(CURRENCIES)
+
+    def items(self):
+        return zip(CURRENCIES, self.values)
 
     def assign(self, portfolio):
         for currency in CURRENCIES:
             self[currency] = portfolio[currency]
 
     def update(self):
-        self.assign(self.next)
+        self.values[:] = self.next.values
 
 
 class Storage(Namespace):
@@ -46,80 +99,169 @@ class Storage(Namespace):
         super(Storage, self).clear()
 
 
-class Data(Namespace):
-    def __init__(self, source, interval=None):
-        super(Data, self).__init__()
+class Info(Record):
+    __slots__ = ('tick', 'running_time', 'current_time', 'max_ticks',
+                 'interval', 'begin', 'end', 'starting_portfolio',
+                 'primary_pair', 'primary_exchange')
+
+
+class Execution(Record):
+    __slots__ = ('fees', 'pair_fees', 'slippage')
+
+
+class Data(object):
+    def __init__(self, source, interval=None, exchange=None, views=None):
         self._tick = None
         self._interval = interval
+        self._exchange = exchange
         self._source = source
+        self._views = {} if views is None else views
+        self._views[exchange, interval] = self
+        self._pairs = []
+        self._datasets = []
+        self._panel = None
         for pair in PAIRS:
-            if pair in self._source:
-                self[pair] = PairData(self._source, pair,
-                                      interval=self._interval)
+            dataset = get_dataset(self._source, pair, exchange)
+            if dataset in self._source:
+                self._pairs.append(pair)
+                self._datasets.append(dataset)
+                setattr(self, pair, PairData(self._source, dataset,
+                                             interval=self._interval))
             else:
-                self[pair] = None
+                setattr(self, pair, None)
 
     def __getitem__(self, item):
         if not isinstance(item, basestring):
             item = PAIRS[item]
-        return super(Data, self).__getitem__(item)
+        try:
+            return getattr(self, item)
+        except AttributeError:
+            raise KeyError(item)
 
     def __call__(self, exchange=None, interval=None, smooth=True):
-        ret = Data(self._source, interval or self._interval)
-        if self._tick is not None:
+        if exchange is None:
+            exchange = self._exchange
+        elif not isinstance(exchange, basestring):
+            exchange = EXCHANGES[exchange]
+        if interval is None:
+            interval = self._interval
+        try:
+            ret = self._views[exchange, interval]
+        except KeyError:
+            ret = Data(self._source, interval, exchange, self._views)
+        if ret._tick != self._tick and self._tick is not None:
             ret.update(self._tick)
         return ret
 
+    def pairs(self):
+        return list(self._pairs)
+
+    def panel(self, field, length):
+        if length <= 0 or length > MAX_PERIOD:
+            raise TradewaveDataError('invalid period length: {0}'
+                                     .format(length))
+        try:
+            if self._panel is None:
+                self._panel = self._source.panel(self._datasets,
+                                                 self._interval)
+            window = self._panel.window(self._tick, length)
+            return window[:, :, DATA_INDEX[field]]
+        except (IndexError, KeyError) as err:
+            raise TradewaveDataError(err.message)
+
     def update(self, tick):
         self._tick = tick
-        for pair in (self[p] for p in PAIRS):
+        for pair in (getattr(self, p) for p in PAIRS):
             if pair is not None:
                 pair.update(tick)
 
 
-class PairData(Namespace): # pylint:disable=too-many-public-methods
+class PairData(object): # pylint:disable=too-many-public-methods
+    __slots__ = ('_source', '_name', '_interval', '_tick', '_loaded',
+                 '_windows', '_accessor') + tuple(DATA)
+
     def __init__(self, source, name=None, tick=None, interval=None):
-        super(PairData, self).__init__()
         self._source = source
         self._name = name
         self._interval = interval
-        if tick is not None:
-            self.update(tick)
-        else:
-            self._tick = None
+        self._tick = tick
+        self._loaded = False
+        self._windows = {}
+        self._accessor = None
+
+    def __getattr__(self, attr):
+        if attr not in DATA_INDEX or self._tick is None or self._loaded:
+            raise AttributeError(attr)
+        self.load()
+        return getattr(self, attr)
 
     def __getitem__(self, idx):
         if isinstance(idx, basestring):
-            return super(PairData, self).__getitem__(idx)
+            try:
+                return getattr(self, idx)
+            except AttributeError:
+                raise KeyError(idx)
         if idx > 0 or idx < -MAX_PERIOD:
             raise TradewaveDataError('invalid index {0}'.format(idx))
         if idx == 0:
             return self
-        return PairData(self._source, self._name,
-                        self._tick + idx, self._interval)
+        ret = PairData(self._source, self._name,
+                       self._tick + idx, self._interval)
+        ret._accessor = self._accessor
+        return ret
 
     def update(self, tick):
         self._tick = tick
-
+        if self._loaded:
+            for attr in DATA:
+                delattr(self, attr)
+            self._loaded = False
+        if self._windows:
+            self._windows = {}
+
+    def get_accessor(self):
+        if self._accessor is None:
+            self._accessor = self._source.accessor(self._name, self._interval)
+        return self._accessor
+
+    def load(self):
         try:
-            candle = self._source.get_current(tick, self._name, self._interval)
+            candle = self.get_accessor().candle(self._tick)
         except (IndexError, KeyError) as err:
             raise TradewaveDataError(err.message)
 
         for attr in DATA:
-            self[attr] = Decimal(candle[DATA_INDEX[attr]])
+            setattr(self, attr, Decimal(float(candle[DATA_INDEX[attr]])))
+        self._loaded = True
 
     def period(self, length, name):
         if length <= 0 or length > MAX_PERIOD:
             raise TradewaveDataError('invalid period length: {0}'
                                      .format(length))
         try:
-            data = self._source.get_prev(self._tick, length,
-                                         self._name, self._interval)
+            return self._windows[length][:, DATA_INDEX[name]]
+        except KeyError:
+            pass
+        try:
+            data = self.get_accessor().window(self._tick, length)
+            self._windows[length] = data
             return data[:, DATA_INDEX[name]]
         except (IndexError, KeyError) as err:
             raise TradewaveDataError(err.message)
 
+    def stats(self, length, name):
+        if length <= 0 or length > MAX_PERIOD:
+            raise TradewaveDataError('invalid period length: {0}'
+                                     .format(length))
+        try:
+            return self.get_accessor().stats(self._tick, length,
+                                             DATA_INDEX[name])
+        except (IndexError, KeyError) as err:
+            raise TradewaveDataError(err.message)
+
+    def series(self, length, name):
+        return self.period(length, name).astype(float, copy=False)
+
     def warmup_period(self, name):
         return self.period(30, name)
 
@@ -133,17 +275,17 @@ class PairData(Namespace): # pylint:disable=too-many-public-methods
         raise NotImplementedError('mfi')
 
     def ma(self, period): # pylint:disable=invalid-name
-        return Decimal(self.period(period, 'price').mean())
+        return Decimal(self.stats(period, 'price')[0])
 
     def std(self, period):
-        return Decimal(self.period(period, 'price').std())
+        return Decimal(self.stats(period, 'price')[1])
 
     def ema(self, period):
-        return Decimal(ta.EMA(self.period(period, 'price'), period)[-1])
+        return Decimal(ta.EMA(self.series(period, 'price'), period)[-1])
 
     def aroon(self, period):
-        aroon_down, aroon_up = ta.AROON(self.period(period, 'high'),
-                                        self.period(period, 'low'),
+        aroon_down, aroon_up = ta.AROON(self.series(period, 'high'),
+                                        self.series(period, 'low'),
                                         period)
         return Decimal(aroon_down[-1]), Decimal(aroon_up[-1])
 
@@ -151,19 +293,19 @@ class PairData(Namespace): # pylint:disable=too-many-public-methods
         period = 30
         return Decimal(
             ta.SAR(
-                self.period(period, 'high'),
-                self.period(period, 'low'),
+                self.series(period, 'high'),
+                self.series(period, 'low'),
                 acceleration,
                 max_acceleration
             )[-1]
         )
 
     def rsi(self, period):
-        return Decimal(ta.RSI(self.period(period + 1, 'price'), period)[-1])
+        return Decimal(ta.RSI(self.series(period + 1, 'price'), period)[-1])
 
     def stochrsi(self, period, fastk_period, fastd_period, fastd_matype=0):
         fastk, fastd = ta.STOCHRSI(
-            self.period(period + fastk_period + fastd_period, 'price'),
+            self.series(period + fastk_period + fastd_period, 'price'),
             fastk_period,
             fastd_period,
             fastd_matype
@@ -174,9 +316,9 @@ class PairData(Namespace): # pylint:disable=too-many-public-methods
               slowd_period, slowk_matype=0, slowd_matype=0):
         period = fastk_period + slowk_period + 1
         slowk, slowd = ta.STOCH(
-            self.period(period, 'high'),
-            self.period(period, 'low'),
-            self.period(period, 'close'),
+            self.series(period, 'high'),
+            self.series(period, 'low'),
+            self.series(period, 'close'),
             fastk_period, slowk_period, slowd_period,
             slowk_matype, slowd_matype
         )
@@ -185,9 +327,9 @@ class PairData(Namespace): # pylint:disable=too-many-public-methods
     def adx(self, period):
         return Decimal(
             ta.ADX(
-                self.period(period * 2, 'high'),
-                self.period(period * 2, 'low'),
-                self.period(period * 2, 'close'),
+                self.series(period * 2, 'high'),
+                self.series(period * 2, 'low'),
+                self.series(period * 2, 'close'),
                 period
             )[-1]
         )
@@ -195,18 +337,18 @@ class PairData(Namespace): # pylint:disable=too-many-public-methods
     def atr(self, period):
         return Decimal(
             ta.ATR(
-                self.period(period + 1, 'high'),
-                self.period(period + 1, 'low'),
-                self.period(period + 1, 'close'),
+                self.series(period + 1, 'high'),
+                self.series(period + 1, 'low'),
+                self.series(period + 1, 'close'),
                 period
             )[-1]
         )
 
     def mom(self, period):
-        return Decimal(ta.MOM(self.period(period + 1, 'price'), period)[-1])
+        return Decimal(ta.MOM(self.series(period + 1, 'price'), period)[-1])
 
     def tsf(self, period):
-        return Decimal(ta.MOM(self.period(period, 'price'), period)[-1])
+        return Decimal(ta.MOM(self.series(period, 'price'), period)[-1])
 
 
 class Money(object):
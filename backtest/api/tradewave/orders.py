@@ -0,0 +1,88 @@
+from heapq import heappush, heappop
+from collections import defaultdict
+
+
+class Order(object):
+    BUY = 'buy'
+    SELL = 'sell'
+
+    def __init__(self, oid, pair, side, amount, price, expires=None):
+        self.id = oid # pylint: disable=invalid-name
+        self.pair = pair
+        self.side = side
+        self.amount = amount
+        self.price = price
+        self.expires = expires
+        self.active = True
+
+    def __repr__(self):
+        return '<Order {0} {1} {2} {3} @ {4}>'.format(
+            self.id, self.side, self.pair, self.amount, self.price
+        )
+
+
+class OrderBook(object):
+    def __init__(self):
+        self.count = 0
+        self.orders = {}
+        self.bids = defaultdict(list)
+        self.asks = defaultdict(list)
+        self.expiry = []
+
+    def __len__(self):
+        return len(self.orders)
+
+    def add(self, pair, side, amount, price, expires=None):
+        order = Order(self.count, pair, side, amount, price, expires)
+        self.count += 1
+        self.orders[order.id] = order
+        if side == Order.BUY:
+            heappush(self.bids[pair], (-price, order.id, order))
+        else:
+            heappush(self.asks[pair], (price, order.id, order))
+        if expires is not None:
+            heappush(self.expiry, (expires, order.id, order))
+        return order
+
+    def cancel(self, order):
+        if order.active:
+            order.active = False
+            del self.orders[order.id]
+            return True
+        return False
+
+    def pairs(self):
+        return set(pair for book in (self.bids, self.asks)
+                   for pair, heap in book.items() if heap)
+
+    @staticmethod
+    def _pop(heap, crosses):
+        while heap and (not heap[0][2].active or crosses(heap[0][0])):
+            yield heappop(heap)[2]
+
+    def fill(self, pair, high, low):
+        ret = []
+        for order in self._pop(self.bids[pair], lambda key: -key >= low):
+            if self.cancel(order):
+                ret.append(order)
+        for order in self._pop(self.asks[pair], lambda key: key <= high):
+            if self.cancel(order):
+                ret.append(order)
+        return ret
+
+    def clear(self):
+        ret = sorted(self.orders.values(), key=lambda order: order.id)
+        for order in ret:
+            order.active = False
+        self.orders.clear()
+        self.bids.clear()
+        self.asks.clear()
+        self.expiry = []
+        return ret
+
+    def expire(self, time):
+        ret = []
+        for order in self._pop(self.expiry, lambda key: key < time):
+            if self.cancel(order):
+                ret.append(order)
+        return ret
@@ -1,11 +1,13 @@
 from ..base import APIError, Namespace
 from backtest.data import DataSource as ds
+from backtest.util import Constants, enum
 
 CURRENCIES = ['btc', 'ltc', 'usd', 'eur']
 PAIRS = ['btc_usd', 'ltc_usd', 'ltc_btc', 'btc_eur', 'ltc_eur']
 PAIR_CURRENCIES = [tuple(p.split('_')) for p in PAIRS]
+CURRENCY_INDEX = enum(CURRENCIES)
 EXCHANGES = ['btce', 'bitstamp', 'bitfinex', 'kraken', 'atlasats']
-INTERVALS = Namespace(
+INTERVALS = Constants(
     _1m=60,
     _5m=5 * 60,
     _10m=10 * 60,
@@ -22,7 +24,7 @@ DATA_INDEX = [
     ds.CANDLE.open, ds.CANDLE.high, ds.CANDLE.low, ds.CANDLE.close,
     ds.CANDLE.close, ds.CANDLE.close, ds.CANDLE.close
 ]
-DATA_INDEX = Namespace((data, index) for data, index in zip(DATA, DATA_INDEX))
+DATA_INDEX = Constants((data, index) for data, index in zip(DATA, DATA_INDEX))
 
 
 class TradewaveDataError(APIError):
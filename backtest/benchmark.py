@@ -0,0 +1,87 @@
+from __future__ import division
+
+from .data import split_dataset, get_dataset
+from .util import lazy_import
+
+np = lazy_import('numpy')
+
+
+def get_pairs(source, exchange=None):
+    pairs = sorted(set(split_dataset(dataset)[1]
+                       for dataset in source.datasets()))
+    return [(pair, get_dataset(source, pair, exchange)) for pair in pairs
+            if len(pair.split('_')) == 2]
+
+def get_prices(source, ticks, exchange=None):
+    key = ('prices', exchange, source.start_time, source.tick_size, ticks)
+    try:
+        return source.cache[key]
+    except KeyError:
+        pass
+
+    pairs = [(pair, dataset) for pair, dataset in get_pairs(source, exchange)
+             if source.get_max_ticks(dataset) >= ticks]
+    prices = np.empty((ticks, len(pairs)), dtype=np.float64)
+    for i, (_, dataset) in enumerate(pairs):
+        prices[:, i] = source.get_plot(dataset, ticks)
+
+    ret = [pair for pair, _ in pairs], prices
+    source.cache[key] = ret
+    return ret
+
+def get_rates(pairs, prices, currency):
+    rates = {currency: np.ones(len(prices))}
+    changed = True
+    while changed:
+        changed = False
+        for i, pair in enumerate(pairs):
+            asset, quote = pair.split('_')
+            if quote in rates and asset not in rates:
+                rates[asset] = prices[:, i] * rates[quote]
+                changed = True
+            elif asset in rates and quote not in rates:
+                rates[quote] = rates[asset] / prices[:, i]
+                changed = True
+    return rates
+
+def get_value(portfolio, rates, tick=-1):
+    return sum(float(amount) * rates[currency][tick]
+               for currency, amount in portfolio.items()
+               if amount and currency in rates)
+
+def get_baselines(source, portfolio, pair, ticks, exchange=None):
+    currency = pair.split('_')[1]
+    key = ('baselines', exchange, source.start_time, source.tick_size,
+           ticks, currency, tuple(sorted(portfolio.items())))
+    try:
+        return source.cache[key]
+    except KeyError:
+        pass
+
+    pairs, prices = get_prices(source, ticks, exchange)
+    rates = get_rates(pairs, prices, currency)
+    start_value = get_value(portfolio, rates, 0)
+
+    assets = sorted(asset for asset in rates if asset != currency)
+    baselines = [
+        ('buy and hold ' + asset.upper(),
+         rates[asset] * (start_value / rates[asset][0]))
+        for asset in assets
+    ]
+
+    if len(assets) > 1:
+        values = np.column_stack([rates[asset] for asset in assets])
+        growth = np.ones(ticks)
+        growth[1:] = np.cumprod((values[1:] / values[:-1]).mean(axis=1))
+        baselines.append(('equal weight', start_value * growth))
+
+    baselines.append(('cash', np.repeat(start_value, ticks)))
+
+    ret = {
+        'pairs': pairs,
+        'rates': rates,
+        'start_value': start_value,
+        'baselines': baselines
+    }
+    source.cache[key] = ret
+    return ret
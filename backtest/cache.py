@@ -0,0 +1,166 @@
+import os
+import sys
+import ast
+import json
+from hashlib import sha1
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from .data.header import read_header
+
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+IGNORE_ARGS = frozenset([
+    'data', 'add_data', 'strategy', 'progress', 'no_progress', 'no_plot',
+    'log_output', 'checkpoint', 'checkpoint_interval', 'resume', 'jobs',
+    'cache', 'cache_size'
+])
+
+_ENGINE_HASH = []
+
+
+def hash_file(path, block_size=1 << 20):
+    ret = sha1()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(block_size), b''):
+            ret.update(block)
+    return ret.hexdigest()
+
+def hash_data(path):
+    try:
+        header = read_header(path)
+        checksum = header['checksum']
+    except (IOError, KeyError, ValueError):
+        checksum = None
+    if checksum:
+        return sha1(json.dumps([checksum, header['start_time'],
+                                header['tick_size']])).hexdigest()
+    stat = os.stat(path)
+    return sha1(json.dumps([os.path.abspath(path), stat.st_size,
+                            stat.st_mtime])).hexdigest()
+
+def get_imports(path):
+    with open(path) as fp:
+        tree = ast.parse(fp.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            yield node.module
+            for alias in node.names:
+                yield node.module + '.' + alias.name
+
+def get_helpers(path):
+    root = os.path.dirname(os.path.abspath(path))
+    ret = set()
+    queue = [os.path.abspath(path)]
+    while queue:
+        fname = queue.pop()
+        if fname in ret:
+            continue
+        ret.add(fname)
+        for name in get_imports(fname):
+            parts = name.split('.')
+            for i in range(1, len(parts) + 1):
+                base = os.path.join(root, *parts[:i])
+                for helper in (base + '.py',
+                               os.path.join(base, '__init__.py')):
+                    if os.path.isfile(helper):
+                        queue.append(helper)
+    return sorted(ret)
+
+def hash_sources(paths):
+    ret = sha1()
+    for path in paths:
+        ret.update(hash_file(path))
+        root = os.path.dirname(os.path.abspath(path))
+        for helper in get_helpers(path):
+            ret.update(os.path.relpath(helper, root))
+            ret.update(hash_file(helper))
+    return ret.hexdigest()
+
+def hash_engine():
+    if not _ENGINE_HASH:
+        ret = sha1()
+        ret.update(sys.version)
+        for root, dirs, files in os.walk(ENGINE_DIR):
+            dirs.sort()
+            for fname in sorted(files):
+                if fname.endswith('.py'):
+                    path = os.path.join(root, fname)
+                    ret.update(os.path.relpath(path, ENGINE_DIR))
+                    ret.update(hash_file(path))
+        _ENGINE_HASH.append(ret.hexdigest())
+    return _ENGINE_HASH[0]
+
+def get_key(args):
+    state = dict((key, value) for key, value in vars(args).items()
+                 if key not in IGNORE_ARGS)
+    state['data'] = [hash_data(path) for path in [args.data] + args.add_data]
+    state['strategy'] = [os.path.basename(path) for path in args.strategy]
+    state['sources'] = hash_sources(args.strategy)
+    state['engine'] = hash_engine()
+    return sha1(json.dumps(state, sort_keys=True, default=str)).hexdigest()
+
+
+class Recorder(object):
+    def __init__(self, fp=None):
+        self.file = fp
+        self.data = []
+
+    def write(self, data):
+        self.data.append(data)
+        (sys.stdout if self.file is None else self.file).write(data)
+
+    def getvalue(self):
+        return ''.join(self.data)
+
+
+class ResultCache(object):
+    SUFFIX = '.pickle'
+
+    def __init__(self, path, max_size):
+        if max_size <= 0:
+            raise ValueError('invalid cache size: {0}'.format(max_size))
+        self.path = path
+        self.max_size = max_size
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def get_path(self, key):
+        return os.path.join(self.path, key + self.SUFFIX)
+
+    def get(self, key):
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as fp:
+                ret = pickle.load(fp)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path, None)
+        return ret
+
+    def put(self, key, value):
+        path = self.get_path(key)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as fp:
+            pickle.dump(value, fp, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for fname in os.listdir(self.path):
+            if fname.endswith(self.SUFFIX):
+                stat = os.stat(os.path.join(self.path, fname))
+                entries.append((stat.st_mtime, fname, stat.st_size))
+        entries.sort()
+        size = sum(entry[2] for entry in entries)
+        for _, fname, entry_size in entries:
+            if size <= self.max_size:
+                break
+            os.remove(os.path.join(self.path, fname))
+            size -= entry_size
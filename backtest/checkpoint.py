@@ -0,0 +1,39 @@
+import os
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+def get_path(path, tick):
+    return path.format(tick=tick)
+
+def save(path, tick, strategies):
+    state = {
+        'tick': tick,
+        'strategies': [
+            (str(strategy), strategy.started, strategy.get_snapshot())
+            for strategy in strategies
+        ]
+    }
+    path = get_path(path, tick)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fp:
+        pickle.dump(state, fp, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmp, path)
+    return path
+
+def load(path):
+    with open(path, 'rb') as fp:
+        return pickle.load(fp)
+
+def restore(state, strategies):
+    snapshots = state['strategies']
+    if len(snapshots) != len(strategies):
+        raise ValueError('snapshot strategy count mismatch: {0} != {1}'
+                         .format(len(snapshots), len(strategies)))
+    for strategy, (_, started, snapshot) in zip(strategies, snapshots):
+        strategy.set_snapshot(snapshot)
+        if not started:
+            strategy.started = False
+    return state['tick']
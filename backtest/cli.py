@@ -1,24 +1,38 @@
 from __future__ import print_function, division
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 from sys import exc_info
 from time import ctime
 from datetime import datetime
-from decimal import Decimal
-from traceback import print_tb
+from traceback import format_tb
 from random import randint
+from fractions import gcd
 
-from tqdm import trange
+from . import checkpoint
+from .cache import ResultCache, Recorder, get_key
+from .benchmark import get_baselines, get_prices, get_rates, get_value
+from .prune import Pruner, create_rules
+from .api import TradewaveAPI, Execution
+from .api.tradewave.util import MAX_PERIOD, INTERVALS
+from .events import EventLog
+from .data import (FileDataSource, MultiFileDataSource, find_dataset,
+                   split_dataset, DTYPES)
+from .progress import PROGRESS, create as create_progress, chunks
+from .util import parse_date, parse_time, parse_fee, parse_slippage
 
-from .api import TradewaveAPI
-from .data import FileDataSource
-from .util import TqdmFileWrapper, parse_date, parse_time
+
+LOOKBACK = MAX_PERIOD * max(INTERVALS.values())
 
 
 def create_argument_parser():
     parser = ArgumentParser()
     parser.add_argument('-p', '--pair', default=None,
                         help='primary currency pair')
+    parser.add_argument('-x', '--exchange', default=None,
+                        help='primary exchange')
+    parser.add_argument('-d', '--add-data', metavar='PATH',
+                        action='append', default=[],
+                        help='merge datasets from another data file')
     parser.add_argument('-P', '--portfolio', metavar='AMOUNT',
                         help='starting portfolio',
                         type=float, nargs=2, default=(1.0, 0.0))
@@ -31,61 +45,152 @@ def create_argument_parser():
     parser.add_argument('-i', '--interval', type=parse_time, default=None,
                         metavar='TIME',
                         help='interval (default: data interval)')
+    parser.add_argument('-lb', '--lookback', type=parse_time,
+                        default=LOOKBACK, metavar='TIME',
+                        help='time before the start time to load from '
+                             'chunked data files (default: {0} periods of '
+                             'the longest interval)'.format(MAX_PERIOD))
+    parser.add_argument('-dt', '--dtype', choices=DTYPES, default=None,
+                        help='price data type (default: data file type)')
+    parser.add_argument('-f', '--fee', type=parse_fee, default=0.0,
+                        metavar='RATE',
+                        help='trade fee rate (default: %(default)s)')
+    parser.add_argument('-pf', '--pair-fee', nargs=2, action='append',
+                        metavar=('PAIR', 'RATE'), default=[],
+                        help='trade fee rate for PAIR')
+    parser.add_argument('-s', '--slippage', type=parse_slippage,
+                        default=0.0,
+                        metavar='BPS',
+                        help='market order slippage in basis points '
+                        '(default: %(default)s)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='log strategy operations')
     parser.add_argument('-np', '--no-progress', action='store_true')
+    parser.add_argument('-pr', '--progress', choices=sorted(PROGRESS),
+                        default='bar',
+                        help='progress output (json: write progress '
+                        'records to stderr) (default: %(default)s)')
     parser.add_argument('-nP', '--no-plot', action='store_true')
+    parser.add_argument('-lf', '--log-format', choices=EventLog.FORMATS,
+                        default='text',
+                        help='strategy log format (default: %(default)s)')
+    parser.add_argument('-lo', '--log-output', metavar='PATH', default=None,
+                        help='strategy log file (default: stdout)')
+    parser.add_argument('-c', '--checkpoint', metavar='PATH', default=None,
+                        help='save snapshots to PATH '
+                        '("{tick}" is replaced with the tick index)')
+    parser.add_argument('-ci', '--checkpoint-interval', metavar='TICKS',
+                        type=int, default=10000,
+                        help='snapshot interval (default: %(default)s)')
+    parser.add_argument('-r', '--resume', metavar='PATH', default=None,
+                        help='resume from snapshot')
+    parser.add_argument('-w', '--walk-forward', metavar=('TRAIN', 'TEST'),
+                        type=parse_time, nargs=2, default=None,
+                        help='run rolling train/test windows')
+    parser.add_argument('-ws', '--window-step', metavar='TIME',
+                        type=parse_time, default=None,
+                        help='walk-forward window step (default: TEST)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='walk-forward worker processes '
+                        '(default: %(default)s)')
+    parser.add_argument('-pd', '--prune-drawdown', metavar='FRACTION',
+                        type=float, default=None,
+                        help='stop strategies with a drawdown '
+                        'above FRACTION')
+    parser.add_argument('-pl', '--prune-leader', metavar='FRACTION',
+                        type=float, default=None,
+                        help='stop strategies with equity below '
+                        'FRACTION of the leading strategy')
+    parser.add_argument('-ph', '--prune-halving', metavar='TICKS',
+                        type=int, default=None,
+                        help='keep the best 1/ETA of strategies '
+                        'at TICKS, TICKS*ETA, ...')
+    parser.add_argument('-pe', '--prune-eta', metavar='ETA',
+                        type=float, default=2,
+                        help='successive halving rate '
+                        '(default: %(default)s)')
+    parser.add_argument('-pi', '--prune-interval', metavar='TICKS',
+                        type=int, default=1000,
+                        help='pruning rule interval (default: %(default)s)')
+    parser.add_argument('-C', '--cache', metavar='PATH', default=None,
+                        help='reuse results of identical runs stored in PATH')
+    parser.add_argument('-cs', '--cache-size', metavar='MB',
+                        type=float, default=1024,
+                        help='result cache size limit (default: %(default)s)')
     parser.add_argument('data')
     parser.add_argument('strategy', nargs='+')
     return parser
 
+def error(strategy, stage, exit_on_error):
+    err = exc_info()
+    strategy.events.record(None, strategy, 'error', stage, repr(err[1]),
+                           ''.join(format_tb(err[2])))
+    if exit_on_error:
+        strategy.events.flush()
+        exit(1)
+
+def flush_events(strategies):
+    flushed = set()
+    for strategy in strategies:
+        if id(strategy.events) not in flushed:
+            flushed.add(id(strategy.events))
+            strategy.events.flush()
+
 def tick(strategies, i, exit_on_error):
     for strategy in strategies:
         try:
             strategy.tick(i)
         except Exception: # pylint: disable=broad-except
-            err = exc_info()
-            print('[ERROR] [{0}] tick {1}: {2}'
-                  .format(strategy, i, repr(err[1])))
-            print_tb(err[2])
-            if exit_on_error:
-                exit(1)
+            error(strategy, 'tick {0}'.format(i), exit_on_error)
             strategy.stop()
 
-def run(strategies, ticks, progress=True, exit_on_error=True):
+def run(strategies, ticks, progress=True, exit_on_error=True,
+        snapshot=None, checkpoint_path=None, checkpoint_interval=0,
+        pruner=None):
     for strategy in strategies:
         try:
             strategy.start()
         except Exception: # pylint: disable=broad-except
-            err = exc_info()
-            print('[ERROR] [{0}] start: {1}'
-                  .format(strategy, repr(err[1])))
-            print_tb(err[2])
-            if exit_on_error:
-                exit(1)
-
-    if progress:
-        with TqdmFileWrapper.stdout() as stdout:
-            for i in trange(ticks, leave=False, dynamic_ncols=True, file=stdout):
-                tick(strategies, i, exit_on_error)
-    else:
-        for i in xrange(ticks):
-            tick(strategies, i, exit_on_error)
+            error(strategy, 'start', exit_on_error)
 
-    for strategy in strategies:
-        try:
-            strategy.stop()
-        except Exception: # pylint: disable=broad-except
-            err = exc_info()
-            print('[ERROR] [{0}] stop: {1}'
-                  .format(strategy, repr(err[1])))
-            print_tb(err[2])
-            if exit_on_error:
-                exit(1)
+    start = 0
+    if snapshot is not None:
+        start = checkpoint.restore(snapshot, strategies) + 1
+
+    if checkpoint_path is None or checkpoint_interval <= 0:
+        checkpoint_interval = None
+
+    boundary = checkpoint_interval
+    if pruner is not None:
+        if boundary is None:
+            boundary = pruner.interval
+        else:
+            boundary = gcd(boundary, pruner.interval)
+
+    with create_progress(progress, ticks, start) as prog:
+        for begin, end in chunks(start, ticks, prog, boundary):
+            for i in xrange(begin, end):
+                tick(strategies, i, exit_on_error)
+            if pruner is not None and end % pruner.interval == 0:
+                for strategy in pruner.update(end - 1, strategies):
+                    try:
+                        strategy.stop()
+                    except Exception: # pylint: disable=broad-except
+                        error(strategy, 'stop', exit_on_error)
+            if checkpoint_interval and end % checkpoint_interval == 0:
+                checkpoint.save(checkpoint_path, end - 1, strategies)
+            flush_events(strategies)
+
+        for strategy in strategies:
+            try:
+                strategy.stop()
+            except Exception: # pylint: disable=broad-except
+                error(strategy, 'stop', exit_on_error)
+        flush_events(strategies)
 
     return [strategy.state for strategy in strategies]
 
-def plot(strategies, data, args):
+def plot(plot_data, price, start, step):
     import numpy as np
     import matplotlib.cm as cm
     import matplotlib.pyplot as plt
@@ -93,18 +198,12 @@ def plot(strategies, data, args):
 
     plt.style.use('dark_background')
 
-    start = args.begin
-    step = args.interval
     date_formatter = FuncFormatter(
         lambda x, _: datetime.fromtimestamp((int(start + x * step)))
     )
 
     fig, ax = plt.subplots()
 
-    price = data.get_plot(args.pair)
-
-    plot_data = [strategy.get_plots() for strategy in strategies]
-
     n_subplots = max(1, *(len(d) for d in plot_data))
     subplots = [
         plt.subplot(n_subplots, 1, n_subplots - i, sharex=ax)
@@ -170,87 +269,101 @@ def plot(strategies, data, args):
         subplot.legend(handles=handles, scatterpoints=1)
 
     ax.xaxis.set_major_formatter(date_formatter)
-    ax.set_xlim(0, args.max_ticks - 1)
+    ax.set_xlim(0, len(price) - 1)
     fig.autofmt_xdate()
     plt.show()
 
-def buy_and_hold(portfolio, data, max_ticks, pair):
-    currencies = pair.split('_')
-
-    start_price = Decimal(
-        data.get_current(0, pair)[data.CANDLE.close]
-    )
-    end_price = Decimal(
-        data.get_current(max_ticks - 1, pair)[data.CANDLE.close]
-    )
-
-    start_asset = Decimal(portfolio.get(currencies[0], 0))
-    start_currency = Decimal(portfolio.get(currencies[1], 0))
-
-    start_asset += start_currency / start_price
-    start_currency = 0
-
-    start_max_currency = start_asset * start_price
-    end_max_currency = start_asset * end_price
+def print_result(strategies, results, data, args, pruned=None, fp=None):
+    res = get_baselines(data, args.portfolio, args.pair,
+                        args.max_ticks, args.exchange)
+    rates = res['rates']
+    start_value = res['start_value']
 
-    return (start_price, end_price, start_asset,
-            start_max_currency, end_max_currency)
-
-def print_result(strategies, results, data, args):
-    (start_price, end_price,
-     start_max_asset, start_max_currency, bnh_end_currency) = buy_and_hold(
-         args.portfolio, data, args.max_ticks, args.pair
-     )
-
-    pair = args.pair
-    get_asset, get_currency = tuple(currency for currency in pair.split('_'))
-
-    pair = args.pair.upper()
-    asset, currency = tuple(currency for currency in pair.split('_'))
+    asset, currency = args.pair.upper().split('_')
+    prices = rates[asset.lower()]
+    start_price = prices[0]
+    end_price = prices[-1]
+    start_asset = start_value / start_price
 
     fmt = '{0}\t{1:.8f} {2}\t{3:.2f}\t{4:.8f} {5}\t{6:.2f}'
 
-    print('-' * 60)
-    print('Pair               ', pair)
-    print('Start date         ', ctime(args.begin))
-    print('End date           ', ctime(args.end))
-    print('Start price        ', '{0:.8f}'.format(start_price))
-    print('End price          ', '{0:.8f}'.format(end_price))
-    print('Start portfolio    ', args.portfolio)
-    print('Start max currency ',
-          '{0:.8f}'.format(start_max_currency),
-          currency)
-    print('Start max asset    ',
-          '{0:.8f}'.format(start_max_asset),
-          asset)
-    print('-' * 60)
-    print('Strategy\tMax currency\tROI currency\tMax asset\tROI asset')
-    print(fmt.format(
-        'buy and hold',
-        bnh_end_currency, currency, bnh_end_currency / start_max_currency,
-        start_max_asset, asset, 1.0
-    ))
-    for strategy, res in zip(strategies, results):
-        res_asset = Decimal(res.get(get_asset, 0))
-        res_currency = Decimal(res.get(get_currency, 0))
-        res_max_asset = res_asset + res_currency / end_price
-        res_max_currency = res_asset * end_price + res_currency
+    def print_value(name, value):
         print(fmt.format(
-            strategy,
-            res_max_currency, currency, res_max_currency / start_max_currency,
-            res_max_asset, asset, res_max_asset / start_max_asset
-        ))
-    print('-' * 60)
-
-def main():
-    parser = create_argument_parser()
-    args = parser.parse_args()
-
-    data = FileDataSource(
-        args.data,
-        start_time=args.begin,
-        tick_size=args.interval
-    )
+            name,
+            value, currency, value / start_value,
+            value / end_price, asset, value / end_price / start_asset
+        ), file=fp)
+
+    print('-' * 60, file=fp)
+    print('Pair               ', args.pair.upper(), file=fp)
+    if args.exchange is not None:
+        print('Exchange           ', args.exchange, file=fp)
+    print('Start date         ', ctime(args.begin), file=fp)
+    print('End date           ', ctime(args.end), file=fp)
+    print('Start price        ', '{0:.8f}'.format(start_price), file=fp)
+    print('End price          ', '{0:.8f}'.format(end_price), file=fp)
+    print('Start portfolio    ', args.portfolio, file=fp)
+    print('Start max currency ', '{0:.8f}'.format(start_value), currency,
+          file=fp)
+    print('Start max asset    ', '{0:.8f}'.format(start_asset), asset,
+          file=fp)
+    print('-' * 60, file=fp)
+    print('Strategy\tMax currency\tROI currency\tMax asset\tROI asset',
+          file=fp)
+    for name, series in res['baselines']:
+        print_value(name, series[-1])
+    for i, (strategy, portfolio) in enumerate(zip(strategies, results)):
+        name = str(strategy)
+        if pruned and i in pruned:
+            name += ' (pruned at tick {0})'.format(pruned[i][0])
+        print_value(name, get_value(portfolio, rates))
+    print('-' * 60, file=fp)
+
+def open_cache(args):
+    if args.cache is None or args.resume is not None \
+       or args.checkpoint is not None or args.walk_forward is not None:
+        return None, None
+    try:
+        cache = ResultCache(args.cache, int(args.cache_size * 1048576))
+    except (OSError, ValueError) as err:
+        print('Error: invalid cache:', err)
+        exit(1)
+    return cache, get_key(args)
+
+def print_cached(cached, args):
+    log_output = None
+    if args.log_output is not None:
+        log_output = open(args.log_output, 'w')
+    print(cached['log'], end='', file=log_output)
+    if log_output is not None:
+        log_output.close()
+    print(cached['report'], end='')
+    if not args.no_plot:
+        plot(cached['plots'], cached['price'], cached['begin'],
+             cached['interval'])
+
+def load_data(args):
+    try:
+        if args.add_data:
+            data = MultiFileDataSource(
+                [args.data] + args.add_data,
+                start_time=args.begin,
+                tick_size=args.interval,
+                end_time=args.end,
+                dtype=args.dtype
+            )
+        else:
+            data = FileDataSource(
+                args.data,
+                start_time=args.begin,
+                tick_size=args.interval,
+                end_time=args.end,
+                lookback=args.lookback,
+                dtype=args.dtype
+            )
+    except ValueError as err:
+        print('Error: invalid data:', err)
+        exit(1)
 
     if args.begin is None:
         args.begin = data.start_time
@@ -272,30 +385,139 @@ def main():
 
     args.max_ticks = min(args.max_ticks, data.get_max_ticks())
 
-    if args.pair is None:
-        try:
-            args.pair = next(iter(data.datasets()))
-        except StopIteration:
-            print('Error: data source is empty')
-            exit(1)
-    else:
+    if args.pair is not None:
         args.pair = args.pair.lower()
 
+    try:
+        args.pair, args.exchange, args.dataset = find_dataset(
+            data, args.pair, args.exchange
+        )
+    except ValueError:
+        print('Error: data source is empty')
+        exit(1)
+
+    for dataset in data.datasets():
+        exchange = split_dataset(dataset)[0]
+        if exchange is not None:
+            TradewaveAPI.add_exchange(exchange)
+
+    return data
+
+def create_execution(parser, args):
+    pair_fees = {}
+    for pair, fee in args.pair_fee:
+        try:
+            pair_fees[pair.lower()] = parse_fee(fee)
+            TradewaveAPI.add_pair(pair.lower())
+        except (ArgumentTypeError, ValueError) as err:
+            parser.error('argument -pf/--pair-fee: {0}'.format(err))
+    return Execution(
+        fees=dict.fromkeys(TradewaveAPI.CONST_ENV['currencies'], args.fee),
+        pair_fees=pair_fees,
+        slippage=args.slippage
+    )
+
+def create_pruner(data, args):
+    try:
+        rules = create_rules(args.prune_drawdown, args.prune_leader,
+                             args.prune_halving, args.prune_eta)
+        if not rules:
+            return None
+        pairs, prices = get_prices(data, args.max_ticks, args.exchange)
+        rates = get_rates(pairs, prices, args.pair.split('_')[1])
+        return Pruner(rules, rates, args.prune_interval, args.portfolio)
+    except ValueError as err:
+        print('Error:', err)
+        exit(1)
+
+def run_walk_forward(data, args, api_args):
+    from .walkforward import walk_forward, print_windows
+    train, test = args.walk_forward
+    print_windows(walk_forward(data, args.strategy, args.portfolio,
+                               args.pair, args.begin,
+                               args.begin + args.max_ticks * args.interval,
+                               train, test, args.window_step,
+                               args.jobs, api_args))
+
+def main():
+    parser = create_argument_parser()
+    args = parser.parse_args()
+
+    cache, key = open_cache(args)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            print_cached(cached, args)
+            return
+
+    data = load_data(args)
+
     TradewaveAPI.add_pair(args.pair)
 
     args.portfolio = dict(zip(args.pair.split('_'), args.portfolio))
 
+    api_args = {
+        'execution': create_execution(parser, args),
+        'primary_exchange': args.exchange
+    }
+
+    if args.walk_forward is not None:
+        run_walk_forward(data, args, api_args)
+        return
+
+    log_output = None
+    if args.log_output is not None:
+        log_output = open(args.log_output, 'w')
+    if cache is not None:
+        log_output = Recorder(log_output)
+
+    events = EventLog(log_output, args.log_format, flush_interval=10000)
+
     strategies = [
         TradewaveAPI(fname, args.portfolio, data,
                      max_ticks=args.max_ticks,
                      primary_pair=args.pair,
-                     verbose=args.verbose)
+                     verbose=args.verbose,
+                     events=events,
+                     **api_args)
         for fname in args.strategy
     ]
 
-    res = run(strategies, args.max_ticks, not args.no_progress)
-
-    print_result(strategies, res, data, args)
+    pruner = create_pruner(data, args)
+
+    snapshot = None
+    if args.resume is not None:
+        snapshot = checkpoint.load(args.resume)
+
+    res = run(strategies, args.max_ticks,
+              'none' if args.no_progress else args.progress,
+              snapshot=snapshot,
+              checkpoint_path=args.checkpoint,
+              checkpoint_interval=args.checkpoint_interval,
+              pruner=pruner)
+
+    pruned = None if pruner is None else pruner.pruned
+    plot_data = [[(dict(plots), dict(points))
+                  for plots, points in strategy.get_plots()]
+                 for strategy in strategies]
+    price = data.get_plot(args.dataset, args.max_ticks)
+
+    report = Recorder()
+    print_result(strategies, res, data, args, pruned, report)
+
+    if cache is not None:
+        cache.put(key, {
+            'log': log_output.getvalue(),
+            'report': report.getvalue(),
+            'plots': plot_data,
+            'price': price,
+            'begin': args.begin,
+            'interval': args.interval
+        })
+        log_output = log_output.file
+
+    if log_output is not None:
+        log_output.close()
 
     if not args.no_plot:
-        plot(strategies, data, args)
+        plot(plot_data, price, args.begin, args.interval)
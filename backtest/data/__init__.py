@@ -1,2 +1,4 @@
-from .base import DataSource
-from .array import ArrayDataSource, FileDataSource
+from .base import (DataSource, split_dataset, get_dataset, get_exchanges,
+                   find_dataset, DTYPES)
+from .array import ArrayDataSource, FileDataSource, MultiFileDataSource
+from .shared import DataServer, open_shared
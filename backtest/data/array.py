@@ -1,19 +1,172 @@
 from __future__ import division
-import numpy as np
 
-from .base import DataSource
+from math import sqrt
+from sys import float_info
+from fractions import gcd
+from functools import partial
+from collections import OrderedDict
+
+from .base import DataSource, Accessor, PanelAccessor
+from .header import INFO, HEADER, LazyData, read_header, load_array
+from .chunked import CHUNKED, BlockReader
+from ..util import lazy_import
+
+np = lazy_import('numpy')
+
+
+STATS_BLOCK = 256
+
+
+def rolling(values, step, ufunc):
+    length = len(values)
+    padded = np.empty(-(-length // step) * step, dtype=values.dtype)
+    padded[:length] = values
+    padded[length:] = values[-1]
+    blocks = padded.reshape(-1, step)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[:length - step + 1], prefix[step - 1:length])
+
+def strided_cumsum(values, step, block=None):
+    length = len(values)
+    rows = -(-length // step)
+    if block is None:
+        block = max(rows, 1)
+    padded = np.zeros((-(-rows // block) * block * step,) + values.shape[1:],
+                      dtype=values.dtype)
+    padded[:length] = values
+    blocks = padded.reshape((-1, block, step) + values.shape[1:])
+    ret = np.zeros((length + step,) + values.shape[1:], dtype=values.dtype)
+    ret[step:] = np.cumsum(blocks, axis=1).reshape(padded.shape)[:length]
+    return ret
+
+def block_anchors(length, step, block=STATS_BLOCK):
+    rows = np.arange(length)
+    return rows - rows // step % block * step
+
+
+def window_stats(sums, values, start, end, step, block=STATS_BLOCK):
+    length = (end - start) // step
+    first = start - start // step % block * step
+    anchor = float(values[first])
+    total = square = magnitude = shift = 0.0
+    while True:
+        stop = min(end, first + block * step)
+        stop_total, stop_sq = sums[stop].tolist()
+        if start == first:
+            start_total = start_sq = 0.0
+        else:
+            start_total, start_sq = sums[start].tolist()
+        piece = stop_total - start_total
+        count = (stop - start) // step
+        square += stop_sq - start_sq + shift * (2 * piece + count * shift)
+        total += piece + count * shift
+        magnitude += stop_sq + start_sq
+        if stop == end:
+            break
+        start = first = stop
+        shift = float(values[first]) - anchor
+    mean = total / length
+    var = square - total * mean
+    if var <= block * float_info.epsilon * (magnitude + square):
+        return None
+    return anchor + mean, sqrt(var / length)
+
+
+class ArrayAccessor(Accessor):
+    def __init__(self, source, dataset, interval=None):
+        super(ArrayAccessor, self).__init__(source, dataset, interval)
+        self.ticks = source.get_max_ticks(dataset)
+        if self.ticks == 0:
+            raise KeyError('dataset {0} not found'.format(dataset))
+        self.step = source.get_step(interval, dataset)
+        self.aligned = interval is None
+        self.offset, self.multiplier, _ = source.get_layout(dataset)
+        self.data = source.data[dataset]
+        self.resampled = source.resample(dataset, self.step)
+        self.columns = {}
+
+    def get_start(self, tick):
+        if tick < 0 or tick >= self.ticks:
+            raise IndexError('tick {0} out of range'.format(tick))
+        return self.offset + tick * self.multiplier
+
+    def candle(self, tick):
+        start = self.get_start(tick)
+        if not self.aligned:
+            start -= (tick * self.multiplier) % self.step
+        if start < len(self.resampled):
+            return self.resampled[start]
+        data = self.data[start:start + self.step]
+        ret = np.empty(self.source.CANDLE_SIZE, dtype=data.dtype)
+        self.source.merge(data, ret)
+        return ret
+
+    def window(self, tick, length):
+        end = self.get_start(tick)
+        start = end - length * self.step
+        if start < 0:
+            raise IndexError('window {0}:{1} out of bounds'.format(start, end))
+        if self.step == 1:
+            return self.data[start:end]
+        return self.resampled[start:end - self.step + 1:self.step]
+
+    def stats(self, tick, length, column):
+        end = self.get_start(tick)
+        start = end - length * self.step
+        if start < 0 or length <= 0:
+            raise IndexError('window {0}:{1} out of bounds'.format(start, end))
+        try:
+            sums, values = self.columns[column]
+        except KeyError:
+            sums = self.source.get_sums(self.dataset, column, self.step)
+            values = self.resampled[:, column]
+            self.columns[column] = sums, values
+        ret = window_stats(sums, values, start, end, self.step)
+        if ret is None:
+            values = self.window(tick, length)[:, column]
+            return values.mean(dtype=np.float64), values.std(dtype=np.float64)
+        return ret
+
+
+class ArrayPanelAccessor(PanelAccessor):
+    def __init__(self, source, datasets, interval=None):
+        super(ArrayPanelAccessor, self).__init__(source, datasets, interval)
+        self.ticks = max([source.get_max_ticks(dataset)
+                          for dataset in self.datasets] or [0])
+        if self.ticks == 0:
+            raise KeyError('datasets {0} not found'.format(self.datasets))
+        if len(set(source.get_layout(dataset)
+                   for dataset in self.datasets)) > 1:
+            self.offset, self.multiplier, self.step, self.data = \
+                source.get_aligned_panel(self.datasets, interval)
+        else:
+            dataset = self.datasets[0] if self.datasets else None
+            self.step = source.get_step(interval, dataset)
+            self.offset, self.multiplier, _ = source.get_layout(dataset)
+            self.data = source.get_panel(self.datasets, self.step)
+
+    def window(self, tick, length):
+        if tick < 0 or tick >= self.ticks:
+            raise IndexError('tick {0} out of range'.format(tick))
+        end = self.offset + tick * self.multiplier
+        start = end - length * self.step
+        if start < 0:
+            raise IndexError('window {0}:{1} out of bounds'.format(start, end))
+        return self.data[start:end - self.step + 1:self.step]
 
 
 class ArrayDataSource(DataSource):
     def __init__(self, data,
                  start_time=None, tick_size=None,
-                 data_start_time=None, data_tick_size=None):
+                 data_start_time=None, data_tick_size=None,
+                 end_time=None, cache=None, layouts=None):
         if start_time is None:
             start_time = data_start_time
         if tick_size is None:
             tick_size = data_tick_size
 
-        super(ArrayDataSource, self).__init__(start_time, tick_size)
+        super(ArrayDataSource, self).__init__(start_time, tick_size, end_time)
 
         if data_start_time is None:
             if self.start_time is None:
@@ -29,6 +182,24 @@ class ArrayDataSource(DataSource):
             else:
                 data_tick_size = self.tick_size
 
+        data_start_time, self.tick_offset, self.tick_multiplier = \
+            self.align(data_start_time, data_tick_size)
+        self.data_start_time = data_start_time
+        self.data_tick_size = data_tick_size
+        self.layouts = {}
+        self.offsets = {}
+        for dataset, (start, tick) in (layouts or {}).items():
+            try:
+                start, offset, multiplier = self.align(start, tick)
+            except ValueError as err:
+                raise ValueError('{0}: {1}'.format(dataset, err))
+            self.layouts[dataset] = start, tick
+            self.offsets[dataset] = offset, multiplier, tick
+        self.data = data
+        self.cache = {} if cache is None else cache
+        self.accessors = {}
+
+    def align(self, data_start_time, data_tick_size):
         if data_start_time < 0 or data_tick_size <= 0:
             raise ValueError('invalid data: start_time={0} tick_size={1}'
                              .format(data_start_time, data_tick_size))
@@ -44,11 +215,15 @@ class ArrayDataSource(DataSource):
             raise ValueError('tick_size ({0}) % data_tick_size ({1}) != 0'
                              .format(self.tick_size, data_tick_size))
 
-        self.tick_multiplier = self.tick_size // data_tick_size
-        self.tick_offset = (self.start_time - data_start_time) // data_tick_size
-        self.data_start_time = data_start_time
-        self.data_tick_size = data_tick_size
-        self.data = data
+        return (data_start_time,
+                (self.start_time - data_start_time) // data_tick_size,
+                self.tick_size // data_tick_size)
+
+    def get_layout(self, dataset=None):
+        try:
+            return self.offsets[dataset]
+        except KeyError:
+            return self.tick_offset, self.tick_multiplier, self.data_tick_size
 
     def __contains__(self, dataset):
         return dataset in self.data
@@ -57,16 +232,161 @@ class ArrayDataSource(DataSource):
         return self.data.keys()
 
     def get_max_ticks(self, dataset=None):
+        if dataset is None:
+            return min([self.get_max_ticks(dataset)
+                        for dataset in self.datasets()] or [0])
+
         try:
-            if dataset is None:
-                length = min(len(self.data[dataset])
-                             for dataset in self.datasets())
-            else:
-                length = len(self.data[dataset])
+            length = self.get_length(dataset)
         except (KeyError, ValueError):
             return 0
 
-        return (length - self.tick_offset) // self.tick_multiplier
+        offset, multiplier, _ = self.get_layout(dataset)
+        ret = (length - offset) // multiplier
+        if self.end_time is not None:
+            ret = min(ret, (self.end_time - self.start_time)
+                      // self.tick_size + 1)
+        return max(ret, 0)
+
+    def get_length(self, dataset):
+        return len(self.data[dataset])
+
+    def view(self, start_time=None, end_time=None, tick_size=None):
+        return ArrayDataSource(
+            self.data,
+            self.start_time if start_time is None else start_time,
+            self.tick_size if tick_size is None else tick_size,
+            self.data_start_time, self.data_tick_size,
+            self.end_time if end_time is None else end_time,
+            self.cache, self.layouts
+        )
+
+    def resample(self, dataset, step):
+        if step == 1:
+            return self.data[dataset]
+
+        key = ('resample', dataset, step)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        data = self.data[dataset]
+        if len(data) < step:
+            ret = np.empty((0, self.CANDLE_SIZE), dtype=data.dtype)
+        else:
+            ret = np.empty((len(data) - step + 1, self.CANDLE_SIZE),
+                           dtype=data.dtype)
+            ret[:, self.CANDLE.high] = rolling(data[:, self.CANDLE.high],
+                                               step, np.maximum)
+            ret[:, self.CANDLE.low] = rolling(data[:, self.CANDLE.low],
+                                              step, np.minimum)
+            ret[:, self.CANDLE.open] = data[:len(ret), self.CANDLE.open]
+            ret[:, self.CANDLE.close] = data[step - 1:, self.CANDLE.close]
+
+        self.cache[key] = ret
+        return ret
+
+    def accessor(self, dataset, interval=None):
+        try:
+            return self.accessors[dataset, interval]
+        except KeyError:
+            ret = ArrayAccessor(self, dataset, interval)
+            self.accessors[dataset, interval] = ret
+            return ret
+
+    def panel(self, datasets, interval=None):
+        key = tuple(datasets), interval
+        try:
+            return self.accessors[key]
+        except KeyError:
+            ret = self.accessors[key] = ArrayPanelAccessor(self, datasets,
+                                                           interval)
+            return ret
+
+    def get_step(self, interval=None, dataset=None):
+        _, multiplier, data_tick_size = self.get_layout(dataset)
+        if interval is None:
+            return multiplier
+        if interval <= 0:
+            raise ValueError('invalid interval {0}'.format(interval))
+        if interval % data_tick_size:
+            raise ValueError('interval % data_tick_size != 0: {0} {1}'
+                             .format(data_tick_size, interval))
+        return interval // data_tick_size
+
+    def get_panel(self, datasets, step=1):
+        key = ('panel', step) + tuple(datasets)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        data = [self.resample(dataset, step) for dataset in datasets]
+        dtype = np.result_type(np.float32, *[values.dtype for values in data])
+        ret = np.empty((max([len(values) for values in data] or [0]),
+                        len(data), self.CANDLE_SIZE), dtype=dtype)
+        ret.fill(np.nan)
+        for i, values in enumerate(data):
+            ret[:len(values), i] = values
+
+        self.cache[key] = ret
+        return ret
+
+    def get_aligned_panel(self, datasets, interval=None):
+        if interval is None:
+            interval = self.tick_size
+        grid = gcd(self.tick_size, interval)
+        layouts = []
+        for dataset in datasets:
+            offset, _, data_tick_size = self.get_layout(dataset)
+            layouts.append((dataset, self.get_step(interval, dataset),
+                            self.start_time - offset * data_tick_size,
+                            data_tick_size))
+        base = min(start for _, _, start, _ in layouts)
+        base -= base % grid
+        layout = (self.start_time - base) // grid, self.tick_size // grid, \
+                 interval // grid
+
+        key = ('panel', base, grid, interval) + tuple(datasets)
+        try:
+            return layout + (self.cache[key],)
+        except KeyError:
+            pass
+
+        data = [self.resample(dataset, step)
+                for dataset, step, _, _ in layouts]
+        rows = max([(start + (len(values) - 1) * tick - base) // grid + 1
+                    for values, (_, _, start, tick) in zip(data, layouts)
+                    if len(values)] or [0])
+        dtype = np.result_type(np.float32, *[values.dtype for values in data])
+        ret = np.empty((rows, len(data), self.CANDLE_SIZE), dtype=dtype)
+        ret.fill(np.nan)
+        for i, (values, (_, _, start, tick)) in enumerate(zip(data, layouts)):
+            first = -(-(start - base) // grid)
+            skip = (base + first * grid - start) // tick
+            values = values[skip::grid // tick]
+            ret[first:first + len(values), i] = values
+
+        self.cache[key] = ret
+        return layout + (ret,)
+
+    def get_sums(self, dataset, column, step):
+        key = ('sums', dataset, column, step)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        data = self.resample(dataset, step)[:, column]
+        values = np.empty((len(data), 2), dtype=np.float64)
+        values[:, 0] = data
+        values[:, 0] -= data[block_anchors(len(data), step)]
+        np.square(values[:, 0], out=values[:, 1])
+
+        ret = strided_cumsum(values, step, STATS_BLOCK)
+        self.cache[key] = ret
+        return ret
 
     def _get_current(self, dataset, tick, interval):
         max_ticks = self.get_max_ticks(dataset)
@@ -76,26 +396,21 @@ class ArrayDataSource(DataSource):
         if tick >= max_ticks:
             raise IndexError('tick {0} out of range'.format(tick))
 
+        tick_offset, multiplier, _ = self.get_layout(dataset)
+        step = self.get_step(interval, dataset)
         if interval is None:
-            step = self.tick_multiplier
             offset = 0
         else:
-            if interval <= 0:
-                raise ValueError('invalid interval {0}'.format(interval))
-            if interval % self.data_tick_size:
-                raise ValueError('interval % data_tick_size != 0: {0} {1}'
-                                 .format(self.data_tick_size, interval))
-            step = interval // self.data_tick_size
-            offset = (tick * self.tick_multiplier) % step
+            offset = (tick * multiplier) % step
 
-        start = self.tick_offset + tick * self.tick_multiplier
+        start = tick_offset + tick * multiplier
 
         if start < 0:
             raise IndexError('tick {0} out of range'.format(tick))
 
         return start, step, offset
 
-    def _merge(self, data, dst):
+    def merge(self, data, dst):
         dst[self.CANDLE.high] = max(data[:, self.CANDLE.high])
         dst[self.CANDLE.low] = min(data[:, self.CANDLE.low])
         dst[self.CANDLE.open] = data[0, self.CANDLE.open]
@@ -106,11 +421,13 @@ class ArrayDataSource(DataSource):
         start -= offset
         if step == 1:
             return self.data[dataset][start]
-        else:
-            data = self.data[dataset][start:start + step]
-            ret = np.empty(self.CANDLE_SIZE, dtype=data.dtype)
-            self._merge(data, ret)
-            return ret
+        data = self.resample(dataset, step)
+        if start < len(data):
+            return data[start]
+        data = self.data[dataset][start:start + step]
+        ret = np.empty(self.CANDLE_SIZE, dtype=data.dtype)
+        self.merge(data, ret)
+        return ret
 
     def get_prev(self, tick, length, dataset, interval=None):
         end, step, _ = self._get_current(dataset, tick, interval)
@@ -124,13 +441,9 @@ class ArrayDataSource(DataSource):
             )
 
         if step == 1:
-            ret = self.data[dataset][start:end:step]
+            ret = self.data[dataset][start:end]
         else:
-            data = self.data[dataset][start:end]
-            data = np.split(data, length)
-            ret = np.empty((len(data), self.CANDLE_SIZE), dtype=data[0].dtype)
-            for i, interval in enumerate(data):
-                self._merge(interval, ret[i])
+            ret = self.resample(dataset, step)[start:end - step + 1:step]
 
         if len(ret) != length:
             raise IndexError('get_prev {0} {1} {2} out of bounds'
@@ -138,6 +451,29 @@ class ArrayDataSource(DataSource):
 
         return ret
 
+    def get_stats(self, tick, length, dataset, column, interval=None):
+        end, step, _ = self._get_current(dataset, tick, interval)
+        start = end - length * step
+
+        if start < 0 or length <= 0:
+            raise IndexError(
+                'interval {0}:{1} (tick={2} length={3}) out of bounds'
+                .format(start, end, tick, length)
+            )
+
+        sums = self.get_sums(dataset, column, step)
+        if end >= len(sums):
+            raise IndexError('get_stats {0} {1} {2} out of bounds'
+                             .format(tick, length, dataset))
+
+        ret = window_stats(sums, self.resample(dataset, step)[:, column],
+                           start, end, step)
+        if ret is None:
+            return super(ArrayDataSource, self).get_stats(
+                tick, length, dataset, column, interval
+            )
+        return ret
+
     def get_plot(self, dataset, ticks=None):
         max_ticks = self.get_max_ticks(dataset)
         if ticks is None:
@@ -152,18 +488,133 @@ class ArrayDataSource(DataSource):
         return self.data[dataset][start:end:step, self.CANDLE.close]
 
 
+def cast(data, dtype=None):
+    if dtype is None:
+        return data
+    if isinstance(data, LazyData):
+        load = data.load
+        data.load = lambda name: load(name).astype(dtype, copy=False)
+        return data
+    return dict((name, values.astype(dtype, copy=False))
+                for name, values in data.items())
+
+
 class FileDataSource(ArrayDataSource):
-    def __init__(self, path, start_time=None, tick_size=None):
-        data_start_time, data_tick_size, data = self.load(path)
+    def __init__(self, path, start_time=None, tick_size=None, end_time=None,
+                 lazy=False, lookback=None, dtype=None):
+        header = read_header(path)
+        if header.get('format') == CHUNKED:
+            data_start_time, data_tick_size, data = self.load_blocks(
+                path, header, start_time, tick_size, end_time, lookback, lazy
+            )
+        elif lazy:
+            data_start_time = header['start_time']
+            data_tick_size = header['tick_size']
+            data = LazyData(header['datasets'],
+                            partial(load_array, path), header)
+        else:
+            data_start_time, data_tick_size, data = self.load(path)
+
+        data = cast(data, dtype)
         super(FileDataSource, self).__init__(data,
                                              start_time, tick_size,
-                                             data_start_time, data_tick_size)
+                                             data_start_time, data_tick_size,
+                                             end_time)
+        self.lazy = lazy
+
+    def get_length(self, dataset):
+        if self.lazy:
+            return self.data.length(dataset)
+        return len(self.data[dataset])
 
     @staticmethod
     def load(path):
         with np.load(path) as npz:
-            info = npz['info']
-            data_start_time = info[0]
-            data_tick_size = info[1]
-            data = dict((k, v) for k, v in npz.items() if k != 'info')
+            data_start_time, data_tick_size = npz[INFO].tolist()
+            data = dict((k, v) for k, v in npz.items()
+                        if k not in (INFO, HEADER))
             return data_start_time, data_tick_size, data
+
+    @staticmethod
+    def load_blocks(path, header, start_time=None, tick_size=None,
+                    end_time=None, lookback=None, lazy=False):
+        data_tick_size = header['tick_size']
+        data_start_time = header['start_time']
+        data_start_time -= data_start_time % data_tick_size
+        if tick_size is None:
+            tick_size = data_tick_size
+
+        first = 0
+        if start_time is not None:
+            start_time -= start_time % tick_size
+            if lookback is not None:
+                start_time -= lookback
+            first = max((start_time - data_start_time) // data_tick_size, 0)
+            first -= first % header['block_rows']
+
+        last = None
+        if end_time is not None:
+            last = ((end_time - data_start_time) // data_tick_size
+                    + max(tick_size // data_tick_size, 1))
+
+        lengths = dict(
+            (name, max(min(rows, rows if last is None else last) - first, 0))
+            for name, rows in header['datasets'].items()
+        )
+        reader = BlockReader(path, header)
+        load = lambda name: reader.rows(name, first, first + lengths[name])
+        if lazy:
+            data = LazyData(lengths, load, header)
+        else:
+            data = dict((name, load(name)) for name in lengths)
+            reader.close()
+
+        return (data_start_time + first * data_tick_size,
+                data_tick_size, data)
+
+
+class MultiFileDataSource(ArrayDataSource):
+    def __init__(self, paths, start_time=None, tick_size=None, end_time=None,
+                 dtype=None):
+        files = self.load(paths)
+        data = OrderedDict()
+        layouts = {}
+        for data_start_time, data_tick_size, values in files:
+            if data_tick_size <= 0:
+                raise ValueError('invalid data: tick_size={0}'
+                                 .format(data_tick_size))
+            values = cast(values, dtype)
+            for name in values:
+                if name in data:
+                    raise ValueError('duplicate dataset {0}'.format(name))
+                data[name] = values[name]
+                layouts[name] = data_start_time, data_tick_size
+
+        if tick_size is None:
+            tick_size = 1
+            for _, data_tick_size, _ in files:
+                tick_size *= data_tick_size // gcd(tick_size, data_tick_size)
+        if start_time is None:
+            start_time = max(start - start % tick for start, tick, _ in files)
+            start_time = -(-start_time // tick_size) * tick_size
+
+        data_start_time, data_tick_size, _ = files[0]
+        super(MultiFileDataSource, self).__init__(data,
+                                                  start_time, tick_size,
+                                                  data_start_time,
+                                                  data_tick_size,
+                                                  end_time,
+                                                  layouts=layouts)
+
+    @staticmethod
+    def load(paths):
+        files = []
+        for path in paths:
+            header = read_header(path)
+            if header.get('format') == CHUNKED:
+                files.append(FileDataSource.load_blocks(path, header))
+            else:
+                files.append(FileDataSource.load(path))
+        if not files:
+            raise ValueError('no data files')
+        return files
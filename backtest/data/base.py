@@ -1,11 +1,80 @@
-from ..util import enum
+from ..util import enum, lazy_import
+
+np = lazy_import('numpy')
+
+
+EXCHANGE_SEPARATOR = ':'
+DTYPES = ['float32', 'float64']
+
+
+def split_dataset(dataset):
+    exchange, _, pair = dataset.rpartition(EXCHANGE_SEPARATOR)
+    return exchange or None, pair
+
+def get_dataset(source, pair, exchange=None):
+    if exchange is not None:
+        dataset = exchange + EXCHANGE_SEPARATOR + pair
+        if dataset in source:
+            return dataset
+    return pair
+
+def get_exchanges(source, pair):
+    return sorted(exchange for exchange, name in
+                  (split_dataset(dataset) for dataset in source.datasets())
+                  if exchange is not None and name == pair)
+
+def find_dataset(source, pair=None, exchange=None):
+    if pair is None:
+        try:
+            dataset = next(iter(source.datasets()))
+        except StopIteration:
+            raise ValueError('empty data source')
+        default, pair = split_dataset(dataset)
+        if exchange is None:
+            exchange = default
+    if exchange is None and pair not in source:
+        exchanges = get_exchanges(source, pair)
+        if exchanges:
+            exchange = exchanges[0]
+    return pair, exchange, get_dataset(source, pair, exchange)
+
+
+class Accessor(object):
+    def __init__(self, source, dataset, interval=None):
+        self.source = source
+        self.dataset = dataset
+        self.interval = interval
+
+    def candle(self, tick):
+        return self.source.get_current(tick, self.dataset, self.interval)
+
+    def window(self, tick, length):
+        return self.source.get_prev(tick, length, self.dataset, self.interval)
+
+    def stats(self, tick, length, column):
+        return self.source.get_stats(tick, length, self.dataset,
+                                     column, self.interval)
+
+
+class PanelAccessor(object):
+    def __init__(self, source, datasets, interval=None):
+        self.source = source
+        self.datasets = list(datasets)
+        self.interval = interval
+
+    def window(self, tick, length):
+        return np.stack([self.source.get_prev(tick, length, dataset,
+                                              self.interval)
+                         for dataset in self.datasets], axis=1)
+
 
 class DataSource(object):
     CANDLE_VALUES = ['high', 'low', 'open', 'close']
     CANDLE_SIZE = len(CANDLE_VALUES)
     CANDLE = enum(CANDLE_VALUES)
 
-    def __init__(self, start_time=None, tick_size=None):
+    def __init__(self, start_time=None, tick_size=None, end_time=None):
+        self.end_time = end_time
         if start_time is None or tick_size is None:
             self.start_time = start_time
             self.tick_size = tick_size
@@ -31,3 +100,16 @@ class DataSource(object):
 
     def get_prev(self, tick, length, dataset, interval=None):
         raise NotImplementedError()
+
+    def get_stats(self, tick, length, dataset, column, interval=None):
+        values = self.get_prev(tick, length, dataset, interval)[:, column]
+        return values.mean(dtype=np.float64), values.std(dtype=np.float64)
+
+    def accessor(self, dataset, interval=None):
+        return Accessor(self, dataset, interval)
+
+    def panel(self, datasets, interval=None):
+        return PanelAccessor(self, datasets, interval)
+
+    def view(self, start_time=None, end_time=None, tick_size=None):
+        raise NotImplementedError()
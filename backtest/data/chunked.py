@@ -0,0 +1,69 @@
+from zipfile import ZipFile, ZIP_DEFLATED
+from io import BytesIO
+import json
+
+from .header import INFO, HEADER, create_header
+from ..util import lazy_import
+
+np = lazy_import('numpy')
+
+
+CHUNKED = 'chunked'
+BLOCK_ROWS = 4096
+
+
+def block_name(name, index):
+    return 'blocks/{0}/{1}'.format(name, index)
+
+def write_array(archive, name, array):
+    buf = BytesIO()
+    np.lib.format.write_array(buf, np.asanyarray(array))
+    archive.writestr(name + '.npy', buf.getvalue())
+
+def save_chunked(path, start_time, tick_size, data, block_rows=BLOCK_ROWS):
+    if block_rows <= 0:
+        raise ValueError('invalid block size: {0}'.format(block_rows))
+
+    header = create_header(start_time, tick_size, data)
+    header['format'] = CHUNKED
+    header['block_rows'] = block_rows
+
+    with ZipFile(path, 'w', ZIP_DEFLATED, allowZip64=True) as archive:
+        write_array(archive, INFO,
+                    np.array([start_time, tick_size], dtype=int))
+        write_array(archive, HEADER, np.array(json.dumps(header)))
+        for name, values in data.items():
+            for index, start in enumerate(range(0, len(values), block_rows)):
+                write_array(archive, block_name(name, index),
+                            values[start:start + block_rows])
+
+
+class BlockReader(object):
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.block_rows = header['block_rows']
+        self.archive = None
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def block(self, name, index):
+        if self.archive is None:
+            self.archive = ZipFile(self.path)
+        with self.archive.open(block_name(name, index) + '.npy') as fp:
+            return np.lib.format.read_array(BytesIO(fp.read()))
+
+    def rows(self, name, start, stop):
+        stop = min(stop, self.header['datasets'][name])
+        if start >= stop:
+            return np.empty((0, len(self.header['columns'])))
+        first = start // self.block_rows
+        last = (stop - 1) // self.block_rows
+        blocks = [self.block(name, index) for index in range(first, last + 1)]
+        offset = first * self.block_rows
+        if len(blocks) == 1:
+            return blocks[0][start - offset:stop - offset]
+        return np.concatenate(blocks)[start - offset:stop - offset]
@@ -0,0 +1,46 @@
+from __future__ import print_function
+
+from backtest.data import FileDataSource, DTYPES
+from backtest.data.header import save
+from backtest.data.chunked import CHUNKED, BLOCK_ROWS, save_chunked
+
+
+FORMATS = ['npz', CHUNKED]
+
+
+def create_argument_parser(parser):
+    parser.add_argument(
+        '-f', '--format',
+        help='output format (default: %(default)s)',
+        choices=FORMATS, default=CHUNKED
+    )
+    parser.add_argument(
+        '-br', '--block-rows', metavar='ROWS',
+        help='rows per compressed block (default: %(default)s)',
+        type=int, default=BLOCK_ROWS
+    )
+    parser.add_argument(
+        '-dt', '--dtype',
+        help='price data type (default: input type)',
+        choices=DTYPES, default=None
+    )
+    parser.add_argument('input')
+    parser.add_argument('output')
+    return parser
+
+
+def main(args):
+    src = FileDataSource(args.input, dtype=args.dtype)
+    data = dict((dataset, src.data[dataset]) for dataset in src.datasets())
+
+    print('load   ', args.input)
+    print('format ', args.format)
+    if args.dtype is not None:
+        print('dtype  ', args.dtype)
+    print('save   ', args.output)
+
+    if args.format == CHUNKED:
+        save_chunked(args.output, src.data_start_time, src.data_tick_size,
+                     data, args.block_rows)
+    else:
+        save(args.output, src.data_start_time, src.data_tick_size, data)
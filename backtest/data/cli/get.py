@@ -5,10 +5,12 @@ from urllib2 import urlopen
 import os.path
 import json
 
-import numpy as np
-
 from backtest.data import DataSource
-from backtest.util import parse_date, parse_time
+from backtest.data.base import EXCHANGE_SEPARATOR
+from backtest.data.header import save
+from backtest.util import parse_date, parse_time, lazy_import
+
+np = lazy_import('numpy')
 
 
 def create_argument_parser(parser):
@@ -40,6 +42,11 @@ def create_argument_parser(parser):
         help='currency pair (default: %(default)s)',
         default='btc_usd'
     )
+    parser.add_argument(
+        '-x', '--exchange',
+        help='store the dataset as <exchange>:<pair> (default: <pair>)',
+        default=None
+    )
     parser.add_argument(
         '-s', '--source',
         help='data source (default: %(default)s)',
@@ -95,15 +102,13 @@ def main(args):
         print('end    ', ctime(data[-1]['date']))
         print('length ', len(data))
 
-        info = np.array([start, args.interval], dtype=int)
         dataset = np.empty(
             (len(data), len(DataSource.CANDLE_VALUES)),
             dtype=float
         )
-        save = {
-            'info': info,
-            args.pair: dataset
-        }
+        name = args.pair
+        if args.exchange is not None:
+            name = args.exchange.lower() + EXCHANGE_SEPARATOR + name
 
         for i, candle in enumerate(data):
             for attr in DataSource.CANDLE_VALUES:
@@ -111,4 +116,4 @@ def main(args):
 
         print('save   ', args.output)
 
-        np.savez_compressed(args.output, **save)
+        save(args.output, start, args.interval, {name: dataset})
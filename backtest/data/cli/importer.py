@@ -0,0 +1,146 @@
+from __future__ import print_function
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from time import ctime
+import os.path
+
+from backtest.data import DataSource, DTYPES
+from backtest.data.base import EXCHANGE_SEPARATOR
+from backtest.data.header import save
+from backtest.data.chunked import CHUNKED, BLOCK_ROWS, save_chunked
+from backtest.data.text import (FIELDS, FORMATS, CHUNK_SIZE,
+                                read_text, scan, create_times, place,
+                                forward_fill)
+from backtest.util import parse_time, lazy_import
+
+np = lazy_import('numpy')
+
+
+def create_argument_parser(parser):
+    parser.add_argument(
+        '-f', '--format',
+        help='input format (default: file extension)',
+        choices=FORMATS, default=None
+    )
+    parser.add_argument(
+        '-m', '--map', metavar=('FIELD', 'NAME'), nargs=2, action='append',
+        help='read FIELD ({0}) from column/key NAME'
+             .format(' | '.join(FIELDS)),
+        default=[]
+    )
+    parser.add_argument(
+        '-ms', '--milliseconds', action='store_true',
+        help='timestamps are in milliseconds'
+    )
+    parser.add_argument(
+        '-i', '--interval', metavar='TIME',
+        help='interval (<value><s | m | h | d>), candles within an ' \
+             'interval are merged (default: smallest timestamp difference)',
+        type=parse_time, default=None
+    )
+    parser.add_argument(
+        '-p', '--pair',
+        help='currency pair (default: %(default)s)',
+        default='btc_usd'
+    )
+    parser.add_argument(
+        '-x', '--exchange',
+        help='store the dataset as <exchange>:<pair> (default: <pair>)',
+        default=None
+    )
+    parser.add_argument(
+        '-F', '--output-format',
+        help='output format (default: %(default)s)',
+        choices=['npz', CHUNKED], default='npz'
+    )
+    parser.add_argument(
+        '-br', '--block-rows', metavar='ROWS',
+        help='rows per compressed block (default: %(default)s)',
+        type=int, default=BLOCK_ROWS
+    )
+    parser.add_argument(
+        '-dt', '--dtype',
+        help='price data type (default: %(default)s)',
+        choices=DTYPES, default='float64'
+    )
+    parser.add_argument(
+        '-cs', '--chunk-size', metavar='LINES',
+        help='lines parsed at once (default: %(default)s)',
+        type=int, default=CHUNK_SIZE
+    )
+    parser.add_argument(
+        '-o', '--output', metavar='PATH',
+        help='output file (default: <input>.npz)',
+        default=None
+    )
+    parser.add_argument('input')
+    return parser
+
+
+def main(args):
+    if args.format is None:
+        ext = os.path.splitext(args.input)[1].lower()
+        args.format = 'csv' if ext == '.csv' else 'jsonl'
+    if args.output is None:
+        args.output = os.path.splitext(args.input)[0] + '.npz'
+
+    names = {}
+    for field, name in args.map:
+        if field not in FIELDS:
+            print('Error: invalid field:', field)
+            exit(1)
+        names[field] = name
+
+    read = lambda: read_text(args.input, args.format, names,
+                             1000 if args.milliseconds else 1,
+                             args.chunk_size)
+
+    print('scan   ', args.input)
+    try:
+        first, last, step = scan(read())
+    except ValueError as err:
+        print('Error:', err)
+        exit(1)
+
+    tick_size = args.interval or step
+    if tick_size is None:
+        print('Error: can not infer interval from a single record')
+        exit(1)
+    start = first - first % tick_size
+    rows = (last - start) // tick_size + 1
+
+    print('start  ', ctime(start))
+    print('end    ', ctime(last))
+    print('length ', rows)
+
+    name = args.pair.lower()
+    if args.exchange is not None:
+        name = args.exchange.lower() + EXCHANGE_SEPARATOR + name
+
+    tmp = mkdtemp(dir=os.path.dirname(os.path.abspath(args.output)))
+    try:
+        data = np.lib.format.open_memmap(
+            os.path.join(tmp, 'data.npy'), 'w+', dtype=args.dtype,
+            shape=(rows, DataSource.CANDLE_SIZE)
+        )
+        data[:] = np.nan
+        times = np.lib.format.open_memmap(
+            os.path.join(tmp, 'times.npy'), 'w+', dtype=np.int64,
+            shape=(rows, 2)
+        )
+        times[:] = create_times(1)
+        place(read(), data, start, tick_size, times)
+        del times
+        forward_fill(data)
+
+        print('save   ', args.output)
+
+        if args.output_format == CHUNKED:
+            save_chunked(args.output, start, tick_size, {name: data},
+                         args.block_rows)
+        else:
+            save(args.output, start, tick_size, {name: data})
+        del data
+    finally:
+        rmtree(tmp, ignore_errors=True)
@@ -2,7 +2,7 @@ from __future__ import print_function, absolute_import
 
 from argparse import ArgumentParser
 
-from . import plot, get
+from . import plot, get, convert, importer
 
 
 def create_argument_parser():
@@ -11,6 +11,8 @@ def create_argument_parser():
 
     plot.create_argument_parser(parsers.add_parser('plot'))
     get.create_argument_parser(parsers.add_parser('get'))
+    convert.create_argument_parser(parsers.add_parser('convert'))
+    importer.create_argument_parser(parsers.add_parser('import'))
 
     return parser
 
@@ -21,6 +23,10 @@ def main():
         plot.main(args)
     elif args.command == 'get':
         get.main(args)
+    elif args.command == 'convert':
+        convert.main(args)
+    elif args.command == 'import':
+        importer.main(args)
     else:
         print('Invalid command "{0}"'.format(args.command))
         exit(1)
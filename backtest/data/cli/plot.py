@@ -49,14 +49,19 @@ def plot(args, src):
 
 
 def main(args):
-    src = FileDataSource(args.file)
+    src = FileDataSource(args.file, lazy=True)
 
     if args.info:
+        header = src.data.header
         end_time = src.start_time + src.tick_size * (src.get_max_ticks() - 1)
         print('start    ', datetime.fromtimestamp(src.start_time).ctime())
         print('end      ', datetime.fromtimestamp(end_time).ctime())
         print('interval ', datetime.fromtimestamp(src.tick_size).time())
-        print('datasets ', ' '.join(src.datasets()))
+        print('datasets ', ' '.join(sorted(src.datasets())))
+        print('rows     ', ' '.join(str(header['datasets'][dataset])
+                                    for dataset in sorted(src.datasets())))
+        print('columns  ', ' '.join(header['columns']))
+        print('checksum ', header['checksum'] or '-')
         exit(0)
 
     if args.dataset is None:
@@ -0,0 +1,109 @@
+from zipfile import ZipFile
+from hashlib import sha1
+import json
+
+from .base import DataSource, split_dataset
+from ..util import lazy_import
+
+np = lazy_import('numpy')
+
+
+HEADER = 'header'
+INFO = 'info'
+CHECKSUM_ROWS = 1 << 16
+
+
+def checksum(data, rows=CHECKSUM_ROWS):
+    ret = sha1()
+    for name in sorted(data):
+        values = data[name]
+        ret.update(name)
+        ret.update(str(values.dtype))
+        ret.update(str(values.shape))
+        for i in range(0, len(values), rows):
+            ret.update(np.ascontiguousarray(values[i:i + rows]))
+    return ret.hexdigest()
+
+def create_header(start_time, tick_size, data):
+    return {
+        'start_time': int(start_time),
+        'tick_size': int(tick_size),
+        'columns': DataSource.CANDLE_VALUES,
+        'datasets': dict((name, len(values)) for name, values in data.items()),
+        'pairs': sorted(set(split_dataset(name)[1] for name in data)),
+        'checksum': checksum(data)
+    }
+
+def read_header(path):
+    with np.load(path) as npz:
+        if HEADER in npz.files:
+            return json.loads(npz[HEADER].item())
+        info = npz[INFO]
+        names = [name for name in npz.files if name != INFO]
+
+    datasets = {}
+    with ZipFile(path) as archive:
+        for name in names:
+            with archive.open(name + '.npy') as fp:
+                version = np.lib.format.read_magic(fp)
+                if version == (1, 0):
+                    shape = np.lib.format.read_array_header_1_0(fp)[0]
+                else:
+                    shape = np.lib.format.read_array_header_2_0(fp)[0]
+                datasets[name] = shape[0] if shape else 0
+
+    return {
+        'start_time': int(info[0]),
+        'tick_size': int(info[1]),
+        'columns': DataSource.CANDLE_VALUES,
+        'datasets': datasets,
+        'pairs': sorted(set(split_dataset(name)[1] for name in datasets)),
+        'checksum': None
+    }
+
+def save(path, start_time, tick_size, data, compressed=True):
+    arrays = dict(data)
+    arrays[INFO] = np.array([start_time, tick_size], dtype=int)
+    arrays[HEADER] = np.array(json.dumps(create_header(start_time, tick_size,
+                                                       data)))
+    if compressed:
+        np.savez_compressed(path, **arrays)
+    else:
+        np.savez(path, **arrays)
+
+
+class LazyData(object):
+    def __init__(self, lengths, load, header=None):
+        self.lengths = lengths
+        self.load = load
+        self.header = header
+        self.arrays = {}
+
+    def __contains__(self, name):
+        return name in self.lengths
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __iter__(self):
+        return iter(self.lengths)
+
+    def __getitem__(self, name):
+        try:
+            return self.arrays[name]
+        except KeyError:
+            if name not in self:
+                raise
+        ret = self.arrays[name] = self.load(name)
+        return ret
+
+    def keys(self):
+        return list(self.lengths)
+
+    def length(self, name):
+        return self.lengths[name]
+
+
+def load_array(path, name):
+    with np.load(path) as npz:
+        return npz[name]
@@ -0,0 +1,93 @@
+import json
+from os.path import join, isdir
+from tempfile import mkdtemp
+from shutil import rmtree
+
+from .array import ArrayDataSource
+from ..util import lazy_import
+
+np = lazy_import('numpy')
+
+
+SHM_DIR = '/dev/shm'
+MANIFEST = 'manifest.json'
+
+_OPEN = {}
+
+
+class DataServer(object):
+    def __init__(self, source, steps=(), path=None):
+        if path is None:
+            path = mkdtemp(prefix='backtest-',
+                           dir=SHM_DIR if isdir(SHM_DIR) else None)
+        self.path = path
+        self.count = 0
+
+        for step in steps:
+            for dataset in source.datasets():
+                source.resample(dataset, step)
+
+        manifest = {
+            'start_time': int(source.start_time),
+            'tick_size': int(source.tick_size),
+            'end_time': (None if source.end_time is None
+                         else int(source.end_time)),
+            'data_start_time': int(source.data_start_time),
+            'data_tick_size': int(source.data_tick_size),
+            'layouts': source.layouts,
+            'data': [],
+            'cache': []
+        }
+        for dataset in source.datasets():
+            manifest['data'].append(
+                (dataset, self.save(source.data[dataset]))
+            )
+        for key, value in source.cache.items():
+            if isinstance(value, np.ndarray):
+                manifest['cache'].append((key, self.save(value)))
+
+        with open(join(self.path, MANIFEST), 'w') as fp:
+            json.dump(manifest, fp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def save(self, array):
+        fname = '{0}.npy'.format(self.count)
+        np.save(join(self.path, fname), array)
+        self.count += 1
+        return fname
+
+    def close(self):
+        _OPEN.pop(self.path, None)
+        rmtree(self.path, ignore_errors=True)
+
+
+def load(path):
+    with open(join(path, MANIFEST)) as fp:
+        manifest = json.load(fp)
+    mmap = lambda fname: np.load(join(path, fname), mmap_mode='r')
+    data = dict((dataset, mmap(fname))
+                for dataset, fname in manifest['data'])
+    cache = dict((tuple(key), mmap(fname))
+                 for key, fname in manifest['cache'])
+    return ArrayDataSource(data,
+                           start_time=manifest['start_time'],
+                           tick_size=manifest['tick_size'],
+                           end_time=manifest['end_time'],
+                           data_start_time=manifest['data_start_time'],
+                           data_tick_size=manifest['data_tick_size'],
+                           cache=cache,
+                           layouts=manifest['layouts'])
+
+def open_shared(path, start_time=None, end_time=None, tick_size=None):
+    try:
+        source = _OPEN[path]
+    except KeyError:
+        source = _OPEN[path] = load(path)
+    return source.view(start_time=start_time,
+                       end_time=end_time,
+                       tick_size=tick_size)
@@ -0,0 +1,180 @@
+from __future__ import division
+
+from itertools import islice
+from operator import itemgetter
+import warnings
+import json
+import csv
+
+from .base import DataSource
+from ..util import lazy_import
+
+np = lazy_import('numpy')
+
+
+TIME = 'date'
+FIELDS = [TIME] + DataSource.CANDLE_VALUES
+FORMATS = ['csv', 'jsonl']
+CHUNK_SIZE = 1000000
+FILL_BLOCK = 1 << 20
+
+
+def read_chunks(fp, size=CHUNK_SIZE):
+    while True:
+        lines = list(islice(fp, size))
+        if not lines:
+            break
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            yield lines
+
+def parse_dates(values, scale=1):
+    try:
+        return np.array(values, dtype=np.float64).astype(np.int64)
+    except ValueError:
+        pass
+    try:
+        dates = np.array([str(value).strip().rstrip('Z')
+                          for value in values], dtype='datetime64[s]')
+    except ValueError as err:
+        raise ValueError('invalid date: {0}'.format(err))
+    return dates.astype(np.int64) * scale
+
+def parse_csv(lines, columns, names=None, scale=1):
+    names = dict(zip(FIELDS, FIELDS), **(names or {}))
+    try:
+        indices = [columns.index(names[field]) for field in FIELDS]
+    except ValueError as err:
+        raise ValueError('missing CSV column: {0}'.format(err))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        data = np.fromstring(','.join(line.strip() for line in lines),
+                             dtype=np.float64, sep=',')
+    if len(data) == len(lines) * len(columns):
+        data = data.reshape(len(lines), len(columns))[:, indices]
+        return data[:, 0].astype(np.int64), data[:, 1:]
+
+    rows = list(csv.reader(lines))
+    if any(len(row) != len(columns) for row in rows):
+        raise ValueError('invalid CSV data')
+    fields = list(zip(*map(itemgetter(*indices), rows))) or [()] * len(FIELDS)
+    times = parse_dates(fields[0], scale)
+    try:
+        values = np.array(fields[1:], dtype=np.float64).T
+    except ValueError as err:
+        raise ValueError('invalid CSV data: {0}'.format(err))
+    return times, values.reshape(len(rows), len(FIELDS) - 1)
+
+def parse_jsonl(lines, names=None, scale=1):
+    names = dict(zip(FIELDS, FIELDS), **(names or {}))
+    keys = [names[field] for field in FIELDS]
+    try:
+        records = json.loads('[' + ','.join(lines) + ']')
+        fields = [[record[key] for record in records] for key in keys]
+        values = np.array(fields[1:], dtype=np.float64).T
+    except (KeyError, TypeError) as err:
+        raise ValueError('invalid JSON record: {0}'.format(err))
+    times = parse_dates(fields[0], scale)
+    return times, values.reshape(len(lines), len(keys) - 1)
+
+def read_text(path, fmt, names=None, scale=1, size=CHUNK_SIZE):
+    if fmt not in FORMATS:
+        raise ValueError('invalid format: {0}'.format(fmt))
+    with open(path) as fp:
+        if fmt == 'csv':
+            header = next(csv.reader([fp.readline()]), [])
+            columns = [column.strip() for column in header]
+            parse = lambda lines: parse_csv(lines, columns, names, scale)
+        else:
+            parse = lambda lines: parse_jsonl(lines, names, scale)
+        for lines in read_chunks(fp, size):
+            times, values = parse(lines)
+            if scale != 1:
+                times //= scale
+            yield times, values
+
+def scan(chunks):
+    first = last = step = None
+    for times, _ in chunks:
+        if not len(times):
+            continue
+        if first is None:
+            first, last = times.min(), times.max()
+        else:
+            first, last = min(first, times.min()), max(last, times.max())
+        diff = np.diff(np.unique(times))
+        if len(diff):
+            step = diff.min() if step is None else min(step, diff.min())
+    if first is None:
+        raise ValueError('no data')
+    return int(first), int(last), None if step is None else int(step)
+
+def create_times(rows):
+    ret = np.empty((rows, 2), dtype=np.int64)
+    ret[:, 0] = np.iinfo(np.int64).max
+    ret[:, 1] = np.iinfo(np.int64).min
+    return ret
+
+def aggregate(times, values, start_time, tick_size):
+    _, last = np.unique(times[::-1], return_index=True)
+    keep = len(times) - 1 - last
+    times, values = times[keep], values[keep]
+    index = (times - start_time) // tick_size
+    order = np.lexsort((times, index))
+    times, values, index = times[order], values[order], index[order]
+
+    index, first = np.unique(index, return_index=True)
+    last = np.append(first[1:], len(times)) - 1
+    candle = DataSource.CANDLE
+    ret = np.empty((len(index), DataSource.CANDLE_SIZE), dtype=values.dtype)
+    ret[:, candle.high] = np.maximum.reduceat(values[:, candle.high], first)
+    ret[:, candle.low] = np.minimum.reduceat(values[:, candle.low], first)
+    ret[:, candle.open] = values[first, candle.open]
+    ret[:, candle.close] = values[last, candle.close]
+    return index, times[first], times[last], ret
+
+def place(chunks, out, start_time, tick_size, times=None):
+    if times is None:
+        times = create_times(len(out))
+    candle = DataSource.CANDLE
+    for chunk_times, values in chunks:
+        if not len(chunk_times):
+            continue
+        index, first, last, values = aggregate(chunk_times, values,
+                                               start_time, tick_size)
+        values = values.astype(out.dtype, copy=False)
+        prev = out[index]
+        prev_first, prev_last = times[index].T
+        replace = (prev_first == prev_last) & (first == last) & \
+                  (first == prev_first)
+        for column, ufunc in ((candle.high, np.fmax), (candle.low, np.fmin)):
+            values[:, column] = np.where(
+                replace, values[:, column],
+                ufunc(prev[:, column], values[:, column])
+            )
+        values[:, candle.open] = np.where(first <= prev_first,
+                                          values[:, candle.open],
+                                          prev[:, candle.open])
+        values[:, candle.close] = np.where(last >= prev_last,
+                                           values[:, candle.close],
+                                           prev[:, candle.close])
+        out[index] = values
+        times[index, 0] = np.minimum(first, prev_first)
+        times[index, 1] = np.maximum(last, prev_last)
+
+def forward_fill(out, block=FILL_BLOCK):
+    close = DataSource.CANDLE.close
+    prev = np.nan
+    for start in range(0, len(out), block):
+        data = out[start:start + block]
+        missing = np.isnan(data[:, close])
+        if not missing.any():
+            prev = data[-1, close]
+            continue
+        index = np.where(missing, 0, np.arange(1, len(data) + 1))
+        np.maximum.accumulate(index, out=index)
+        closes = np.concatenate(([prev], data[:, close]))[index]
+        data[missing] = closes[missing, np.newaxis]
+        prev = closes[-1]
+    return out
@@ -0,0 +1,61 @@
+from time import ctime
+import sys
+import json
+
+
+TEXT = {
+    'buy': '[{0}] [{1}] BUY {2:.8f} {3} -> {4:.8f} {5} (price {6:.8f})\n',
+    'sell': '[{0}] [{1}] SELL {2:.8f} {3} -> {4:.8f} {5} (price {6})\n',
+    'log': '[{0}] [{1}] LOG: {2}',
+    'email': '[{0}] [{1}] EMAIL: {2} {3}\n',
+    'error': '[ERROR] [{1}] {2}: {3}\n{4}',
+    'prune': '[PRUNED] [{1}] tick {2}: {3}\n'
+}
+
+FIELDS = {
+    'buy': ('amount', 'currency', 'bought', 'asset', 'price'),
+    'sell': ('amount', 'asset', 'received', 'currency', 'price'),
+    'log': ('message',),
+    'email': ('subject', 'message'),
+    'error': ('stage', 'error', 'traceback'),
+    'prune': ('tick', 'reason')
+}
+
+
+class EventLog(object):
+    FORMATS = ['text', 'json']
+
+    def __init__(self, fp=None, fmt='text', flush_interval=None):
+        if fmt not in self.FORMATS:
+            raise ValueError('invalid log format: {0}'.format(fmt))
+        self.file = fp
+        self.format = fmt
+        self.flush_interval = flush_interval
+        self.records = []
+
+    def record(self, time, source, event, *values):
+        self.records.append((time, source, event, values))
+        if self.flush_interval and len(self.records) >= self.flush_interval:
+            self.flush()
+
+    def format_text(self, record):
+        time, source, event, values = record
+        return TEXT[event].format(
+            '' if time is None else ctime(time), source, *values
+        )
+
+    def format_json(self, record):
+        time, source, event, values = record
+        ret = dict(zip(FIELDS[event], values))
+        ret['time'] = time
+        ret['source'] = str(source)
+        ret['event'] = event
+        return json.dumps(ret, default=str) + '\n'
+
+    def flush(self):
+        if not self.records:
+            return
+        fmt = self.format_text if self.format == 'text' else self.format_json
+        fp = sys.stdout if self.file is None else self.file
+        fp.write(''.join(fmt(record) for record in self.records))
+        self.records = []
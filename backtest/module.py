@@ -65,3 +65,7 @@ class ModuleLoader(object):
                 setattr(module, name, value)
 
         return module
+
+    @staticmethod
+    def unload(module):
+        sys.modules.pop(module.__name__, None)
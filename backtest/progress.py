@@ -0,0 +1,107 @@
+from __future__ import division
+
+from time import time
+import sys
+import json
+
+from .util import TqdmFileWrapper, tqdm
+
+
+class Progress(object):
+    INTERVAL = None
+
+    def __init__(self, total, start=0):
+        self.total = total
+        self.start = start
+        self.tick = start
+        self.start_time = self.time = time()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def update(self, tick):
+        self.tick = tick
+        self.time = time()
+
+    def close(self):
+        pass
+
+
+class BarProgress(Progress):
+    INTERVAL = 0.1
+
+    def __init__(self, total, start=0):
+        super(BarProgress, self).__init__(total, start)
+        self.stdout = TqdmFileWrapper(sys.stdout)
+        sys.stdout = self.stdout
+        self.bar = tqdm.tqdm(total=total, initial=start,
+                             leave=False, dynamic_ncols=True,
+                             file=self.stdout.file)
+
+    def update(self, tick):
+        self.stdout.flush()
+        self.bar.update(tick - self.tick)
+        super(BarProgress, self).update(tick)
+
+    def close(self):
+        self.stdout.flush()
+        self.bar.close()
+        sys.stdout = self.stdout.file
+        self.stdout.close()
+
+
+class JsonProgress(Progress):
+    INTERVAL = 1.0
+
+    def __init__(self, total, start=0, fp=None):
+        super(JsonProgress, self).__init__(total, start)
+        self.file = sys.stderr if fp is None else fp
+
+    def update(self, tick):
+        now = time()
+        elapsed = now - self.time
+        self.file.write(json.dumps({
+            'tick': tick,
+            'ticks': self.total,
+            'ticks_per_sec': (tick - self.tick) / elapsed if elapsed else 0,
+            'elapsed': now - self.start_time
+        }))
+        self.file.write('\n')
+        self.file.flush()
+        super(JsonProgress, self).update(tick)
+
+
+PROGRESS = {
+    'bar': BarProgress,
+    'json': JsonProgress,
+    'none': Progress
+}
+
+
+def create(mode, total, start=0):
+    if mode is True:
+        mode = 'bar'
+    elif mode is False or mode is None:
+        mode = 'none'
+    return PROGRESS[mode](total, start)
+
+def chunks(start, end, progress, boundary=None):
+    size = 1
+    while start < end:
+        stop = min(start + size, end)
+        if boundary is not None:
+            stop = min(stop, (start // boundary + 1) * boundary)
+        begin = time()
+        yield start, stop
+        if progress.INTERVAL is None:
+            size = end
+        else:
+            now = time()
+            if now - progress.time >= progress.INTERVAL or stop == end:
+                progress.update(stop)
+            rate = (stop - start) / max(now - begin, 1e-6)
+            size = max(1, min(2 * size, int(rate * progress.INTERVAL)))
+        start = stop
@@ -0,0 +1,104 @@
+from __future__ import division
+
+from math import ceil
+
+from .benchmark import get_value
+
+
+class Drawdown(object):
+    def __init__(self, threshold):
+        if not 0 < threshold < 1:
+            raise ValueError('invalid drawdown: {0}'.format(threshold))
+        self.threshold = threshold
+
+    def __str__(self):
+        return 'drawdown > {0:.2%}'.format(self.threshold)
+
+    def __call__(self, tick, equity, peak):
+        return [i for i, value in equity.items()
+                if value < peak[i] * (1 - self.threshold)]
+
+
+class Leader(object):
+    def __init__(self, fraction):
+        if not 0 < fraction < 1:
+            raise ValueError('invalid leader fraction: {0}'.format(fraction))
+        self.fraction = fraction
+
+    def __str__(self):
+        return 'equity < {0:.2%} of leader'.format(self.fraction)
+
+    def __call__(self, tick, equity, peak):
+        if not equity:
+            return []
+        limit = max(equity.values()) * self.fraction
+        return [i for i, value in equity.items() if value < limit]
+
+
+class Halving(object):
+    def __init__(self, ticks, eta=2):
+        if ticks <= 0 or eta <= 1:
+            raise ValueError('invalid halving schedule: ticks={0} eta={1}'
+                             .format(ticks, eta))
+        self.ticks = ticks
+        self.eta = eta
+        self.rung = ticks
+
+    def __str__(self):
+        return 'successive halving at tick {0}'.format(self.rung)
+
+    def __call__(self, tick, equity, peak):
+        if tick + 1 < self.rung:
+            return []
+        while self.rung <= tick + 1:
+            self.rung *= self.eta
+        keep = int(ceil(len(equity) / self.eta))
+        ranked = sorted(equity, key=lambda i: (-equity[i], i))
+        return ranked[keep:]
+
+
+class Pruner(object):
+    def __init__(self, rules, rates, interval, portfolio=None):
+        if interval <= 0:
+            raise ValueError('invalid prune interval: {0}'.format(interval))
+        self.rules = rules
+        self.rates = rates
+        self.interval = interval
+        self.start_value = None
+        if portfolio is not None:
+            self.start_value = get_value(portfolio, rates, 0)
+        self.peak = {}
+        self.pruned = {}
+
+    def update(self, tick, strategies):
+        equity = {}
+        for i, strategy in enumerate(strategies):
+            if strategy.started and strategy.state is not None:
+                value = get_value(strategy.get_holdings(), self.rates, tick)
+                peak = self.peak.get(i, self.start_value)
+                equity[i] = value
+                self.peak[i] = value if peak is None else max(peak, value)
+
+        ret = []
+        for rule in self.rules:
+            reason = str(rule)
+            for i in rule(tick, equity, self.peak):
+                if i in equity:
+                    del equity[i]
+                    strategy = strategies[i]
+                    self.pruned[i] = (tick, reason)
+                    strategy.events.record(None, strategy, 'prune',
+                                           tick, reason)
+                    ret.append(strategy)
+        return ret
+
+
+def create_rules(drawdown=None, leader=None, halving=None, eta=2):
+    ret = []
+    if drawdown is not None:
+        ret.append(Drawdown(drawdown))
+    if leader is not None:
+        ret.append(Leader(leader))
+    if halving is not None:
+        ret.append(Halving(halving, eta))
+    return ret
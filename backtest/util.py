@@ -1,11 +1,10 @@
 from argparse import ArgumentTypeError
 from time import strptime, strftime
 from contextlib import contextmanager
-#from itertools import islice
+from importlib import import_module
+from types import ModuleType
 import sys
 
-from tqdm import tqdm
-
 
 TIME_UNIT = {
     's': 1,
@@ -15,6 +14,22 @@ TIME_UNIT = {
 }
 
 
+class LazyModule(ModuleType):
+    def __getattr__(self, attr):
+        module = import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    try:
+        return sys.modules[name]
+    except KeyError:
+        return LazyModule(name)
+
+tqdm = lazy_import('tqdm')
+
+
 class Namespace(dict):
     def __getattr__(self, attr):
         try:
@@ -32,22 +47,93 @@ class Namespace(dict):
             raise AttributeError(err.message)
 
 
+class Constants(dict):
+    def __init__(self, *args, **kwargs):
+        super(Constants, self).__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super(Constants, self).__setitem__(key, value)
+        self.__dict__[key] = value
+
+    def __delitem__(self, key):
+        super(Constants, self).__delitem__(key)
+        del self.__dict__[key]
+
+    def __setattr__(self, attr, value):
+        self[attr] = value
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+class Record(object):
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for attr in self.__slots__:
+            setattr(self, attr, kwargs.pop(attr, None))
+        if kwargs:
+            raise TypeError('unexpected fields: {0}'
+                            .format(', '.join(sorted(kwargs))))
+
+    def __getitem__(self, item):
+        try:
+            return getattr(self, item)
+        except (AttributeError, TypeError):
+            raise KeyError(item)
+
+    def __setitem__(self, item, value):
+        if item not in self.__slots__:
+            raise KeyError(item)
+        setattr(self, item, value)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, item):
+        return item in self.__slots__
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(attr, value) for attr, value in self.items()
+        ))
+
+    def keys(self):
+        return list(self.__slots__)
+
+    def items(self):
+        return [(attr, getattr(self, attr)) for attr in self.__slots__]
+
+
 class TqdmFileWrapper(object):
     def __init__(self, fp):
         self.file = fp
-        self.linebuf = ''
+        self.buf = []
 
     def write(self, x):
-        #lines = (self.linebuf + x).split('\n')
-        #for line in islice(lines, 0, len(lines) - 1):
-        #    tqdm.write(line, file=self.file)
-        #self.linebuf = lines[-1]
+        self.buf.append(x)
+
+    def flush(self):
+        if not self.buf:
+            return
+        text = ''.join(self.buf)
         try:
-            i = x.rindex('\n')
-            tqdm.write(self.linebuf + x[:i], file=self.file)
-            self.linebuf = x[i + 1:]
+            i = text.rindex('\n')
         except ValueError:
-            self.linebuf += x
+            self.buf = [text]
+            return
+        tqdm.tqdm.write(text[:i], file=self.file)
+        self.buf = [text[i + 1:]] if i + 1 < len(text) else []
+
+    def close(self):
+        self.flush()
+        self.file.write(''.join(self.buf))
+        self.buf = []
 
     @classmethod
     @contextmanager
@@ -56,11 +142,12 @@ class TqdmFileWrapper(object):
         try:
             yield sys.stdout.file
         finally:
-            sys.stdout = sys.stdout.file
+            wrapper, sys.stdout = sys.stdout, sys.stdout.file
+            wrapper.close()
 
 
 def enum(names):
-    return Namespace((name, i) for i, name in enumerate(names))
+    return Constants((name, i) for i, name in enumerate(names))
 
 def parse_date(date):
     try:
@@ -95,3 +182,21 @@ def parse_time(tm):
         return tm
     except (KeyError, ValueError):
         raise ArgumentTypeError('invalid time: "{0}"'.format(tm))
+
+def parse_fee(fee):
+    try:
+        ret = float(fee)
+    except ValueError:
+        raise ArgumentTypeError('invalid fee: "{0}"'.format(fee))
+    if not 0 <= ret < 1:
+        raise ArgumentTypeError('invalid fee: "{0}"'.format(fee))
+    return ret
+
+def parse_slippage(slippage):
+    try:
+        ret = float(slippage)
+    except ValueError:
+        raise ArgumentTypeError('invalid slippage: "{0}"'.format(slippage))
+    if not ret >= 0:
+        raise ArgumentTypeError('invalid slippage: "{0}"'.format(slippage))
+    return ret
@@ -0,0 +1,123 @@
+from __future__ import print_function, division
+
+from time import ctime
+from multiprocessing import Pool
+
+from .api import TradewaveAPI
+from .data import DataServer, open_shared, get_dataset
+from .cli import run
+from .benchmark import get_baselines, get_value
+
+
+def windows(begin, end, train, test, step=None):
+    if train < 0 or test <= 0:
+        raise ValueError('invalid window: train={0} test={1}'
+                         .format(train, test))
+    if step is None:
+        step = test
+    if step <= 0:
+        raise ValueError('invalid window step: {0}'.format(step))
+
+    start = begin
+    while start + train + test <= end:
+        yield start, start + train, start + train + test
+        start += step
+
+def get_source(source, begin, end):
+    ret = source.view(start_time=begin, end_time=end - 1)
+    return ret, (end - 1 - ret.start_time) // ret.tick_size + 1
+
+def run_segment(source, strategies, portfolio, pair, begin, end,
+                api_args=None):
+    if api_args is None:
+        api_args = {}
+    source, max_ticks = get_source(source, begin, end)
+    dataset = get_dataset(source, pair, api_args.get('primary_exchange'))
+    if max_ticks <= 0 or max_ticks > source.get_max_ticks(dataset):
+        raise ValueError('segment out of range: {0} -- {1}'
+                         .format(ctime(begin), ctime(end)))
+
+    apis = [
+        TradewaveAPI(fname, portfolio, source,
+                     max_ticks=max_ticks,
+                     primary_pair=pair,
+                     **api_args)
+        for fname in strategies
+    ]
+    try:
+        results = run(apis, max_ticks, progress=False, exit_on_error=False)
+    finally:
+        for api in apis:
+            api.unload()
+
+    bench = get_baselines(source, portfolio, pair, max_ticks,
+                          api_args.get('primary_exchange'))
+    rates = bench['rates']
+    prices = rates[pair.split('_')[0]]
+
+    ret = {
+        'begin': source.start_time,
+        'end': source.start_time + (max_ticks - 1) * source.tick_size,
+        'ticks': max_ticks,
+        'buy_and_hold': prices[-1] / prices[0],
+        'strategies': []
+    }
+    for api, res in zip(apis, results):
+        if res is None:
+            roi = None
+        else:
+            roi = get_value(res, rates) / bench['start_value']
+        ret['strategies'].append((str(api), roi))
+    return ret
+
+def run_window(args):
+    (source, strategies, portfolio, pair,
+     (begin, test_begin, end), api_args) = args
+    if isinstance(source, basestring):
+        source = open_shared(source)
+    ret = []
+    if test_begin > begin:
+        ret.append(('train', run_segment(source, strategies, portfolio,
+                                         pair, begin, test_begin,
+                                         api_args)))
+    ret.append(('test', run_segment(source, strategies, portfolio,
+                                    pair, test_begin, end, api_args)))
+    return ret
+
+def walk_forward(source, strategies, portfolio, pair,
+                 begin, end, train, test, step=None, jobs=1,
+                 api_args=None):
+    tasks = [(strategies, portfolio, pair, window, api_args)
+             for window in windows(begin, end, train, test, step)]
+    if jobs == 1:
+        return [run_window((source,) + task) for task in tasks]
+
+    for dataset in source.datasets():
+        source.resample(dataset, source.get_step(dataset=dataset))
+
+    with DataServer(source) as server:
+        pool = Pool(jobs)
+        try:
+            return pool.map(run_window,
+                            [(server.path,) + task for task in tasks],
+                            chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+def print_windows(results):
+    fmt = '{0}\t{1}\t{2}\t{3}\t{4}\t{5}'
+    print('-' * 60)
+    print('Window\tSegment\tStart date\tEnd date\tStrategy\tROI')
+    for i, window in enumerate(results):
+        for segment, res in window:
+            begin = ctime(res['begin'])
+            end = ctime(res['end'])
+            print(fmt.format(i, segment, begin, end, 'buy and hold',
+                             '{0:.4f}'.format(res['buy_and_hold'])))
+            for strategy, roi in res['strategies']:
+                print(fmt.format(
+                    i, segment, begin, end, strategy,
+                    '-' if roi is None else '{0:.4f}'.format(roi)
+                ))
+    print('-' * 60)
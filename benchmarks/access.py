@@ -0,0 +1,37 @@
+from __future__ import print_function
+
+from timeit import repeat
+
+from backtest.util import Namespace, Constants, Record
+
+
+SETUP = '''
+from benchmarks.access import Namespace, Constants, Info
+names = ['btc', 'ltc', 'usd', 'eur']
+fields = dict((name, i) for i, name in enumerate(names))
+namespace = Namespace(fields)
+constants = Constants(fields)
+record = Info(**fields)
+'''
+
+TESTS = [
+    ('Namespace', 'namespace.btc; namespace.usd'),
+    ('Constants', 'constants.btc; constants.usd'),
+    ('Record', 'record.btc; record.usd'),
+    ('Namespace set', 'namespace.btc = 1'),
+    ('Record set', 'record.btc = 1')
+]
+
+
+class Info(Record):
+    __slots__ = ('btc', 'ltc', 'usd', 'eur')
+
+
+def main(number=1000000):
+    for name, stmt in TESTS:
+        best = min(repeat(stmt, SETUP, number=number, repeat=3))
+        print('{0:<16}{1:.1f} ns'.format(name, best / number * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ except ImportError:
     from mock import patch
 
 from backtest.api.base import API, PythonAPI, Stop
+from backtest.events import EventLog
 
 
 @patch('backtest.api.base.API.do_stop')
@@ -17,10 +18,14 @@ class TestAPI(TestCase):
         self.assertIsNone(api.state)
         self.assertFalse(api.verbose)
 
-        api = API(verbose=True)
+        self.assertIsInstance(api.events, EventLog)
+
+        events = EventLog()
+        api = API(verbose=True, events=events)
         self.assertFalse(api.started)
         self.assertIsNone(api.state)
         self.assertTrue(api.verbose)
+        self.assertIs(api.events, events)
 
     def testStart(self, do_start, do_tick, do_stop):
         api = API()
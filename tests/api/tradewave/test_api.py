@@ -11,9 +11,10 @@ from StringIO import StringIO
 from numpy.testing import assert_array_almost_equal
 
 from backtest.api.tradewave.api import TradewaveAPI
+from backtest.api.tradewave.data import Portfolio, Execution
 from backtest.api.tradewave.util import (
     CURRENCIES, PAIR_CURRENCIES, EXCHANGES, PAIRS,
-    TradewaveInvalidOrderError, TradewaveFundsError
+    TradewaveInvalidOrderError, TradewaveFundsError, TradewaveDataError
 )
 from backtest.util import Namespace
 
@@ -33,7 +34,7 @@ class TestTradewaveAPI(TestCase):
         data.return_value = 0
         api = TradewaveAPI('/test/module', {}, self.src)
         portfolio.assert_called_with()
-        data.assert_called_with(self.src)
+        data.assert_called_with(self.src, exchange=EXCHANGES[0])
         self.assertIsNone(api.module)
         self.assertEqual(api.module_path, '/test/module')
         self.assertEqual(api.fees,
@@ -65,11 +66,11 @@ class TestTradewaveAPI(TestCase):
                            max_ticks=3,
                            primary_pair=PAIRS[1],
                            primary_exchange=EXCHANGES[2],
-                           fees=fees)
+                           execution=Execution(fees=fees))
         fees = [Decimal(fees[currency]) for currency in CURRENCIES]
         fees = [fees] * len(EXCHANGES)
         portfolio.assert_called_with(**pdata)
-        data.assert_called_with(self.src)
+        data.assert_called_with(self.src, exchange=EXCHANGES[2])
         self.assertIsNone(api.module)
         self.assertEqual(api.module_path, '/test/module')
         self.assertEqual(api.fees, fees)
@@ -91,6 +92,37 @@ class TestTradewaveAPI(TestCase):
         self.assertEqual(api.info.primary_pair, 1)
         self.assertEqual(api.info.primary_exchange, 2)
 
+    def testInitExchange(self, data, portfolio):
+        src = MagicMock(
+            tick_size=3,
+            start_time=4,
+            get_max_ticks=MagicMock(return_value=5),
+            datasets=MagicMock(return_value=[
+                'kraken:ltc_usd', 'bitstamp:btc_usd', 'kraken:btc_usd'
+            ])
+        )
+        src.__contains__.side_effect = src.datasets.return_value.__contains__
+
+        api = TradewaveAPI('', {}, src)
+        data.assert_called_with(src, exchange='kraken')
+        src.get_max_ticks.assert_called_with('kraken:ltc_usd')
+        self.assertEqual(api.info.primary_pair, PAIRS.index('ltc_usd'))
+        self.assertEqual(api.info.primary_exchange, EXCHANGES.index('kraken'))
+
+        TradewaveAPI('', {}, src, primary_pair='btc_usd')
+        data.assert_called_with(src, exchange='bitstamp')
+        src.get_max_ticks.assert_called_with('bitstamp:btc_usd')
+
+        TradewaveAPI('', {}, src, primary_pair='btc_usd',
+                     primary_exchange='kraken')
+        data.assert_called_with(src, exchange='kraken')
+        src.get_max_ticks.assert_called_with('kraken:btc_usd')
+
+        src.datasets.return_value.append('btc_usd')
+        TradewaveAPI('', {}, src, primary_pair='btc_usd')
+        data.assert_called_with(src, exchange=EXCHANGES[0])
+        src.get_max_ticks.assert_called_with('btc_usd')
+
     def testInitError(self, data, portfolio):
         src = MagicMock(
             get_max_ticks=MagicMock(return_value=0),
@@ -163,15 +195,15 @@ class TestTradewaveAPI(TestCase):
 
     def testValidateOrder(self, data, portfolio):
         api = TradewaveAPI('', {}, self.src)
-
-        with self.assertRaises(NotImplementedError):
-            api.validate_order(0, 1, 1)
+        api.validate_order(0, 1, 1)
 
         tests = [
             (-1, 1, None),
             (len(PAIRS), 1, None),
             (0, 0, None),
-            (0, -1, None)
+            (0, -1, None),
+            (0, 1, 0),
+            (0, 1, -1)
         ]
 
         for test in tests:
@@ -244,21 +276,141 @@ class TestTradewaveAPI(TestCase):
         with self.assertRaises(TradewaveFundsError):
             api.sell(pair)
 
+    def testFees(self, data, portfolio):
+        pair = 0
+        dst, src = PAIR_CURRENCIES[pair]
+
+        with self.assertRaises(ValueError):
+            TradewaveAPI('', {}, self.src,
+                         execution=Execution(pair_fees={'test': 0.1}))
+
+        api = TradewaveAPI('', {}, self.src, execution=Execution(
+            fees={dst: 0.5, src: 0.25}, slippage=100
+        ))
+        api.data[pair].price = Decimal(4)
+        api.portfolio.next = {
+            src: Decimal(101),
+            dst: Decimal(1)
+        }
+        api.buy(pair, 10)
+        self.assertAlmostEqual(api.portfolio.next[src], Decimal(60.6))
+        self.assertAlmostEqual(api.portfolio.next[dst], Decimal(6))
+        api.sell(pair, 1)
+        self.assertAlmostEqual(api.portfolio.next[src], Decimal(63.57))
+        self.assertAlmostEqual(api.portfolio.next[dst], Decimal(5))
+
+        api = TradewaveAPI('', {}, self.src, execution=Execution(
+            fees={dst: 0.5}, pair_fees={PAIRS[pair]: 0.1}
+        ))
+        api.data[pair].price = Decimal(4)
+        api.portfolio.next = {src: Decimal(40), dst: Decimal(0)}
+        api.buy(pair)
+        self.assertAlmostEqual(api.portfolio.next[src], Decimal(0))
+        self.assertAlmostEqual(api.portfolio.next[dst], Decimal(9))
+
+    def testOrderNoData(self, data, portfolio):
+        api = TradewaveAPI('', {}, self.src)
+        pair = 0
+        dst, src = PAIR_CURRENCIES[pair]
+        api.data = {pair: None}
+        api.portfolio.next = {src: Decimal(10), dst: Decimal(1)}
+        with self.assertRaises(TradewaveDataError):
+            api.buy(pair, 1, 4)
+        with self.assertRaises(TradewaveDataError):
+            api.sell(pair)
+        self.assertEqual(len(api.orders), 0)
+        self.assertEqual(api.portfolio.next, {src: 10, dst: 1})
+
+    def testLimitOrder(self, data, portfolio):
+        api = TradewaveAPI('', {}, self.src)
+
+        pair = 0
+        dst, src = PAIR_CURRENCIES[pair]
+
+        api.info.tick = 2
+        api.info.current_time = 100
+        api.portfolio.next = {
+            src: Decimal(10),
+            dst: Decimal(1)
+        }
+
+        with self.assertRaises(TradewaveFundsError):
+            api.buy(pair, 3, 4)
+        with self.assertRaises(TradewaveFundsError):
+            api.sell(pair, 2, 4)
+
+        buy = api.buy(pair, 1, 4, timeout=60)
+        sell = api.sell(pair, 1, 8, timeout=None)
+        self.assertEqual(buy.expires, 160)
+        self.assertIsNone(sell.expires)
+        self.assertEqual(api.portfolio.next, {src: 6, dst: 0})
+        self.assertEqual(len(api.orders), 2)
+
+        api.data[pair].high = Decimal(5)
+        api.data[pair].low = Decimal(4.5)
+        api.process_orders()
+        self.assertEqual(len(api.orders), 2)
+        self.assertEqual(api.portfolio.next, {src: 6, dst: 0})
+
+        api.info.tick = 3
+        api.data[pair].low = Decimal(3)
+        api.process_orders()
+        self.assertEqual(len(api.orders), 1)
+        self.assertEqual(api.portfolio.next, {src: 6, dst: 1})
+        self.assertEqual(api.buy_plot, ([3], [4]))
+
+        api.buy(pair, price=3, timeout=10)
+        self.assertEqual(api.portfolio.next, {src: 0, dst: 1})
+        api.info.current_time = 111
+        api.process_orders()
+        self.assertEqual(len(api.orders), 1)
+        self.assertAlmostEqual(api.portfolio.next[src], Decimal(6))
+
+        api.info.tick = 4
+        api.data[pair].high = Decimal(8)
+        api.process_orders()
+        self.assertEqual(len(api.orders), 0)
+        self.assertEqual(api.portfolio.next, {src: 14, dst: 1})
+        self.assertEqual(api.sell_plot, ([4], [8]))
+
+        api.portfolio = Portfolio(**{src: 14, dst: 1})
+        api.buy(pair, 2, 2)
+        api.sell(pair, 1, 20)
+        self.assertEqual(api.portfolio.next[src], 10)
+        self.assertEqual(api.portfolio.next[dst], 0)
+        holdings = api.get_holdings()
+        self.assertEqual(holdings[src], 14)
+        self.assertEqual(holdings[dst], 1)
+        api.module = MagicMock()
+        api.do_stop()
+        self.assertEqual(len(api.orders), 0)
+        for portfolio in (api.portfolio, api.portfolio.next):
+            self.assertEqual(portfolio[src], 14)
+            self.assertEqual(portfolio[dst], 1)
+
     @patch('sys.stdout', new_callable=StringIO)
-    @patch('backtest.api.tradewave.api.ctime', return_value='time')
+
+    @patch('backtest.events.ctime', return_value='time')
     def testLog(self, ctime, stdout, data, portfolio):
         api = TradewaveAPI('module', {}, self.src)
         api.info.current_time = 10
-        api.log('test')
+        api.log('test', 1)
+        api.log('test', 2, sep='-', end='')
+        self.assertEqual(stdout.getvalue(), '')
+        api.events.flush()
         ctime.assert_called_with(10)
-        self.assertEqual(stdout.getvalue(), '[time] [module] LOG: test\n')
+        self.assertEqual(
+            stdout.getvalue(),
+            '[time] [module] LOG: test 1\n[time] [module] LOG: test-2'
+        )
 
     @patch('sys.stdout', new_callable=StringIO)
-    @patch('backtest.api.tradewave.api.ctime', return_value='time')
+    @patch('backtest.events.ctime', return_value='time')
     def testEmail(self, ctime, stdout, data, portfolio):
         api = TradewaveAPI('module', {}, self.src)
         api.info.current_time = 2
         api.email('message', 'subject')
+        api.events.flush()
         ctime.assert_called_with(2)
         self.assertEqual(
             stdout.getvalue(),
@@ -267,11 +419,29 @@ class TestTradewaveAPI(TestCase):
         stdout.seek(0)
         stdout.truncate(0)
         api.email('message')
+        api.events.flush()
         self.assertEqual(
             stdout.getvalue(),
             '[time] [module] EMAIL: <no subject> message\n'
         )
 
+    @patch('sys.stdout', new_callable=StringIO)
+    @patch('backtest.events.ctime', return_value='time')
+    def testVerbose(self, ctime, stdout, data, portfolio):
+        api = TradewaveAPI('module', {}, self.src, verbose=True)
+        api.data[0].price = Decimal(4)
+        api.portfolio.next = {'btc': Decimal(1), 'usd': Decimal(4)}
+        api.buy(0, 0.5)
+        api.sell(0, 1)
+        api.events.flush()
+        self.assertEqual(
+            stdout.getvalue(),
+            '[time] [module] BUY 2.00000000 USD -> 0.50000000 BTC '
+            '(price 4.00000000)\n'
+            '[time] [module] SELL 1.00000000 BTC -> 4.00000000 USD '
+            '(price 4)\n'
+        )
+
     def testPlot(self, data, portfolio):
         api = TradewaveAPI('', {}, self.src)
         api.info.tick = 2
@@ -323,6 +493,38 @@ class TestTradewaveAPI(TestCase):
         self.assertIs(plots[1][0], api.secondary_plots)
         self.assertEqual(plots[1][1], {})
 
+    def testSnapshot(self, data, portfolio):
+        portfolio.side_effect = Portfolio
+        api = TradewaveAPI('', {'btc': 1}, self.src)
+        api.info.tick = 2
+        api.portfolio.next['usd'] = Decimal(3)
+        api.storage.x = [1]
+        api.plot('key', 0.5)
+        api.plot('key2', 0.25, secondary=True)
+        api.buy_plot = ([1], [2])
+        snapshot = api.get_snapshot()
+
+        api2 = TradewaveAPI('', {}, self.src, max_ticks=4)
+        api2.storage.y = 1
+        api2.set_snapshot(snapshot)
+        self.assertIs(api2.state, api2.portfolio)
+        self.assertEqual(api2.portfolio['btc'], 1)
+        self.assertEqual(api2.portfolio['usd'], 0)
+        self.assertEqual(api2.portfolio.next['usd'], 3)
+        self.assertEqual(api2.storage, {'x': [1]})
+        self.assertEqual(api2.info.tick, 2)
+        self.assertEqual(api2.info.max_ticks, 4)
+        self.assertEqual(api2.info.end, 13)
+        assert_array_almost_equal(api2.plots['key'], [0, 0, 0.5, 0])
+        assert_array_almost_equal(api2.secondary_plots['key2'],
+                                  [0, 0, 0.25, 0])
+        self.assertEqual(api2.buy_plot, ([1], [2]))
+        self.assertEqual(api2.sell_plot, ([], []))
+
+        snapshot['info']['begin'] += 1
+        with self.assertRaises(ValueError):
+            api2.set_snapshot(snapshot)
+
     @patch('backtest.api.tradewave.api.CURRENCIES', new_callable=list)
     @patch('backtest.api.tradewave.api.TradewaveAPI.CONST_ENV',
            new_callable=dict)
@@ -340,6 +542,19 @@ class TestTradewaveAPI(TestCase):
         self.assertEqual(currencies, ['btc', 'ltc'])
         self.assertEqual(const_env['currencies'], {'btc': 0, 'ltc': 1})
 
+    @patch('backtest.api.tradewave.api.EXCHANGES', new_callable=list)
+    @patch('backtest.api.tradewave.api.TradewaveAPI.CONST_ENV',
+           new_callable=dict)
+    def testAddExchange(self, const_env, exchanges, data, portfolio):
+        const_env['exchanges'] = {}
+        TradewaveAPI.add_exchange('poloniex')
+        self.assertEqual(exchanges, ['poloniex'])
+        self.assertEqual(const_env['exchanges'], {'poloniex': 0})
+
+        TradewaveAPI.add_exchange('poloniex')
+        self.assertEqual(exchanges, ['poloniex'])
+        self.assertEqual(const_env['exchanges'], {'poloniex': 0})
+
     @patch('backtest.api.tradewave.api.TradewaveAPI.add_currency')
     @patch('backtest.api.tradewave.api.PAIRS', new_callable=list)
     @patch('backtest.api.tradewave.api.PAIR_CURRENCIES', new_callable=list)
@@ -7,6 +7,8 @@ except ImportError:
 import operator
 from sys import exc_info
 from decimal import Decimal
+from copy import deepcopy
+import pickle
 import numpy as np
 from numpy.testing import assert_array_equal
 
@@ -15,7 +17,8 @@ from backtest.api.tradewave.data import (
     Portfolio, Storage, Money, Data, PairData
 )
 from backtest.api.tradewave.util import (
-    TradewaveDataError, CURRENCIES, DATA, DATA_INDEX, MAX_PERIOD, PAIRS
+    TradewaveDataError, CURRENCIES, DATA, DATA_INDEX, MAX_PERIOD, PAIRS,
+    EXCHANGES
 )
 
 
@@ -49,6 +52,38 @@ class TestPortfolio(TestCase):
         p.update()
         for currency in CURRENCIES:
             self.assertAlmostEqual(p[currency], p.next[currency])
+        p.next[0] = 10
+        self.assertAlmostEqual(p[0], 1)
+
+    def testAccess(self):
+        p = Portfolio(**{CURRENCIES[1]: 2})
+        self.assertEqual(getattr(p, CURRENCIES[1]), 2)
+        setattr(p, CURRENCIES[0], 3)
+        self.assertEqual(p[0], 3)
+        p[CURRENCIES[2]] = 4
+        self.assertEqual(p[2], 4)
+        self.assertEqual(p.get(CURRENCIES[1]), 2)
+        self.assertEqual(p.get('test', 5), 5)
+        self.assertEqual(p.keys(), CURRENCIES)
+        self.assertEqual(dict(p.items())[CURRENCIES[2]], 4)
+        self.assertIn(CURRENCIES[0], p)
+        self.assertNotIn('test', p)
+        self.assertEqual(len(p), len(CURRENCIES))
+        with self.assertRaises(KeyError):
+            p['test'] # pylint: disable=pointless-statement
+        with self.assertRaises(KeyError):
+            p[len(CURRENCIES)] = 1
+        with self.assertRaises(AttributeError):
+            p.test # pylint: disable=pointless-statement
+
+    def testCopy(self):
+        p = Portfolio(**{CURRENCIES[0]: 1})
+        p.next[0] = 2
+        for copy in (deepcopy(p), pickle.loads(pickle.dumps(p, 2))):
+            self.assertEqual(copy[0], 1)
+            self.assertEqual(copy.next[0], 2)
+            copy[0] = 3
+            self.assertEqual(p[0], 1)
 
 
 class TestStorage(TestCase):
@@ -124,6 +159,58 @@ class TestData(TestCase):
         pairData.assert_has_calls([call(src, pair, interval=3)
                                    for pair in PAIRS])
 
+        pairData.reset_mock()
+        data.update(2)
+        self.assertIs(data(interval=3), d)
+        self.assertIs(d(), d)
+        self.assertIs(d(interval=None), d)
+        self.assertIs(data(), data)
+        self.assertFalse(pairData.called)
+        self.assertEqual(d._tick, 2)
+        for pair in PAIRS:
+            d[pair].update.assert_called_with(2)
+
+    @patch('backtest.data.DataSource.panel')
+    def testPanel(self, panel, pairData, contains):
+        contains.side_effect = set(['btc_usd', 'ltc_btc']).__contains__
+        src = DataSource()
+        data = Data(src, interval=2)
+        self.assertEqual(data.pairs(), ['btc_usd', 'ltc_btc'])
+        window = np.arange(24).reshape(2, 3, 4)
+        panel.return_value.window.return_value = window
+        data.update(5)
+        assert_array_equal(data.panel('high', 2),
+                           window[:, :, DATA_INDEX.high])
+        assert_array_equal(data.panel('price', 2),
+                           window[:, :, DATA_INDEX.price])
+        panel.assert_called_once_with(['btc_usd', 'ltc_btc'], 2)
+        panel.return_value.window.assert_called_with(5, 2)
+
+        with self.assertRaises(TradewaveDataError):
+            data.panel('high', 0)
+        with self.assertRaises(TradewaveDataError):
+            data.panel('test', 1)
+        panel.return_value.window.side_effect = IndexError
+        with self.assertRaises(TradewaveDataError):
+            data.panel('high', 1)
+
+    def testExchange(self, pairData, contains):
+        datasets = set(['btc_usd', 'kraken:btc_usd', 'kraken:ltc_usd'])
+        contains.side_effect = datasets.__contains__
+        src = DataSource()
+        data = Data(src, exchange='kraken')
+        self.assertEqual(data._exchange, 'kraken')
+        pairData.assert_has_calls([call(src, 'kraken:btc_usd', interval=None),
+                                   call(src, 'kraken:ltc_usd', interval=None)])
+        self.assertEqual(pairData.call_count, 2)
+
+        pairData.reset_mock()
+        d = data(exchange=EXCHANGES.index('btce'))
+        self.assertEqual(d._exchange, 'btce')
+        pairData.assert_called_once_with(src, 'btc_usd', interval=None)
+        self.assertIs(data(exchange='btce'), d)
+        self.assertIs(d(exchange='kraken'), data)
+
 
 @patch('backtest.data.DataSource.get_current',
        return_value=list(range(4)))
@@ -137,29 +224,40 @@ class TestPairData(TestCase):
         self.assertEqual(data._name, 'test')
         self.assertEqual(data._tick, 1)
         self.assertEqual(data._interval, 1)
-        get_current.assert_called_with(1, 'test', 1)
+        self.assertFalse(get_current.called)
         candle = get_current.return_value
         for attr in DATA:
             self.assertEqual(data[attr], candle[DATA_INDEX[attr]])
+        get_current.assert_called_once_with(1, 'test', 1)
 
     def testUpdate(self, get_prev, get_current):
         data = PairData(DataSource(), 'test')
         self.assertIsNone(data._tick)
+        with self.assertRaises(KeyError):
+            data['price'] # pylint: disable=pointless-statement
         data.update(2)
-        get_current.assert_called_with(2, 'test', None)
+        self.assertFalse(get_current.called)
         self.assertEqual(data._tick, 2)
         candle = get_current.return_value
         for attr in DATA:
             self.assertEqual(data[attr], candle[DATA_INDEX[attr]])
+        get_current.assert_called_once_with(2, 'test', None)
+
+        candle = get_current.return_value = [5, 4, 3, 2]
+        data.update(3)
+        self.assertEqual(data.price, candle[DATA_INDEX.price])
+        get_current.assert_called_with(3, 'test', None)
+        self.assertEqual(get_current.call_count, 2)
 
     def testUpdateError(self, get_prev, get_current):
         get_current.side_effect = IndexError
         data = PairData(DataSource(), 'test')
+        data.update(1)
         with self.assertRaises(TradewaveDataError):
-            data.update(1)
+            data.price # pylint: disable=pointless-statement
         get_current.side_effect = KeyError
         with self.assertRaises(TradewaveDataError):
-            data.update(1)
+            data.price # pylint: disable=pointless-statement
 
     def testPeriod(self, get_prev, get_current):
         data = PairData(DataSource(), 'test', 1, interval=2)
@@ -170,6 +268,18 @@ class TestPairData(TestCase):
                 dataset[:, DATA_INDEX[attr]]
             )
             get_prev.assert_called_with(1, 2, 'test', 2)
+        self.assertEqual(get_prev.call_count, 1)
+
+        data.period(3, 'open')
+        self.assertEqual(get_prev.call_count, 2)
+        get_prev.assert_called_with(1, 3, 'test', 2)
+        data.period(2, 'close')
+        self.assertEqual(get_prev.call_count, 2)
+
+        data.update(2)
+        data.period(2, 'close')
+        self.assertEqual(get_prev.call_count, 3)
+        get_prev.assert_called_with(2, 2, 'test', 2)
 
     def testPeriodError(self, get_prev, get_current):
         data = PairData(DataSource(), 'test', 1)
@@ -185,15 +295,30 @@ class TestPairData(TestCase):
         with self.assertRaises(TradewaveDataError):
             data.period(1, 'test')
 
+    def testStats(self, get_prev, get_current):
+        data = PairData(DataSource(), 'test', 1, interval=2)
+        price = get_prev.return_value[:, DATA_INDEX.price]
+        self.assertAlmostEqual(float(data.ma(4)), price.mean())
+        self.assertAlmostEqual(float(data.std(4)), price.std())
+        get_prev.assert_called_with(1, 4, 'test', 2)
+
+        with self.assertRaises(TradewaveDataError):
+            data.ma(0)
+        get_prev.side_effect = IndexError
+        with self.assertRaises(TradewaveDataError):
+            data.std(4)
+
     def testGetItem(self, get_prev, get_current):
         data = PairData(DataSource(), 'test', 3)
 
         self.assertIs(data[0], data)
+        data.load()
 
         prev_candle = get_current.return_value
         candle = [5, 4, 3, 2]
         get_current.return_value = candle
         d = data[-2]
+        d.load()
         get_current.assert_called_with(1, 'test', None)
 
         for attr in DATA:
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from backtest.api.tradewave.orders import Order, OrderBook
+
+
+class TestOrderBook(TestCase):
+    def testAdd(self):
+        book = OrderBook()
+        order = book.add(1, Order.BUY, 2, 3, 10)
+        self.assertEqual((order.id, order.pair, order.side,
+                          order.amount, order.price, order.expires),
+                         (0, 1, Order.BUY, 2, 3, 10))
+        self.assertTrue(order.active)
+        self.assertEqual(book.add(2, Order.SELL, 1, 1).id, 1)
+        self.assertEqual(len(book), 2)
+        self.assertEqual(book.pairs(), set([1, 2]))
+
+    def testCancel(self):
+        book = OrderBook()
+        order = book.add(0, Order.BUY, 1, 1)
+        self.assertTrue(book.cancel(order))
+        self.assertFalse(book.cancel(order))
+        self.assertFalse(order.active)
+        self.assertEqual(len(book), 0)
+        self.assertEqual(book.fill(0, 10, 0), [])
+        self.assertEqual(book.pairs(), set())
+
+    def testClear(self):
+        book = OrderBook()
+        orders = [book.add(0, Order.BUY, 1, 1, 10),
+                  book.add(1, Order.SELL, 1, 1)]
+        book.cancel(book.add(0, Order.BUY, 1, 2))
+        self.assertEqual(book.clear(), orders)
+        self.assertFalse(orders[0].active)
+        self.assertEqual(len(book), 0)
+        self.assertEqual(book.pairs(), set())
+        self.assertEqual(book.expire(100), [])
+
+    def testFill(self):
+        book = OrderBook()
+        bids = [book.add(0, Order.BUY, 1, price) for price in (3, 5, 4)]
+        asks = [book.add(0, Order.SELL, 1, price) for price in (8, 6, 7)]
+        other = book.add(1, Order.BUY, 1, 10)
+        self.assertEqual(book.fill(0, 5.5, 4.5), [bids[1]])
+        self.assertEqual(book.fill(0, 7, 2), [bids[2], bids[0],
+                                              asks[1], asks[2]])
+        self.assertEqual(len(book), 2)
+        self.assertTrue(other.active)
+        self.assertTrue(asks[0].active)
+
+    def testExpire(self):
+        book = OrderBook()
+        orders = [book.add(0, Order.BUY, 1, 1, expires)
+                  for expires in (20, 10, None, 30)]
+        self.assertEqual(book.expire(10), [])
+        book.cancel(orders[0])
+        self.assertEqual(book.expire(25), [orders[1]])
+        self.assertEqual(book.expire(100), [orders[3]])
+        self.assertEqual(len(book), 1)
+        self.assertTrue(orders[2].active)
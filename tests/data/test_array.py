@@ -3,10 +3,17 @@ from unittest import TestCase
 from tempfile import mkstemp
 from os import remove, close
 from sys import exc_info
+try:
+    from unittest.mock import patch # pylint:disable=import-error,no-name-in-module
+except ImportError:
+    from mock import patch
 import numpy as np
 from numpy.testing import assert_array_equal
 
-from backtest.data.array import ArrayDataSource, FileDataSource
+from backtest.data.base import DataSource, find_dataset
+from backtest.data.array import (ArrayDataSource, FileDataSource,
+                                 MultiFileDataSource, ArrayPanelAccessor,
+                                 strided_cumsum, block_anchors)
 
 
 class TestArrayDataSource(TestCase):
@@ -95,6 +102,54 @@ class TestArrayDataSource(TestCase):
         src = ArrayDataSource({})
         self.assertEqual(src.get_max_ticks(), 0)
 
+        src = ArrayDataSource(self.data, start_time=2, tick_size=2,
+                              data_start_time=0, data_tick_size=1,
+                              end_time=7)
+        self.assertEqual(src.end_time, 7)
+        self.assertEqual(src.get_max_ticks('dataset0'), 3)
+        self.assertEqual(src.get_max_ticks('dataset1'), 1)
+        src.end_time = 1
+        self.assertEqual(src.get_max_ticks('dataset0'), 0)
+
+    def testView(self):
+        src = ArrayDataSource(self.data, data_start_time=2, data_tick_size=2)
+        src.resample('dataset0', 2)
+        view = src.view(start_time=6, end_time=12, tick_size=4)
+        self.assertIs(view.data, src.data)
+        self.assertIs(view.cache, src.cache)
+        self.assertEqual(view.start_time, 4)
+        self.assertEqual(view.tick_size, 4)
+        self.assertEqual(view.end_time, 12)
+        self.assertEqual(view.tick_offset, 1)
+        self.assertEqual(view.tick_multiplier, 2)
+        self.assertEqual(view.get_max_ticks('dataset0'), 3)
+        assert_array_equal(view.get_current(1, 'dataset0'), [16, 13, 14, 19])
+
+        view2 = view.view()
+        self.assertEqual(view2.start_time, 4)
+        self.assertEqual(view2.tick_size, 4)
+        self.assertEqual(view2.end_time, 12)
+        self.assertIs(view2.cache, src.cache)
+
+    def testResample(self):
+        src = ArrayDataSource(self.data)
+        self.assertIs(src.resample('dataset0', 1), self.data['dataset0'])
+        res = src.resample('dataset0', 3)
+        self.assertIs(src.resample('dataset0', 3), res)
+        assert_array_equal(res, [
+            [8, 1, 2, 11], [12, 5, 6, 15], [16, 9, 10, 19],
+            [20, 13, 14, 23], [24, 17, 18, 27], [28, 21, 22, 31]
+        ])
+        for step in range(2, 9):
+            res = src.resample('dataset1', step)
+            data = self.data['dataset1']
+            self.assertEqual(len(res), max(len(data) - step + 1, 0))
+            for i, candle in enumerate(res):
+                assert_array_equal(candle, [
+                    data[i:i + step, 0].max(), data[i:i + step, 1].min(),
+                    data[i, 2], data[i + step - 1, 3]
+                ])
+
     def testGetCurrent(self):
         src = ArrayDataSource(self.data)
         assert_array_equal(
@@ -194,6 +249,162 @@ class TestArrayDataSource(TestCase):
             except AssertionError as err:
                 raise AssertionError(err.message, test), None, exc_info()[2]
 
+    def testGetSums(self):
+        src = ArrayDataSource(self.data)
+        sums = src.get_sums('dataset0', 3, 2)
+        self.assertIs(src.get_sums('dataset0', 3, 2), sums)
+        close = src.resample('dataset0', 2)[:, 3]
+        close -= close[np.arange(len(close)) % 2]
+        assert_array_equal(sums[:, 0], [0, 0] + [
+            close[i::-2].sum() for i in range(len(close))
+        ])
+        assert_array_equal(sums[2:, 1] - sums[:-2, 1], close ** 2)
+
+    def testStridedCumsum(self):
+        values = np.arange(1, 12)
+        assert_array_equal(strided_cumsum(values, 2),
+                           [0, 0, 1, 2, 4, 6, 9, 12, 16, 20, 25, 30, 36])
+        assert_array_equal(strided_cumsum(values, 2, 2),
+                           [0, 0, 1, 2, 4, 6, 5, 6, 12, 14, 9, 10, 20])
+        assert_array_equal(block_anchors(11, 2, 2),
+                           [0, 1, 0, 1, 4, 5, 4, 5, 8, 9, 8])
+
+    def testGetStats(self):
+        src = ArrayDataSource(self.data, tick_size=2)
+        for tick, length, interval in [(3, 2, None), (3, 3, 2),
+                                       (7, 3, 4), (5, 1, 6)]:
+            for column in range(4):
+                values = src.get_prev(tick, length, 'dataset0',
+                                      interval)[:, column]
+                mean, std = src.get_stats(tick, length, 'dataset0',
+                                          column, interval)
+                self.assertAlmostEqual(mean, values.mean())
+                self.assertAlmostEqual(std, values.std())
+
+        with self.assertRaises(IndexError):
+            src.get_stats(2, 4, 'dataset0', 3)
+        with self.assertRaises(KeyError):
+            src.get_stats(1, 1, 'dataset2', 3)
+
+    def testGetStatsPrecision(self):
+        values = 1e6 + np.cumsum(np.random.RandomState(0).randn(100000))
+        values[-10:] = 1e6 + 1e-3 * np.arange(10)
+        src = ArrayDataSource({'x': np.column_stack([values] * 4)})
+        for length in [10, 100, 10000]:
+            mean, std = src.get_stats(len(values) - 1, length, 'x', 3)
+            window = values[-length - 1:-1]
+            self.assertAlmostEqual(mean / window.mean(), 1, places=12)
+            self.assertAlmostEqual(std / window.std(), 1, places=6)
+
+    @patch.object(DataSource, 'get_stats')
+    def testGetStatsTrend(self, fallback):
+        rand = np.random.RandomState(0)
+        values = 1e4 + 0.05 * np.arange(300000) + rand.randn(300000)
+        src = ArrayDataSource({'x': np.column_stack([values] * 4)},
+                              tick_size=5)
+        for interval in [None, 60]:
+            acc = src.accessor('x', interval)
+            for tick in range(3000, 59999, 997):
+                for length in [10, 50, 200]:
+                    window = src.get_prev(tick, length, 'x', interval)[:, 3]
+                    for mean, std in [acc.stats(tick, length, 3),
+                                      src.get_stats(tick, length, 'x', 3,
+                                                    interval)]:
+                        self.assertAlmostEqual(mean / window.mean(), 1,
+                                               places=12)
+                        self.assertAlmostEqual(std / window.std(), 1,
+                                               places=9)
+        self.assertFalse(fallback.called)
+
+    def testAccessor(self):
+        tests = [
+            ({}, None),
+            ({'tick_size': 2}, 4),
+            ({'tick_size': 2}, 6),
+            ({'start_time': 1, 'tick_size': 2}, None),
+            ({'start_time': 2, 'tick_size': 2, 'end_time': 4}, 2)
+        ]
+        for kwargs, interval in tests:
+            src = ArrayDataSource(self.data, **kwargs)
+            acc = src.accessor('dataset0', interval)
+            self.assertIs(src.accessor('dataset0', interval), acc)
+            try:
+                for tick in range(src.get_max_ticks('dataset0')):
+                    assert_array_equal(
+                        acc.candle(tick),
+                        src.get_current(tick, 'dataset0', interval)
+                    )
+                    for length in range(1, 4):
+                        try:
+                            values = src.get_prev(tick, length,
+                                                  'dataset0', interval)
+                        except IndexError:
+                            with self.assertRaises(IndexError):
+                                acc.window(tick, length)
+                            continue
+                        assert_array_equal(acc.window(tick, length), values)
+                        mean, std = acc.stats(tick, length, 3)
+                        self.assertAlmostEqual(mean, values[:, 3].mean())
+                        self.assertAlmostEqual(std, values[:, 3].std())
+            except AssertionError as err:
+                raise AssertionError(err.message, kwargs, interval), \
+                      None, exc_info()[2]
+
+    def testAccessorError(self):
+        src = ArrayDataSource(self.data, tick_size=2)
+        with self.assertRaises(KeyError):
+            src.accessor('dataset2')
+        with self.assertRaises(ValueError):
+            src.accessor('dataset0', 3)
+        acc = src.accessor('dataset0')
+        with self.assertRaises(IndexError):
+            acc.candle(len(self.data['dataset0']))
+        with self.assertRaises(IndexError):
+            acc.candle(-1)
+        with self.assertRaises(IndexError):
+            acc.window(1, 2)
+
+    def testGetPanel(self):
+        src = ArrayDataSource(self.data)
+        datasets = ['dataset0', 'dataset1']
+        panel = src.get_panel(datasets, 2)
+        self.assertIs(src.get_panel(datasets, 2), panel)
+        self.assertEqual(panel.shape, (7, 2, 4))
+        assert_array_equal(panel[:, 0], src.resample('dataset0', 2))
+        assert_array_equal(panel[:4, 1], src.resample('dataset1', 2))
+        self.assertTrue(np.isnan(panel[4:, 1]).all())
+
+    def testPanel(self):
+        datasets = ['dataset0', 'dataset1']
+        src = ArrayDataSource(self.data, tick_size=2)
+        for interval in [None, 2, 4]:
+            panel = src.panel(datasets, interval)
+            self.assertIs(src.panel(datasets, interval), panel)
+            self.assertEqual(panel.ticks, 8)
+            for tick in range(8):
+                for length in range(1, 3):
+                    try:
+                        expected = src.get_prev(tick, length,
+                                                'dataset0', interval)
+                    except IndexError:
+                        with self.assertRaises(IndexError):
+                            panel.window(tick, length)
+                        continue
+                    window = panel.window(tick, length)
+                    self.assertEqual(window.shape, (length, 2, 4))
+                    assert_array_equal(window[:, 0], expected)
+                    if tick < src.get_max_ticks('dataset1'):
+                        assert_array_equal(
+                            window[:, 1],
+                            src.get_prev(tick, length, 'dataset1', interval)
+                        )
+            self.assertTrue(np.isnan(panel.window(7, 1)[:, 1]).all())
+
+        with self.assertRaises(KeyError):
+            src.panel(['dataset2'])
+        with self.assertRaises(IndexError):
+            src.panel(datasets).window(8, 1)
+
 
 class TestFileDataSource(TestCase):
     @classmethod
@@ -229,3 +440,169 @@ class TestFileDataSource(TestCase):
 
         with self.assertRaises(ValueError):
             FileDataSource(self.fname, start_time=8, tick_size=9)
+
+
+class TestMultiFileDataSource(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.x = np.arange(40, dtype=float).reshape(10, 4)
+        cls.y = np.arange(100, 120, dtype=float).reshape(5, 4)
+        cls.fnames = []
+        for info, data in [([60, 60], {'x': cls.x}),
+                           ([0, 120], {'y': cls.y}),
+                           ([0, 60], {'y': cls.x})]:
+            fd, fname = mkstemp(suffix='.npz')
+            close(fd)
+            np.savez(fname, info=np.array(info), **data)
+            cls.fnames.append(fname)
+
+    @classmethod
+    def tearDownClass(cls):
+        for fname in cls.fnames:
+            remove(fname)
+
+    def testInit(self):
+        src = MultiFileDataSource(self.fnames[:2])
+        self.assertEqual(src.data_start_time, 60)
+        self.assertEqual(src.data_tick_size, 60)
+        self.assertEqual(src.start_time, 120)
+        self.assertEqual(src.tick_size, 120)
+        self.assertEqual(src.get_layout('x'), (1, 2, 60))
+        self.assertEqual(src.get_layout('y'), (1, 1, 120))
+        assert_array_equal(src.data['x'], self.x)
+        assert_array_equal(src.data['y'], self.y)
+        self.assertEqual(src.get_max_ticks(), 4)
+        assert_array_equal(src.get_current(0, 'x'), [8, 5, 6, 11])
+        assert_array_equal(src.get_current(0, 'y'), self.y[1])
+        assert_array_equal(src.get_current(1, 'x', 60), self.x[3])
+        assert_array_equal(src.get_prev(1, 2, 'x', 60), self.x[1:3])
+        assert_array_equal(src.get_plot('x'), self.x[2:9:2, 3])
+        self.assertEqual(src.get_stats(1, 2, 'x', 3, 60), (9, 2))
+        with self.assertRaises(ValueError):
+            src.get_current(0, 'y', 60)
+
+        panel = src.panel(['x', 'y'])
+        self.assertEqual(type(panel), ArrayPanelAccessor)
+        assert_array_equal(panel.window(2, 2)[:, 1], self.y[1:3])
+        for tick in range(2, 4):
+            assert_array_equal(panel.window(tick, 2), np.stack(
+                [src.get_prev(tick, 2, 'x'), src.get_prev(tick, 2, 'y')],
+                axis=1
+            ))
+        self.assertEqual(type(src.panel(['x'])), ArrayPanelAccessor)
+
+        view = src.view(start_time=240)
+        self.assertEqual(view.get_layout('x'), (3, 2, 60))
+        assert_array_equal(view.get_current(0, 'y'), self.y[2])
+
+        src = MultiFileDataSource(self.fnames[:2], start_time=240,
+                                  tick_size=240)
+        self.assertEqual(src.get_layout('x'), (3, 4, 60))
+        self.assertEqual(src.get_layout('y'), (2, 2, 120))
+        self.assertEqual(src.get_max_ticks(), 1)
+
+    def testAlignedPanel(self):
+        fnames = []
+        try:
+            for info, data in [([60, 60], {'x': self.x}),
+                               ([0, 60], {'y': self.x[:6] + 50})]:
+                fd, fname = mkstemp(suffix='.npz')
+                close(fd)
+                np.savez(fname, info=np.array(info), **data)
+                fnames.append(fname)
+            src = MultiFileDataSource(fnames, start_time=120, tick_size=120)
+            padded = np.empty((11, 4))
+            padded.fill(np.nan)
+            padded[1:] = self.x
+            uniform = ArrayDataSource({'x': padded, 'y': self.x[:6] + 50},
+                                      120, 120, 0, 60)
+            for interval in [None, 120, 240]:
+                panel = src.panel(['x', 'y'], interval)
+                expected = uniform.panel(['x', 'y'], interval)
+                self.assertEqual(type(panel), ArrayPanelAccessor)
+                for tick in range(panel.ticks):
+                    for length in range(1, 4):
+                        try:
+                            res = expected.window(tick, length)
+                        except IndexError:
+                            with self.assertRaises(IndexError):
+                                panel.window(tick, length)
+                            continue
+                        res = res.copy()
+                        res[np.isnan(res).any(axis=-1)] = np.nan
+                        assert_array_equal(panel.window(tick, length), res)
+            window = src.panel(['x', 'y']).window(3, 1)
+            assert_array_equal(window[:, 0], src.get_prev(3, 1, 'x'))
+            self.assertTrue(np.isnan(window[:, 1]).all())
+            view = src.view(start_time=240)
+            self.assertIs(view.panel(['x', 'y']).data,
+                          src.panel(['x', 'y']).data)
+        finally:
+            for fname in fnames:
+                remove(fname)
+
+    def testDefaultDataset(self):
+        fnames = []
+        try:
+            for data in [{'btc_usd': self.x, 'ltc_usd': self.x},
+                         {'ltc_btc': self.x, 'eth_btc': self.x,
+                          'xrp_btc': self.x}]:
+                fd, fname = mkstemp(suffix='.npz')
+                close(fd)
+                np.savez(fname, info=np.array([0, 60]), **data)
+                fnames.append(fname)
+            default = find_dataset(FileDataSource(fnames[0]))
+            src = MultiFileDataSource(fnames)
+            self.assertEqual(find_dataset(src), default)
+            self.assertEqual(sorted(src.datasets()[:2]),
+                             ['btc_usd', 'ltc_usd'])
+            self.assertEqual(find_dataset(src.view(start_time=60)), default)
+        finally:
+            for fname in fnames:
+                remove(fname)
+
+    def testInitError(self):
+        with self.assertRaises(ValueError):
+            MultiFileDataSource([])
+        with self.assertRaises(ValueError):
+            MultiFileDataSource(self.fnames[1:])
+        with self.assertRaises(ValueError):
+            MultiFileDataSource(self.fnames[:2], start_time=0)
+        with self.assertRaises(ValueError):
+            MultiFileDataSource(self.fnames[:2], tick_size=60)
+
+
+class TestFloat32(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rand = np.random.RandomState(1)
+        close = 1000 * np.exp(np.cumsum(rand.randn(5000) * 0.01))
+        data = np.empty((len(close), 4))
+        data[:, 2] = np.roll(close, 1)
+        data[:, 3] = close
+        data[:, 0] = data[:, 2:].max(axis=1) * 1.001
+        data[:, 1] = data[:, 2:].min(axis=1) * 0.999
+        cls.src64 = ArrayDataSource({'x': data}, tick_size=5)
+        cls.src32 = ArrayDataSource({'x': data.astype(np.float32)},
+                                    tick_size=5)
+
+    def testDtype(self):
+        self.assertEqual(self.src32.resample('x', 5).dtype, np.float32)
+        self.assertEqual(self.src32.get_panel(['x'], 5).dtype, np.float32)
+        self.assertEqual(self.src32.get_sums('x', 3, 5).dtype, np.float64)
+
+    def testPrecision(self):
+        eps = np.finfo(np.float32).eps
+        for interval in [None, 15, 60]:
+            acc64 = self.src64.accessor('x', interval)
+            acc32 = self.src32.accessor('x', interval)
+            for tick in range(700, 1000, 7):
+                price = acc64.candle(tick)
+                self.assertLess(
+                    abs(acc32.candle(tick) / price - 1).max(), eps
+                )
+                for length in [5, 20, 50]:
+                    mean64, std64 = acc64.stats(tick, length, 3)
+                    mean32, std32 = acc32.stats(tick, length, 3)
+                    self.assertLess(abs(mean32 / mean64 - 1), eps)
+                    self.assertLess(abs(std32 - std64), eps * mean64)
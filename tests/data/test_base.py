@@ -2,7 +2,9 @@ from unittest import TestCase
 
 from sys import exc_info
 
-from backtest.data.base import DataSource
+from backtest.data import ArrayDataSource
+from backtest.data.base import (DataSource, split_dataset, get_dataset,
+                                get_exchanges, find_dataset)
 
 
 class TestDataSource(TestCase):
@@ -23,3 +25,48 @@ class TestDataSource(TestCase):
                     DataSource(*test)
             except AssertionError as err:
                 raise AssertionError(err.message, test), None, exc_info()[2]
+
+
+class TestDataset(TestCase):
+    datasets = {'btc_usd': 0, 'kraken:btc_usd': 1, 'btce:btc_usd': 2,
+                'kraken:ltc_usd': 3}
+
+    def testSplit(self):
+        self.assertEqual(split_dataset('btc_usd'), (None, 'btc_usd'))
+        self.assertEqual(split_dataset('kraken:btc_usd'),
+                         ('kraken', 'btc_usd'))
+
+    def testGet(self):
+        self.assertEqual(get_dataset(self.datasets, 'btc_usd'), 'btc_usd')
+        self.assertEqual(get_dataset(self.datasets, 'btc_usd', 'kraken'),
+                         'kraken:btc_usd')
+        self.assertEqual(get_dataset(self.datasets, 'btc_usd', 'bitstamp'),
+                         'btc_usd')
+        self.assertEqual(get_dataset(self.datasets, 'ltc_btc', 'kraken'),
+                         'ltc_btc')
+
+    def testExchanges(self):
+        src = DataSource()
+        src.datasets = self.datasets.keys
+        self.assertEqual(get_exchanges(src, 'btc_usd'), ['btce', 'kraken'])
+        self.assertEqual(get_exchanges(src, 'ltc_usd'), ['kraken'])
+        self.assertEqual(get_exchanges(src, 'ltc_btc'), [])
+
+    def testFind(self):
+        src = ArrayDataSource({'kraken:ltc_usd': None})
+        self.assertEqual(find_dataset(src),
+                         ('ltc_usd', 'kraken', 'kraken:ltc_usd'))
+        src = ArrayDataSource(dict.fromkeys(self.datasets))
+        self.assertEqual(find_dataset(src, 'btc_usd'),
+                         ('btc_usd', None, 'btc_usd'))
+        del src.data['btc_usd']
+        self.assertEqual(find_dataset(src, 'btc_usd'),
+                         ('btc_usd', 'btce', 'btce:btc_usd'))
+        self.assertEqual(find_dataset(src, 'btc_usd', 'kraken'),
+                         ('btc_usd', 'kraken', 'kraken:btc_usd'))
+        self.assertEqual(find_dataset(src, 'btc_usd', 'bitstamp'),
+                         ('btc_usd', 'bitstamp', 'btc_usd'))
+        self.assertEqual(find_dataset(src, 'ltc_btc'),
+                         ('ltc_btc', None, 'ltc_btc'))
+        with self.assertRaises(ValueError):
+            find_dataset(ArrayDataSource({}))
@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from tempfile import mkstemp
+from os import remove, close
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from backtest.data.array import FileDataSource, MultiFileDataSource
+from backtest.data.header import read_header, checksum
+from backtest.data.chunked import save_chunked, BlockReader
+
+
+class TestChunked(TestCase):
+    data = {
+        'btc_usd': np.arange(400, dtype=float).reshape(100, 4),
+        'ltc_usd': np.arange(1000, 1160, dtype=float).reshape(40, 4)
+    }
+
+    def setUp(self):
+        fd, self.fname = mkstemp(suffix='.npz')
+        close(fd)
+        save_chunked(self.fname, 100, 10, self.data, block_rows=16)
+
+    def tearDown(self):
+        remove(self.fname)
+
+    def testHeader(self):
+        header = read_header(self.fname)
+        self.assertEqual(header['format'], 'chunked')
+        self.assertEqual(header['block_rows'], 16)
+        self.assertEqual(header['start_time'], 100)
+        self.assertEqual(header['tick_size'], 10)
+        self.assertEqual(header['datasets'], {'btc_usd': 100, 'ltc_usd': 40})
+        self.assertEqual(header['checksum'], checksum(self.data))
+
+        with self.assertRaises(ValueError):
+            save_chunked(self.fname, 100, 10, self.data, block_rows=0)
+
+    def testBlockReader(self):
+        reader = BlockReader(self.fname, read_header(self.fname))
+        for start, stop in [(0, 100), (0, 16), (15, 17), (20, 90), (95, 200)]:
+            assert_array_equal(reader.rows('btc_usd', start, stop),
+                               self.data['btc_usd'][start:stop])
+        self.assertEqual(len(reader.rows('ltc_usd', 50, 60)), 0)
+        assert_array_equal(reader.block('btc_usd', 5),
+                           self.data['btc_usd'][80:96])
+        reader.close()
+        self.assertIsNone(reader.archive)
+
+    def testFileDataSource(self):
+        src = FileDataSource(self.fname)
+        self.assertEqual(src.data_start_time, 100)
+        for dataset, values in self.data.items():
+            assert_array_equal(src.data[dataset], values)
+
+        src = FileDataSource(self.fname, start_time=600, end_time=800,
+                             lookback=20)
+        self.assertEqual(src.data_start_time, 580)
+        self.assertEqual(src.start_time, 600)
+        self.assertEqual(len(src.data['btc_usd']), 23)
+        self.assertEqual(len(src.data['ltc_usd']), 0)
+        self.assertEqual(src.get_max_ticks('btc_usd'), 21)
+        assert_array_equal(src.get_current(0, 'btc_usd'),
+                           self.data['btc_usd'][50])
+        assert_array_equal(src.get_current(20, 'btc_usd'),
+                           self.data['btc_usd'][70])
+        assert_array_equal(src.get_prev(0, 2, 'btc_usd'),
+                           self.data['btc_usd'][48:50])
+
+        src = FileDataSource(self.fname, start_time=600, tick_size=20,
+                             lazy=True, lookback=20)
+        self.assertEqual(src.data_start_time, 580)
+        self.assertEqual(src.get_max_ticks('btc_usd'), 25)
+        self.assertFalse(src.data.arrays)
+        assert_array_equal(src.get_current(1, 'btc_usd'),
+                           [212, 209, 210, 215])
+        self.assertEqual(list(src.data.arrays), ['btc_usd'])
+
+    def testMultiFileDataSource(self):
+        src = MultiFileDataSource([self.fname])
+        for dataset, values in self.data.items():
+            assert_array_equal(src.data[dataset], values)
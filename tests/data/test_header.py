@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from tempfile import mkstemp
+from os import remove, close
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from backtest.data.array import FileDataSource
+from backtest.data.header import (checksum, create_header, read_header,
+                                  save, LazyData, load_array)
+
+
+class TestHeader(TestCase):
+    data = {
+        'btc_usd': np.arange(40, dtype=float).reshape(10, 4),
+        'kraken:btc_usd': np.arange(20, dtype=float).reshape(5, 4),
+        'ltc_usd': np.arange(16, dtype=float).reshape(4, 4)
+    }
+
+    def setUp(self):
+        fd, self.fname = mkstemp(suffix='.npz')
+        close(fd)
+
+    def tearDown(self):
+        remove(self.fname)
+
+    def testChecksum(self):
+        res = checksum(self.data)
+        self.assertEqual(checksum(dict(self.data)), res)
+        self.assertEqual(checksum(self.data, rows=1), res)
+        data = dict((name, np.asfortranarray(values))
+                    for name, values in self.data.items())
+        self.assertEqual(checksum(data, rows=3), res)
+        data = dict(self.data)
+        data['ltc_usd'] = data['ltc_usd'].astype(np.float32)
+        self.assertNotEqual(checksum(data), res)
+        data['ltc_usd'] = self.data['ltc_usd'].copy()
+        data['ltc_usd'][0, 0] = 1
+        self.assertNotEqual(checksum(data), res)
+
+    def testCreate(self):
+        header = create_header(60, 30, self.data)
+        self.assertEqual(header['start_time'], 60)
+        self.assertEqual(header['tick_size'], 30)
+        self.assertEqual(header['columns'], ['high', 'low', 'open', 'close'])
+        self.assertEqual(header['datasets'],
+                         {'btc_usd': 10, 'kraken:btc_usd': 5, 'ltc_usd': 4})
+        self.assertEqual(header['pairs'], ['btc_usd', 'ltc_usd'])
+        self.assertEqual(header['checksum'], checksum(self.data))
+
+    def testRead(self):
+        save(self.fname, 60, 30, self.data)
+        self.assertEqual(read_header(self.fname),
+                         create_header(60, 30, self.data))
+
+        np.savez(self.fname, info=np.array([60, 30]), **self.data)
+        header = read_header(self.fname)
+        self.assertEqual(header['start_time'], 60)
+        self.assertEqual(header['tick_size'], 30)
+        self.assertEqual(header['datasets'],
+                         {'btc_usd': 10, 'kraken:btc_usd': 5, 'ltc_usd': 4})
+        self.assertIsNone(header['checksum'])
+
+    def testLazyData(self):
+        save(self.fname, 60, 30, self.data)
+        header = read_header(self.fname)
+        data = LazyData(header['datasets'],
+                        lambda name: load_array(self.fname, name), header)
+        self.assertEqual(len(data), 3)
+        self.assertEqual(sorted(data.keys()), sorted(self.data))
+        self.assertTrue('btc_usd' in data)
+        self.assertFalse('info' in data)
+        self.assertEqual(data.length('ltc_usd'), 4)
+        self.assertFalse(data.arrays)
+        values = data['ltc_usd']
+        assert_array_equal(values, self.data['ltc_usd'])
+        self.assertIs(data['ltc_usd'], values)
+        self.assertEqual(list(data.arrays), ['ltc_usd'])
+        with self.assertRaises(KeyError):
+            data['header'] # pylint: disable=pointless-statement
+
+    def testFileDataSource(self):
+        save(self.fname, 60, 30, self.data)
+        src = FileDataSource(self.fname)
+        self.assertEqual(sorted(src.datasets()), sorted(self.data))
+
+        src = FileDataSource(self.fname, lazy=True)
+        self.assertEqual(src.data_start_time, 60)
+        self.assertEqual(src.data_tick_size, 30)
+        self.assertEqual(sorted(src.datasets()), sorted(self.data))
+        self.assertEqual(src.get_max_ticks(), 4)
+        self.assertEqual(src.get_max_ticks('btc_usd'), 10)
+        self.assertFalse(src.data.arrays)
+        assert_array_equal(src.get_current(2, 'btc_usd'),
+                           self.data['btc_usd'][2])
+        self.assertEqual(list(src.data.arrays), ['btc_usd'])
@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from os.path import exists
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from backtest.data.array import ArrayDataSource
+from backtest.data.shared import DataServer, load, open_shared
+
+
+class TestDataServer(TestCase):
+    data = {
+        'dataset0': np.arange(32, dtype=float).reshape(8, 4),
+        'dataset1': np.arange(20, dtype=float).reshape(5, 4)
+    }
+
+    def setUp(self):
+        self.src = ArrayDataSource(self.data, start_time=4, tick_size=2,
+                                   data_start_time=2, data_tick_size=1,
+                                   end_time=8)
+        self.server = DataServer(self.src, steps=(2, 3))
+
+    def tearDown(self):
+        self.server.close()
+
+    def testLoad(self):
+        src = load(self.server.path)
+        self.assertEqual(src.start_time, 4)
+        self.assertEqual(src.tick_size, 2)
+        self.assertEqual(src.end_time, 8)
+        self.assertEqual(src.data_start_time, 2)
+        self.assertEqual(src.data_tick_size, 1)
+        self.assertEqual(set(src.datasets()), set(self.data))
+        for dataset, data in self.data.items():
+            self.assertIsInstance(src.data[dataset], np.memmap)
+            assert_array_equal(src.data[dataset], data)
+            for step in (2, 3):
+                res = src.cache['resample', dataset, step]
+                self.assertIsInstance(res, np.memmap)
+                assert_array_equal(res, self.src.resample(dataset, step))
+        assert_array_equal(src.get_prev(2, 2, 'dataset0'),
+                           self.src.get_prev(2, 2, 'dataset0'))
+
+    def testLayouts(self):
+        src = ArrayDataSource(self.data, start_time=4, tick_size=2,
+                              data_start_time=2, data_tick_size=1,
+                              layouts={'dataset1': (0, 2)})
+        with DataServer(src) as server:
+            res = load(server.path)
+            self.assertEqual(res.get_layout('dataset1'), (2, 1, 2))
+            assert_array_equal(res.get_current(1, 'dataset1'),
+                               self.data['dataset1'][3])
+
+    def testOpenShared(self):
+        src = open_shared(self.server.path, start_time=6)
+        src2 = open_shared(self.server.path)
+        self.assertIs(src.data, src2.data)
+        self.assertIs(src.cache, src2.cache)
+        self.assertEqual(src.start_time, 6)
+        self.assertEqual(src2.start_time, 4)
+        self.assertEqual(src.tick_size, 2)
+
+    def testClose(self):
+        with DataServer(self.src) as server:
+            self.assertTrue(exists(server.path))
+        self.assertFalse(exists(server.path))
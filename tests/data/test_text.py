@@ -0,0 +1,134 @@
+from unittest import TestCase
+
+from tempfile import mkstemp
+from os import remove, close
+from io import BytesIO
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from backtest.data.text import (read_chunks, parse_csv, parse_jsonl,
+                                read_text, scan, create_times, place,
+                                forward_fill)
+
+
+class TestText(TestCase):
+    def testReadChunks(self):
+        fp = BytesIO(b'a\nb\n\nc\nd\ne\n')
+        self.assertEqual(list(read_chunks(fp, 2)),
+                         [[b'a\n', b'b\n'], [b'c\n'], [b'd\n', b'e\n']])
+
+    def testParseCsv(self):
+        columns = ['time', 'open', 'close', 'high', 'volume', 'low']
+        times, values = parse_csv(['10,1,2,3,4,5\n', '20,6,7,8,9,10\r\n'],
+                                  columns, {'date': 'time'})
+        assert_array_equal(times, [10, 20])
+        self.assertEqual(times.dtype, np.int64)
+        assert_array_equal(values, [[3, 5, 1, 2], [8, 10, 6, 7]])
+
+        with self.assertRaises(ValueError):
+            parse_csv(['10,1,2,3,4,5'], columns)
+        with self.assertRaises(ValueError):
+            parse_csv(['10,1,2,3,4'], columns, {'date': 'time'})
+        with self.assertRaises(ValueError):
+            parse_csv(['10,1,2,x,4,5'], columns, {'date': 'time'})
+
+        times, values = parse_csv(['10,1,2,3,x,5\n'], columns,
+                                  {'date': 'time'})
+        assert_array_equal(values, [[3, 5, 1, 2]])
+        times, values = parse_csv([
+            '2017-07-14 02:40:00,1,2,3,4,5\n',
+            '"2017-07-14T02:41:00Z",1,2,3,4,5\n'
+        ], columns, {'date': 'time'}, scale=1000)
+        assert_array_equal(times, [1500000000000, 1500000060000])
+        with self.assertRaises(ValueError):
+            parse_csv(['yesterday,1,2,3,4,5'], columns, {'date': 'time'})
+
+    def testParseJsonl(self):
+        times, values = parse_jsonl([
+            '{"date": 10, "high": 3, "low": 1, "open": 2, "close": 2.5}',
+            '{"date": 20, "high": 4, "low": 2, "open": 3, "close": 3.5}'
+        ])
+        assert_array_equal(times, [10, 20])
+        assert_array_equal(values, [[3, 1, 2, 2.5], [4, 2, 3, 3.5]])
+
+        times, values = parse_jsonl([
+            '{"date": "2017-07-14 02:40:00", "high": 3, "low": 1, '
+            '"open": 2, "close": 2.5}',
+            '{"date": "2017-07-14T02:41:00Z", "high": 4, "low": 2, '
+            '"open": 3, "close": 3.5}'
+        ], scale=1000)
+        assert_array_equal(times, [1500000000000, 1500000060000])
+        assert_array_equal(values, [[3, 1, 2, 2.5], [4, 2, 3, 3.5]])
+
+        with self.assertRaises(ValueError):
+            parse_jsonl(['{"date": "yesterday", "high": 3, "low": 1, '
+                         '"open": 2, "close": 1}'])
+        with self.assertRaises(ValueError):
+            parse_jsonl(['{"date": 10, "high": 3, "low": 1, "open": 2}'])
+        with self.assertRaises(ValueError):
+            parse_jsonl(['{"t": 10, "h": 3, "l": 1, "o": 2, "c": 1}'],
+                        {'date': 't', 'high': 'h', 'low': 'l', 'open': 'o'})
+
+    def testReadText(self):
+        fd, fname = mkstemp(suffix='.csv')
+        close(fd)
+        try:
+            with open(fname, 'w') as fp:
+                fp.write('date,high,low,open,close\n'
+                         '1000,1,2,3,4\n2500,5,6,7,8\n\n3000,9,10,11,12\n')
+            chunks = list(read_text(fname, 'csv', scale=1000, size=2))
+            self.assertEqual(len(chunks), 2)
+            assert_array_equal(chunks[0][0], [1, 2])
+            assert_array_equal(chunks[1][0], [3])
+            assert_array_equal(chunks[1][1], [[9, 10, 11, 12]])
+            with self.assertRaises(ValueError):
+                list(read_text(fname, 'xml'))
+        finally:
+            remove(fname)
+
+    def testScan(self):
+        chunks = [(np.array([30, 10, 30]), None),
+                  (np.array([], dtype=int), None),
+                  (np.array([70, 50]), None)]
+        self.assertEqual(scan(chunks), (10, 70, 20))
+        self.assertEqual(scan([(np.array([10]), None)]), (10, 10, None))
+        with self.assertRaises(ValueError):
+            scan([])
+
+    def testPlace(self):
+        out = np.empty((5, 4))
+        out.fill(np.nan)
+        place([
+            (np.array([40, 10, 40, 20]), np.arange(16.0).reshape(4, 4)),
+            (np.array([20, 45]), np.arange(100.0, 108.0).reshape(2, 4))
+        ], out, 0, 10)
+        assert_array_equal(out[1], [4, 5, 6, 7])
+        assert_array_equal(out[2], [100, 101, 102, 103])
+        self.assertTrue(np.isnan(out[3]).all())
+        assert_array_equal(out[4], [104, 9, 10, 107])
+        self.assertTrue(np.isnan(out[0]).all())
+
+    def testPlaceAggregate(self):
+        out = np.empty((2, 4))
+        out.fill(np.nan)
+        times = create_times(len(out))
+        place([
+            (np.array([60, 0]), np.array([[3.5, 1, 1.5, 2.6],
+                                          [2, 0.5, 1, 1.5]])),
+            (np.array([120, 180]), np.array([[4, 2, 3, 3.5],
+                                             [5, 1.5, 3.5, 4]])),
+            (np.array([150]), np.array([[6, 3, 4, 5]]))
+        ], out, 0, 120, times)
+        assert_array_equal(out, [[3.5, 0.5, 1, 2.6], [6, 1.5, 3, 4]])
+        assert_array_equal(times, [[0, 60], [120, 180]])
+
+    def testForwardFill(self):
+        out = np.array([
+            [1, 2, 3, 4], [np.nan] * 4, [5, 6, 7, 8],
+            [np.nan] * 4, [np.nan] * 4, [9, 10, 11, 12], [np.nan] * 4
+        ])
+        self.assertIs(forward_fill(out, block=2), out)
+        assert_array_equal(out, [
+            [1, 2, 3, 4], [4, 4, 4, 4], [5, 6, 7, 8],
+            [8, 8, 8, 8], [8, 8, 8, 8], [9, 10, 11, 12], [12, 12, 12, 12]
+        ])
@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from backtest.data import ArrayDataSource
+from backtest import benchmark
+
+
+def candles(close):
+    return np.array([[c, c, c, c] for c in close], dtype=float)
+
+
+class TestBenchmark(TestCase):
+    def setUp(self):
+        self.src = ArrayDataSource({
+            'btc_usd': candles([10, 20, 40, 20]),
+            'ltc_btc': candles([0.5, 0.5, 0.25, 0.5]),
+            'kraken:btc_usd': candles([1, 1, 1, 1]),
+            'eur_jpy': candles([1, 2, 3])
+        })
+
+    def testGetPairs(self):
+        self.assertEqual(benchmark.get_pairs(self.src),
+                         [('btc_usd', 'btc_usd'), ('eur_jpy', 'eur_jpy'),
+                          ('ltc_btc', 'ltc_btc')])
+        self.assertEqual(benchmark.get_pairs(self.src, 'kraken')[0],
+                         ('btc_usd', 'kraken:btc_usd'))
+
+    def testGetPrices(self):
+        pairs, prices = benchmark.get_prices(self.src, 4)
+        self.assertEqual(pairs, ['btc_usd', 'ltc_btc'])
+        assert_array_almost_equal(prices, [[10, 0.5], [20, 0.5],
+                                           [40, 0.25], [20, 0.5]])
+        self.assertIs(benchmark.get_prices(self.src, 4)[1], prices)
+
+    def testGetRates(self):
+        pairs, prices = benchmark.get_prices(self.src, 4)
+        rates = benchmark.get_rates(pairs, prices, 'usd')
+        self.assertEqual(sorted(rates), ['btc', 'ltc', 'usd'])
+        assert_array_almost_equal(rates['usd'], [1, 1, 1, 1])
+        assert_array_almost_equal(rates['btc'], [10, 20, 40, 20])
+        assert_array_almost_equal(rates['ltc'], [5, 10, 10, 10])
+        rates = benchmark.get_rates(pairs, prices, 'ltc')
+        assert_array_almost_equal(rates['usd'], [0.2, 0.1, 0.1, 0.1])
+
+    def testGetValue(self):
+        rates = {'usd': np.array([1, 1]), 'btc': np.array([10, 20])}
+        portfolio = {'usd': 5, 'btc': 2, 'eur': 0}
+        self.assertAlmostEqual(benchmark.get_value(portfolio, rates), 45)
+        self.assertAlmostEqual(benchmark.get_value(portfolio, rates, 0), 25)
+
+    def testGetBaselines(self):
+        res = benchmark.get_baselines(self.src, {'usd': 10, 'btc': 1},
+                                      'btc_usd', 4)
+        self.assertAlmostEqual(res['start_value'], 20)
+        names = [name for name, _ in res['baselines']]
+        self.assertEqual(names, ['buy and hold BTC', 'buy and hold LTC',
+                                 'equal weight', 'cash'])
+        series = dict(res['baselines'])
+        assert_array_almost_equal(series['buy and hold BTC'],
+                                  [20, 40, 80, 40])
+        assert_array_almost_equal(series['buy and hold LTC'],
+                                  [20, 40, 40, 40])
+        assert_array_almost_equal(series['equal weight'],
+                                  [20, 40, 60, 45])
+        assert_array_almost_equal(series['cash'], [20, 20, 20, 20])
+        self.assertIs(benchmark.get_baselines(self.src, {'usd': 10, 'btc': 1},
+                                              'btc_usd', 4), res)
+
+        res = benchmark.get_baselines(self.src, {'ltc': 10, 'btc': 1},
+                                      'ltc_btc', 4)
+        names = [name for name, _ in res['baselines']]
+        self.assertEqual(names, ['buy and hold LTC', 'buy and hold USD',
+                                 'equal weight', 'cash'])
@@ -0,0 +1,127 @@
+from unittest import TestCase
+
+from argparse import Namespace
+from tempfile import mkdtemp
+from shutil import rmtree
+from io import BytesIO
+import os
+import numpy as np
+
+from backtest.cache import (hash_file, hash_data, get_imports, get_helpers,
+                            hash_sources, get_key, Recorder, ResultCache)
+from backtest.data.header import save
+
+
+class TestCache(TestCase):
+    def setUp(self):
+        self.path = mkdtemp()
+        os.mkdir(os.path.join(self.path, 'lib'))
+        self.files = {
+            'strategy.py': 'import helper\nfrom lib import util\n'
+                           'import numpy\n',
+            'helper.py': 'from lib.other import x\n',
+            'lib/__init__.py': '',
+            'lib/util.py': 'y = 1\n',
+            'lib/other.py': 'x = 1\n',
+            'unused.py': ''
+        }
+        for fname, data in self.files.items():
+            self.write(fname, data)
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def join(self, fname):
+        return os.path.join(self.path, fname)
+
+    def write(self, fname, data):
+        with open(self.join(fname), 'w') as fp:
+            fp.write(data)
+
+    def testHashFile(self):
+        res = hash_file(self.join('helper.py'), block_size=4)
+        self.assertEqual(hash_file(self.join('helper.py')), res)
+        self.assertNotEqual(hash_file(self.join('strategy.py')), res)
+
+    def testHashData(self):
+        data = {'btc_usd': np.arange(8.0).reshape(2, 4)}
+        fname = self.join('data.npz')
+        save(fname, 0, 60, data)
+        res = hash_data(fname)
+        self.assertEqual(len(res), 40)
+        save(fname, 0, 60, data, compressed=False)
+        self.assertEqual(hash_data(fname), res)
+        save(fname, 60, 60, data)
+        self.assertNotEqual(hash_data(fname), res)
+        save(fname, 0, 120, data)
+        self.assertNotEqual(hash_data(fname), res)
+
+        fname = self.join('helper.py')
+        os.utime(fname, (1, 1))
+        res = hash_data(fname)
+        self.assertEqual(hash_data(fname), res)
+        os.utime(fname, (2, 2))
+        self.assertNotEqual(hash_data(fname), res)
+
+    def testHelpers(self):
+        self.assertEqual(sorted(get_imports(self.join('strategy.py'))),
+                         ['helper', 'lib', 'lib.util', 'numpy'])
+        self.assertEqual(get_helpers(self.join('strategy.py')), sorted(
+            self.join(fname) for fname in self.files if fname != 'unused.py'
+        ))
+
+    def testHashSources(self):
+        paths = [self.join('strategy.py'), self.join('helper.py')]
+        res = hash_sources(paths)
+        self.assertEqual(hash_sources(paths), res)
+        self.assertNotEqual(hash_sources(paths[::-1]), res)
+        self.write('unused.py', 'z = 1\n')
+        self.assertEqual(hash_sources(paths), res)
+        self.write('lib/other.py', 'x = 2\n')
+        self.assertNotEqual(hash_sources(paths), res)
+
+    def testGetKey(self):
+        data = self.join('data.npz')
+        save(data, 0, 60, {'btc_usd': np.arange(8.0).reshape(2, 4)})
+        args = Namespace(data=data, add_data=[],
+                         strategy=[self.join('strategy.py')],
+                         portfolio={'btc': 1.0, 'usd': 0.0}, fee=0.0,
+                         progress='bar', no_plot=False, cache=self.path,
+                         cache_size=1)
+        res = get_key(args)
+        self.assertEqual(get_key(args), res)
+        args.progress = 'none'
+        args.no_plot = True
+        self.assertEqual(get_key(args), res)
+        args.fee = 0.1
+        self.assertNotEqual(get_key(args), res)
+        args.fee = 0.0
+        self.write('lib/util.py', 'y = 2\n')
+        self.assertNotEqual(get_key(args), res)
+
+    def testRecorder(self):
+        fp = BytesIO()
+        recorder = Recorder(fp)
+        recorder.write('a')
+        recorder.write('b')
+        self.assertEqual(fp.getvalue(), 'ab')
+        self.assertEqual(recorder.getvalue(), 'ab')
+
+    def testResultCache(self):
+        path = self.join('cache')
+        cache = ResultCache(path, 1000)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', {'value': 1})
+        self.assertEqual(cache.get('a'), {'value': 1})
+
+        for i, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, 'x' * 300)
+            os.utime(cache.get_path(key), (i, i))
+        self.assertEqual(len(os.listdir(path)), 3)
+        cache.get('a')
+        cache.put('d', 'x' * 300)
+        self.assertEqual(sorted(os.listdir(path)),
+                         ['a.pickle', 'c.pickle', 'd.pickle'])
+
+        with self.assertRaises(ValueError):
+            ResultCache(path, 0)
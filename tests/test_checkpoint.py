@@ -0,0 +1,58 @@
+from unittest import TestCase
+try:
+    from unittest.mock import MagicMock # pylint:disable=import-error,no-name-in-module
+except ImportError:
+    from mock import MagicMock
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import listdir
+from os.path import join, exists
+
+from backtest import checkpoint
+
+
+class TestCheckpoint(TestCase):
+    def setUp(self):
+        self.dir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir)
+
+    @staticmethod
+    def strategy(name, snapshot, started=True):
+        ret = MagicMock(started=started)
+        ret.__str__.return_value = name
+        ret.get_snapshot.return_value = snapshot
+        return ret
+
+    def testGetPath(self):
+        self.assertEqual(checkpoint.get_path('a_{tick}.ckpt', 5), 'a_5.ckpt')
+        self.assertEqual(checkpoint.get_path('a.ckpt', 5), 'a.ckpt')
+
+    def testSaveLoad(self):
+        strategies = [self.strategy('s0', {'x': 1}),
+                      self.strategy('s1', {'y': [2]}, False)]
+        path = checkpoint.save(join(self.dir, 'c{tick}'), 3, strategies)
+        self.assertEqual(path, join(self.dir, 'c3'))
+        self.assertEqual(listdir(self.dir), ['c3'])
+        self.assertFalse(exists(path + '.tmp'))
+        self.assertEqual(checkpoint.load(path), {
+            'tick': 3,
+            'strategies': [('s0', True, {'x': 1}), ('s1', False, {'y': [2]})]
+        })
+
+    def testRestore(self):
+        strategies = [MagicMock(started=True), MagicMock(started=True)]
+        state = {
+            'tick': 7,
+            'strategies': [('s0', True, 0), ('s1', False, 1)]
+        }
+        self.assertEqual(checkpoint.restore(state, strategies), 7)
+        strategies[0].set_snapshot.assert_called_with(0)
+        strategies[1].set_snapshot.assert_called_with(1)
+        self.assertTrue(strategies[0].started)
+        self.assertFalse(strategies[1].started)
+
+        with self.assertRaises(ValueError):
+            checkpoint.restore(state, strategies[:1])
@@ -0,0 +1,62 @@
+from unittest import TestCase
+try:
+    from unittest.mock import patch # pylint:disable=import-error,no-name-in-module
+except ImportError:
+    from mock import patch
+
+from StringIO import StringIO
+from decimal import Decimal
+import json
+
+from backtest.events import EventLog
+
+
+@patch('backtest.events.ctime', return_value='time')
+class TestEventLog(TestCase):
+    def testInit(self, ctime):
+        log = EventLog()
+        self.assertIsNone(log.file)
+        self.assertEqual(log.format, 'text')
+        self.assertIsNone(log.flush_interval)
+        self.assertEqual(log.records, [])
+        with self.assertRaises(ValueError):
+            EventLog(fmt='xml')
+
+    def testText(self, ctime):
+        fp = StringIO()
+        log = EventLog(fp)
+        log.record(1, 's', 'log', 'message\n')
+        log.record(2, 's', 'email', 'subject', 'message')
+        log.record(None, 's', 'error', 'tick 3', 'Error()', 'traceback\n')
+        self.assertEqual(fp.getvalue(), '')
+        self.assertEqual(len(log.records), 3)
+        self.assertFalse(ctime.called)
+        log.flush()
+        self.assertEqual(ctime.call_count, 2)
+        self.assertEqual(log.records, [])
+        self.assertEqual(fp.getvalue(),
+                         '[time] [s] LOG: message\n'
+                         '[time] [s] EMAIL: subject message\n'
+                         '[ERROR] [s] tick 3: Error()\ntraceback\n')
+
+    def testJson(self, ctime):
+        fp = StringIO()
+        log = EventLog(fp, 'json')
+        log.record(1, 's', 'buy', Decimal('0.5'), 'USD', 2, 'BTC', 0.25)
+        log.flush()
+        self.assertEqual(json.loads(fp.getvalue()), {
+            'time': 1, 'source': 's', 'event': 'buy',
+            'amount': '0.5', 'currency': 'USD',
+            'bought': 2, 'asset': 'BTC', 'price': 0.25
+        })
+        self.assertFalse(ctime.called)
+
+    def testFlushInterval(self, ctime):
+        fp = StringIO()
+        log = EventLog(fp, flush_interval=2)
+        log.record(1, 's', 'log', '1\n')
+        self.assertEqual(fp.getvalue(), '')
+        log.record(1, 's', 'log', '2\n')
+        self.assertEqual(fp.getvalue(),
+                         '[time] [s] LOG: 1\n[time] [s] LOG: 2\n')
+        self.assertEqual(log.records, [])
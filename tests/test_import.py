@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+from subprocess import check_output
+from os.path import dirname, abspath
+import sys
+import json
+
+
+SCRIPT = '''
+import sys, json
+from time import time
+start = time()
+import backtest.cli, backtest.data.cli
+print(json.dumps([time() - start, sorted(sys.modules)]))
+'''
+
+
+class TestImport(TestCase):
+    BUDGET = 0.5
+    LAZY = ['numpy', 'talib', 'tqdm', 'matplotlib', 'multiprocessing']
+
+    def testImport(self):
+        elapsed, modules = json.loads(check_output(
+            [sys.executable, '-c', SCRIPT],
+            cwd=dirname(dirname(abspath(__file__)))
+        ))
+        for module in self.LAZY:
+            self.assertNotIn(module, modules)
+        self.assertLess(elapsed, self.BUDGET)
@@ -0,0 +1,79 @@
+from unittest import TestCase
+try:
+    from unittest.mock import patch # pylint:disable=import-error,no-name-in-module
+except ImportError:
+    from mock import patch
+
+from StringIO import StringIO
+import sys
+import json
+
+from backtest.progress import (Progress, BarProgress, JsonProgress,
+                               create, chunks)
+from backtest.util import TqdmFileWrapper
+
+
+class TestProgress(TestCase):
+    def testCreate(self):
+        self.assertIsInstance(create('none', 10), Progress)
+        self.assertIsInstance(create(False, 10), Progress)
+        self.assertIsInstance(create(None, 10), Progress)
+        with create('json', 10, 2) as progress:
+            self.assertIsInstance(progress, JsonProgress)
+            self.assertEqual(progress.total, 10)
+            self.assertEqual(progress.tick, 2)
+        with self.assertRaises(KeyError):
+            create('test', 10)
+
+    def testChunks(self):
+        progress = Progress(10)
+        self.assertEqual(list(chunks(0, 10, progress)), [(0, 1), (1, 10)])
+        self.assertEqual(list(chunks(2, 10, progress, 4)),
+                         [(2, 3), (3, 4), (4, 8), (8, 10)])
+        self.assertEqual(list(chunks(10, 10, progress)), [])
+
+    @patch('backtest.progress.time')
+    def testChunksInterval(self, time):
+        progress = Progress(100)
+        progress.INTERVAL = 1.0
+        time.return_value = 0.0
+        res = []
+        for start, stop in chunks(0, 100, progress, 50):
+            res.append((start, stop))
+            time.return_value += (stop - start) * 0.25
+        self.assertEqual(res, [(0, 1), (1, 3), (3, 7), (7, 11), (11, 15),
+                               (15, 19), (19, 23), (23, 27), (27, 31),
+                               (31, 35), (35, 39), (39, 43), (43, 47),
+                               (47, 50), (50, 54), (54, 58), (58, 62),
+                               (62, 66), (66, 70), (70, 74), (74, 78),
+                               (78, 82), (82, 86), (86, 90), (90, 94),
+                               (94, 98), (98, 100)])
+        self.assertEqual(progress.tick, 100)
+
+    def testJson(self):
+        fp = StringIO()
+        progress = JsonProgress(10, fp=fp)
+        progress.time -= 2
+        progress.start_time -= 2
+        progress.update(4)
+        res = json.loads(fp.getvalue())
+        self.assertEqual(res['tick'], 4)
+        self.assertEqual(res['ticks'], 10)
+        self.assertAlmostEqual(res['ticks_per_sec'], 2, places=1)
+        self.assertGreaterEqual(res['elapsed'], 2)
+        self.assertEqual(progress.tick, 4)
+
+    @patch('backtest.util.tqdm.tqdm')
+    def testBar(self, tqdm):
+        stdout = sys.stdout
+        with BarProgress(10, 2) as progress:
+            self.assertIsInstance(sys.stdout, TqdmFileWrapper)
+            tqdm.assert_called_with(total=10, initial=2, leave=False,
+                                    dynamic_ncols=True, file=stdout)
+            print('test')
+            tqdm.write.assert_not_called()
+            progress.update(5)
+            tqdm.write.assert_called_with('test', file=stdout)
+            tqdm.return_value.update.assert_called_with(3)
+        self.assertIs(sys.stdout, stdout)
+        tqdm.return_value.close.assert_called_with()
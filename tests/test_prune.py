@@ -0,0 +1,87 @@
+from unittest import TestCase
+try:
+    from unittest.mock import MagicMock # pylint:disable=import-error,no-name-in-module
+except ImportError:
+    from mock import MagicMock
+
+import numpy as np
+
+from backtest.prune import Drawdown, Leader, Halving, Pruner, create_rules
+
+
+class TestRules(TestCase):
+    def testDrawdown(self):
+        rule = Drawdown(0.5)
+        self.assertEqual(rule(0, {0: 10, 1: 4, 2: 6}, {0: 10, 1: 10, 2: 10}),
+                         [1])
+        with self.assertRaises(ValueError):
+            Drawdown(1)
+
+    def testLeader(self):
+        rule = Leader(0.5)
+        self.assertEqual(sorted(rule(0, {0: 10, 1: 4, 2: 6, 3: 5}, {})),
+                         [1])
+        self.assertEqual(rule(0, {}, {}), [])
+        with self.assertRaises(ValueError):
+            Leader(0)
+
+    def testHalving(self):
+        rule = Halving(10)
+        equity = dict(enumerate([5, 8, 1, 7, 3]))
+        self.assertEqual(rule(8, equity, {}), [])
+        self.assertEqual(rule(9, equity, {}), [4, 2])
+        self.assertEqual(rule(10, {1: 8, 3: 7}, {}), [])
+        self.assertEqual(str(rule), 'successive halving at tick 20')
+        self.assertEqual(rule(29, {1: 8, 3: 7}, {}), [3])
+        self.assertEqual(rule.rung, 40)
+        with self.assertRaises(ValueError):
+            Halving(10, 1)
+
+    def testCreate(self):
+        self.assertEqual(create_rules(), [])
+        rules = create_rules(0.5, 0.25, 10, 3)
+        self.assertEqual([type(rule) for rule in rules],
+                         [Drawdown, Leader, Halving])
+        self.assertEqual(rules[2].eta, 3)
+
+
+class TestPruner(TestCase):
+    @staticmethod
+    def strategy(usd, started=True):
+        ret = MagicMock(started=started, state={'usd': usd, 'btc': 0})
+        ret.get_holdings.side_effect = lambda: ret.state
+        return ret
+
+    def testUpdate(self):
+        rates = {'usd': np.ones(3), 'btc': np.array([1.0, 2.0, 3.0])}
+        pruner = Pruner([Drawdown(0.5), Leader(0.5)], rates, 10)
+        strategies = [self.strategy(10), self.strategy(10),
+                      self.strategy(1, False)]
+        self.assertEqual(pruner.update(0, strategies), [])
+        self.assertEqual(pruner.peak, {0: 10, 1: 10})
+
+        strategies[0].state = {'usd': 4, 'btc': 0}
+        strategies[1].state = {'usd': 2, 'btc': 5}
+        self.assertEqual(pruner.update(1, strategies), [strategies[0]])
+        self.assertEqual(pruner.pruned, {0: (1, 'drawdown > 50.00%')})
+        strategies[0].events.record.assert_called_once_with(
+            None, strategies[0], 'prune', 1, 'drawdown > 50.00%'
+        )
+        self.assertEqual(pruner.peak, {0: 10, 1: 12})
+
+        with self.assertRaises(ValueError):
+            Pruner([], rates, 0)
+
+    def testStartValue(self):
+        rates = {'usd': np.ones(3), 'btc': np.array([1.0, 2.0, 3.0])}
+        pruner = Pruner([Drawdown(0.5)], rates, 10, {'usd': 5, 'btc': 5})
+        self.assertEqual(pruner.start_value, 10)
+        strategies = [self.strategy(4), self.strategy(12)]
+        self.assertEqual(pruner.update(0, strategies), [strategies[0]])
+        self.assertEqual(pruner.peak, {0: 10, 1: 12})
+
+        strategy = self.strategy(0)
+        strategy.get_holdings.side_effect = None
+        strategy.get_holdings.return_value = {'usd': 2, 'btc': 4}
+        pruner = Pruner([Leader(0.5)], rates, 10)
+        self.assertEqual(pruner.update(2, [strategy, self.strategy(20)]), [])
@@ -7,9 +7,15 @@ except ImportError:
 from argparse import ArgumentTypeError
 from time import strptime, strftime
 from sys import exc_info
+from StringIO import StringIO
+import sys
 
-from backtest.util import (Namespace, TqdmFileWrapper,
-                           enum, parse_date, parse_time)
+from copy import deepcopy
+import pickle
+
+from backtest.util import (Namespace, Constants, Record, TqdmFileWrapper,
+                           enum, parse_date, parse_time,
+                           parse_fee, parse_slippage)
 
 
 class TestNamespace(TestCase):
@@ -38,24 +44,94 @@ class TestNamespace(TestCase):
             del ns.x
 
 
-@patch('backtest.util.tqdm.write')
+class TestConstants(TestCase):
+    def testAccess(self):
+        const = Constants([('x', 0)], y=1)
+        const['z'] = 2
+        const.w = 3
+        self.assertEqual(const, {'x': 0, 'y': 1, 'z': 2, 'w': 3})
+        self.assertEqual((const.x, const.y, const.z, const.w), (0, 1, 2, 3))
+        del const['x']
+        with self.assertRaises(AttributeError):
+            const.x # pylint: disable=pointless-statement
+        self.assertNotIn('x', const)
+
+    def testCopy(self):
+        const = Constants(x=0)
+        for copy in (deepcopy(const), pickle.loads(pickle.dumps(const, 2))):
+            self.assertIsInstance(copy, Constants)
+            self.assertEqual(copy, const)
+            copy['y'] = 1
+            self.assertEqual(copy.y, 1)
+            self.assertNotIn('y', const)
+
+
+class TestRecord(TestCase):
+    class Point(Record):
+        __slots__ = ('x', 'y')
+
+    def testInit(self):
+        point = self.Point(x=1)
+        self.assertEqual((point.x, point.y), (1, None))
+        with self.assertRaises(TypeError):
+            self.Point(z=1)
+        with self.assertRaises(AttributeError):
+            point.z = 1
+
+    def testAccess(self):
+        point = self.Point(x=1, y=2)
+        point['x'] = 3
+        self.assertEqual(point['x'], 3)
+        self.assertEqual(dict(point), {'x': 3, 'y': 2})
+        self.assertEqual(point.items(), [('x', 3), ('y', 2)])
+        self.assertEqual(list(point), ['x', 'y'])
+        self.assertEqual(len(point), 2)
+        self.assertIn('x', point)
+        with self.assertRaises(KeyError):
+            point['z'] # pylint: disable=pointless-statement
+        with self.assertRaises(KeyError):
+            point['z'] = 1
+        self.assertEqual(repr(point), 'Point(x=3, y=2)')
+
+
+@patch('backtest.util.tqdm.tqdm.write')
 class TestTqdmFileWrapper(TestCase):
     def testInit(self, write):
         fp = TqdmFileWrapper(0)
         self.assertEqual(fp.file, 0)
-        self.assertEqual(fp.linebuf, '')
+        self.assertEqual(fp.buf, [])
 
     def testWrite(self, write):
         fp = TqdmFileWrapper(1)
         fp.write('123')
-        self.assertEqual(write.call_count, 0)
-        self.assertEqual(fp.linebuf, '123')
         fp.write('4')
+        fp.flush()
+        self.assertEqual(write.call_count, 0)
+        fp.write('5\n\n6\n')
+        fp.write('7 ')
         self.assertEqual(write.call_count, 0)
-        self.assertEqual(fp.linebuf, '1234')
-        fp.write('5\n\n6\n7 ')
-        write.assert_called_with('12345\n\n6', file=1)
-        self.assertEqual(fp.linebuf, '7 ')
+        fp.flush()
+        write.assert_called_once_with('12345\n\n6', file=1)
+        self.assertEqual(fp.buf, ['7 '])
+        fp.write('\n')
+        fp.flush()
+        write.assert_called_with('7 ', file=1)
+        self.assertEqual(fp.buf, [])
+
+    def testClose(self, write):
+        out = StringIO()
+        fp = TqdmFileWrapper(out)
+        fp.write('1\n2')
+        fp.close()
+        write.assert_called_once_with('1', file=out)
+        self.assertEqual(out.getvalue(), '2')
+
+    def testStdout(self, write):
+        stdout = sys.stdout
+        with TqdmFileWrapper.stdout() as fp:
+            self.assertIs(fp, stdout)
+            self.assertIsInstance(sys.stdout, TqdmFileWrapper)
+        self.assertIs(sys.stdout, stdout)
 
 
 class TestEnum(TestCase):
@@ -134,3 +210,19 @@ class TestParseTime(TestCase):
                     parse_time(test)
             except AssertionError as err:
                 raise AssertionError(err.message, test), None, exc_info()[2]
+
+
+class TestParseFee(TestCase):
+    def testParse(self):
+        self.assertEqual(parse_fee('0'), 0)
+        self.assertEqual(parse_fee('0.0025'), 0.0025)
+        self.assertEqual(parse_slippage('0'), 0)
+        self.assertEqual(parse_slippage('12.5'), 12.5)
+
+    def testParseError(self):
+        for test in ['', 'x', '-0.1', '1', '1.5', 'nan']:
+            with self.assertRaises(ArgumentTypeError):
+                parse_fee(test)
+        for test in ['', 'x', '-1', 'nan']:
+            with self.assertRaises(ArgumentTypeError):
+                parse_slippage(test)
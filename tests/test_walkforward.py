@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+from os.path import dirname, join
+import numpy as np
+
+from backtest.api import TradewaveAPI
+from backtest.data import ArrayDataSource
+from backtest import walkforward
+
+
+STRATEGY = join(dirname(dirname(__file__)), 'strategies', 'buy_and_hold.py')
+
+
+class TestWalkForward(TestCase):
+    data = {
+        'btc_usd': np.array([[i + 1, i, i, i] for i in range(1, 21)],
+                            dtype=float)
+    }
+
+    def testWindows(self):
+        self.assertEqual(list(walkforward.windows(0, 10, 4, 2)),
+                         [(0, 4, 6), (2, 6, 8), (4, 8, 10)])
+        self.assertEqual(list(walkforward.windows(0, 10, 4, 2, 3)),
+                         [(0, 4, 6), (3, 7, 9)])
+        self.assertEqual(list(walkforward.windows(0, 5, 4, 2)), [])
+        with self.assertRaises(ValueError):
+            list(walkforward.windows(0, 10, 4, 0))
+        with self.assertRaises(ValueError):
+            list(walkforward.windows(0, 10, 4, 2, 0))
+
+    def testGetSource(self):
+        src = ArrayDataSource(self.data, data_start_time=10, data_tick_size=2)
+        view, max_ticks = walkforward.get_source(src, 15, 21)
+        self.assertIs(view.data, src.data)
+        self.assertIs(view.cache, src.cache)
+        self.assertEqual(view.start_time, 14)
+        self.assertEqual(view.end_time, 20)
+        self.assertEqual(view.tick_offset, 2)
+        self.assertEqual(max_ticks, 4)
+        self.assertEqual(view.get_max_ticks(), 4)
+
+    def testWalkForward(self):
+        src = ArrayDataSource(self.data)
+        res = walkforward.walk_forward(src, [STRATEGY], {'usd': 1.0},
+                                       'btc_usd', 0, 20, 10, 5)
+        self.assertEqual(len(res), 2)
+        self.assertEqual([segment for segment, _ in res[0]],
+                         ['train', 'test'])
+        _, test = res[1][1]
+        self.assertEqual(test['begin'], 15)
+        self.assertEqual(test['end'], 19)
+        self.assertEqual(test['ticks'], 5)
+        self.assertAlmostEqual(float(test['buy_and_hold']), 20 / 16.0)
+        self.assertEqual(test['strategies'][0][0], 'buy_and_hold')
+        self.assertAlmostEqual(float(test['strategies'][0][1]), 20 / 16.0)
+
+    def testExchange(self):
+        src = ArrayDataSource({'testex:btc_usd': self.data['btc_usd']})
+        TradewaveAPI.add_exchange('testex')
+        res = walkforward.run_segment(src, [STRATEGY], {'usd': 1.0},
+                                      'btc_usd', 10, 20,
+                                      {'primary_exchange': 'testex'})
+        self.assertEqual(res, walkforward.run_segment(
+            ArrayDataSource(self.data), [STRATEGY], {'usd': 1.0},
+            'btc_usd', 10, 20
+        ))
+
+    def testWalkForwardJobs(self):
+        src = ArrayDataSource(self.data)
+        args = ([STRATEGY], {'usd': 1.0}, 'btc_usd', 0, 20, 10, 5)
+        self.assertEqual(walkforward.walk_forward(src, *args, jobs=2),
+                         walkforward.walk_forward(src, *args))